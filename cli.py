@@ -0,0 +1,205 @@
+# danai/cli.py
+"""
+Command-line entry point.
+
+    danai summarize [PATH ...] [--preset dev|blueprint | --config FILE] [options]
+
+Only argparse is imported up front; the summarymaker (and tiktoken, which is
+loaded on first token count) are imported once a command actually runs, so
+startup stays fast.
+"""
+
+import argparse
+import sys
+from typing import List, Optional, Sequence
+
+PRESETS = {
+    "dev": "get_dev_config",
+    "blueprint": "get_blueprint_config",
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="danai")
+    commands = parser.add_subparsers(dest="command")
+
+    summarize = commands.add_parser(
+        "summarize",
+        help="write a directory tree and a summary of file contents",
+        description=(
+            "Summarise one or more directories into tree.md and summary.md. "
+            "Settings come from a preset or a config file (.json or .py); "
+            "options given here override them."
+        ),
+    )
+    summarize.add_argument("paths", nargs="*", help="base directories (default: from the config, else the cwd)")
+    source = summarize.add_mutually_exclusive_group()
+    source.add_argument(
+        "--preset",
+        help=f"start from a preset: {', '.join(sorted(PRESETS))} (or get_dev_config / get_blueprint_config)",
+    )
+    source.add_argument(
+        "--config",
+        help="JSON file of SummaryConfig fields, or a Python file defining 'config' or 'get_config()'",
+    )
+    summarize.add_argument("-o", "--output", help="output directory")
+    summarize.add_argument("--no-tokens", action="store_true", help="skip token counting (tiktoken is never loaded)")
+    summarize.add_argument("-q", "--quiet", action="store_true", help="don't print a line per file")
+    summarize.add_argument("--git", action="store_true", help="list files from git's index instead of walking directories")
+    summarize.add_argument("--changed-since", metavar="REF", help="only summarise files changed since the merge base with REF")
+    summarize.add_argument("--workers", type=int, help="worker processes (0 => one per CPU)")
+    summarize.add_argument("--incremental", action="store_true", help="reuse results for unchanged files")
+    summarize.add_argument("--cache", metavar="FILE", help="SQLite result cache shared across runs (e.g. ~/.cache/danai/results.sqlite)")
+    summarize.add_argument("--streaming", action="store_true", help="write summary.md while processing")
+    summarize.add_argument("--jsonl", action="store_true", help="write summary.jsonl (one JSON record per file) instead of summary.md")
+    summarize.add_argument("--compress", choices=["gzip", "zstd"], help="with --jsonl, compress summary.jsonl")
+    summarize.add_argument("--report", action="store_true", help="write report.json next to summary.md")
+    summarize.add_argument("--watch", action="store_true", help="keep tree.md and summary.md updated as files change")
+    summarize.add_argument("--poll", action="store_true", help="with --watch, poll for changes instead of using inotify")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "summarize":
+        return summarize(args, parser)
+
+    parser.print_help()
+    return 2
+
+
+def summarize(args: argparse.Namespace, parser: argparse.ArgumentParser) -> int:
+    from .summarymaker.config import SummaryConfig
+    from .summarymaker.main import check_config, generate_summary
+
+    try:
+        if args.preset:
+            config = load_preset(args.preset)
+        elif args.config:
+            config = load_config_file(args.config)
+        else:
+            config = SummaryConfig()
+    except (OSError, ValueError, TypeError, KeyError) as exc:
+        parser.error(str(exc))
+
+    if args.paths:
+        config.base_directories = list(args.paths)
+    if args.output:
+        config.output_path = args.output
+    if args.no_tokens:
+        config.count_tokens = False
+    if args.quiet:
+        config.quiet = True
+    if args.git:
+        config.file_source = "git"
+    if args.changed_since:
+        config.changed_since = args.changed_since
+    if args.workers is not None:
+        config.workers = args.workers
+    if args.incremental:
+        config.incremental = True
+    if args.cache:
+        config.result_cache = args.cache
+    if args.streaming:
+        config.streaming = True
+    if args.jsonl:
+        config.summary_format = "jsonl"
+    if args.compress:
+        config.summary_compression = args.compress
+    if args.report:
+        config.report_json = True
+
+    # Only invalid options are usage errors; anything raised during the run
+    # itself is not the command line's fault and keeps its traceback
+    try:
+        if args.watch:
+            from .summarymaker.watch import check_watch_config
+
+            check_watch_config(config)
+        else:
+            check_config(config)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.watch:
+        from .summarymaker.watch import watch_summary
+
+        watch_summary(config, use_inotify=not args.poll)
+    else:
+        generate_summary(config)
+    return 0
+
+
+def load_preset(name: str):
+    """
+    Build the SummaryConfig for a preset name (short or function name).
+    """
+    from .summarymaker import sample_configs
+
+    func_name = PRESETS.get(name, name)
+    if func_name not in PRESETS.values():
+        raise ValueError(f"Unknown preset {name!r}, expected one of {sorted(PRESETS)}")
+    return getattr(sample_configs, func_name)()
+
+
+def load_config_file(path: str):
+    """
+    Load a SummaryConfig from a .json or .py file.
+
+    JSON files hold SummaryConfig fields. Processors are given by class name,
+    optionally with keyword arguments, e.g.
+        {"only_include": [".py"],
+         "processors": ["PythonStripProcessor",
+                        {"type": "TruncateProcessor", "args": {"rules": {}, "default": 300}}]}
+
+    Python files are run and must define 'config' (a SummaryConfig) or 'get_config()'.
+    """
+    from .summarymaker.config import SummaryConfig
+
+    if path.endswith(".py"):
+        import runpy
+
+        namespace = runpy.run_path(path)
+        if "get_config" in namespace:
+            config = namespace["get_config"]()
+        elif "config" in namespace:
+            config = namespace["config"]
+        else:
+            raise ValueError(f"{path} defines neither 'config' nor 'get_config()'")
+        if not isinstance(config, SummaryConfig):
+            raise ValueError(f"{path} did not produce a SummaryConfig")
+        return config
+
+    import json
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} must contain a JSON object")
+    if "processors" in data:
+        data["processors"] = build_processors(data["processors"])
+    return SummaryConfig(**data)
+
+
+def build_processors(specs: List[object]) -> List[object]:
+    """
+    Instantiate processors from "ClassName" or {"type": "ClassName", "args": {...}} specs.
+    """
+    from .summarymaker import processing
+
+    processors = []
+    for spec in specs:
+        if isinstance(spec, str):
+            name, kwargs = spec, {}
+        else:
+            name, kwargs = spec["type"], spec.get("args", {})
+        if name not in processing.__all__:
+            raise ValueError(f"Unknown processor {name!r}, expected one of {processing.__all__}")
+        processors.append(getattr(processing, name)(**kwargs))
+    return processors
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+# danai/summarymaker/asyncreader.py
+"""
+Concurrent file reading for high-latency filesystems (e.g. network mounts).
+
+An asyncio loop on a background thread keeps up to 'concurrency' reads in
+flight on a thread pool, and hands each result to the (synchronous) consumer
+as soon as it completes, so per-file round trips overlap instead of adding up.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Sequence, Tuple
+
+
+class AsyncReader:
+    """
+    Reads 'paths' with read(path), yielding (index, result) in completion order.
+
+    At most 'concurrency' reads run at once, and reads never get more than
+    'max_ahead' results ahead of the consumer, so a slow consumer does not make
+    finished results pile up. Exceptions raised by read() are re-raised in the
+    consumer. Stopping iteration early cancels the outstanding reads.
+
+    With 'hold_results', a result still counts against 'max_ahead' after it
+    has been yielded, until the consumer calls done() for it. A consumer that
+    puts results back in order can then hold on to them without later reads
+    running ever further ahead of the next one it is waiting for.
+
+    Usage Example:
+        for index, (text, digest) in AsyncReader(paths, read_source, concurrency=32):
+            ...
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[str],
+        read: Callable[[str], object],
+        concurrency: int,
+        max_ahead: Optional[int] = None,
+        hold_results: bool = False
+    ):
+        self.paths = paths
+        self.read = read
+        self.concurrency = max(1, concurrency)
+        self.max_ahead = max(max_ahead or self.concurrency * 4, self.concurrency)
+        self.hold_results = hold_results
+        self._results = queue.Queue()  # type: queue.Queue
+        self._ready = threading.Event()
+        self._loop = None  # type: Optional[asyncio.AbstractEventLoop]
+        self._ahead = None  # type: Optional[asyncio.Semaphore]
+        self._task = None  # type: Optional[asyncio.Future]
+
+    def __iter__(self) -> Iterator[Tuple[int, object]]:
+        if not self.paths:
+            return
+        thread = threading.Thread(target=self._run, name="summarymaker-reader", daemon=True)
+        thread.start()
+        self._ready.wait()
+        try:
+            for _ in range(len(self.paths)):
+                index, ok, value = self._results.get()
+                if not ok:
+                    raise value
+                if not self.hold_results:
+                    self._call_in_loop(self._ahead.release)
+                yield index, value
+        finally:
+            self._call_in_loop(self._task.cancel)
+            thread.join()
+
+    def done(self, count: int = 1) -> None:
+        """
+        With hold_results, let reads run 'count' results further ahead, once
+        the consumer has finished with that many.
+        """
+        for _ in range(count):
+            self._call_in_loop(self._ahead.release)
+
+    def _call_in_loop(self, callback: Callable[[], object]) -> None:
+        try:
+            self._loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            # The loop has already finished (every read was issued)
+            pass
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._produce())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            pending = [t for t in asyncio.all_tasks(loop) if not t.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+
+    async def _produce(self) -> None:
+        self._loop = asyncio.get_event_loop()
+        self._task = asyncio.current_task()
+        self._ahead = asyncio.Semaphore(self.max_ahead)
+        in_flight = asyncio.Semaphore(self.concurrency)
+        self._ready.set()
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            tasks = set()
+            for index, path in enumerate(self.paths):
+                await self._ahead.acquire()
+                await in_flight.acquire()
+                task = asyncio.ensure_future(self._read_one(index, path, in_flight, executor))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            executor.shutdown(wait=False)
+
+    async def _read_one(
+        self,
+        index: int,
+        path: str,
+        in_flight: asyncio.Semaphore,
+        executor: ThreadPoolExecutor
+    ) -> None:
+        try:
+            value = await self._loop.run_in_executor(executor, self.read, path)
+            self._results.put((index, True, value))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self._results.put((index, False, exc))
+        finally:
+            in_flight.release()
+
+
+@contextmanager
+def simulated_read_latency(delay_s: float) -> Iterator[None]:
+    """
+    Add 'delay_s' seconds of latency to every file read the pipeline makes,
+    to try async_reads locally as if the tree were on a network mount.
+    The delay is a sleep, so it releases the GIL like a real blocking read.
+
+    Usage Example:
+        with simulated_read_latency(0.005):
+            generate_summary(config)
+    """
+    from . import pipeline
+
+    original = pipeline.read_source
+
+    def slow_read_source(path, max_bytes=None):
+        time.sleep(delay_s)
+        return original(path, max_bytes)
+
+    pipeline.read_source = slow_read_source
+    try:
+        yield
+    finally:
+        pipeline.read_source = original
@@ -0,0 +1,209 @@
+# danai/summarymaker/batch.py
+"""
+Runs several SummaryConfigs over the same tree in one pass.
+
+generate_summaries scans each set of directories once, reads each file once,
+runs every config's filters and processor chain over that shared data (chains
+that start with the same processors share the work for those), counts each
+distinct text's tokens once, and writes each config's outputs to its own
+output_path, exactly as generate_summary would.
+"""
+
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import SummaryConfig
+from .dedupe import copy_duplicate, find_duplicates
+from .filtering.dirindex import DirectoryIndex
+from .filtering.filters import FileInfo, collect_included_files
+from .instrumentation import RunReport
+from .main import check_config, report_tokens, write_outputs, write_report
+from .pipeline import TOKEN_BATCH_SIZE
+from .processing.baseprocessor import file_extension
+from .processing.plan import processor_plan
+from .reading import read_limit, read_source
+from .tcounter import tokencount_batch
+
+
+def generate_summaries(configs: Sequence[SummaryConfig]) -> List[RunReport]:
+    """
+    Like calling generate_summary once per config, but with one directory scan
+    and one read per file for all of them.
+
+    Configs with the same ignore settings share one DirectoryIndex. Files are
+    processed in-process, so workers, async_reads and bounded_read_bytes do
+    not apply, and neither does the result cache; streaming and incremental
+    runs are not supported. The 'scan' and 'process' phases in each report are
+    the shared time for the whole batch.
+
+    Usage Example:
+        generate_summaries([get_dev_config(), get_blueprint_config()])
+
+    :param configs: The SummaryConfig for each set of outputs.
+    :return: One RunReport per config, in the same order.
+    """
+    for config in configs:
+        check_config(config)
+        if config.streaming or config.incremental:
+            raise ValueError("generate_summaries does not support streaming or incremental configs")
+
+    reports = [RunReport(config) for config in configs]
+
+    with _shared_phase(reports, "scan"):
+        indexes = _build_indexes(configs)
+        included = [collect_included_files(config, index) for config, index in zip(configs, indexes)]
+
+    with _shared_phase(reports, "process"):
+        _process_shared(configs, included)
+        for config, files in zip(configs, included):
+            if config.dedupe:
+                _mark_duplicates(files, config)
+
+    for config, report, files, index in zip(configs, reports, included, indexes):
+        print(f"====== {config.output_path}")
+        for _ in report_tokens(iter(files), config, report):
+            pass
+        write_outputs(config, report, files, index)
+        write_report(config, report)
+    return reports
+
+
+class _shared_phase:
+    """
+    Time one block as the same phase in several reports.
+    """
+
+    def __init__(self, reports: Sequence[RunReport], name: str):
+        self.phases = [report.phase(name) for report in reports]
+
+    def __enter__(self) -> None:
+        for phase in self.phases:
+            phase.__enter__()
+
+    def __exit__(self, *exc_info) -> None:
+        for phase in self.phases:
+            phase.__exit__(*exc_info)
+
+
+def _scan_key(config: SummaryConfig) -> tuple:
+    # Everything DirectoryIndex takes from a config
+    return (
+        tuple(sorted(config.fully_ignored_dirs)),
+        tuple(sorted(config.partially_ignored_dirs)),
+        tuple(config.ignore_patterns),
+        config.use_gitignore,
+        config.file_source,
+        config.changed_since,
+    )
+
+
+def _build_indexes(configs: Sequence[SummaryConfig]) -> List[DirectoryIndex]:
+    """
+    One DirectoryIndex per distinct set of ignore settings, covering the
+    roots of every config that uses it.
+    """
+    shared = {}  # type: Dict[tuple, DirectoryIndex]
+    indexes = []  # type: List[DirectoryIndex]
+    for config in configs:
+        key = _scan_key(config)
+        index = shared.get(key)
+        if index is None:
+            index = shared[key] = DirectoryIndex(config)
+        # Roots another config already scanned are not listed again
+        index.scan(list(config.base_directories) + list(config.tree_directories or []))
+        indexes.append(index)
+    return indexes
+
+
+def _process_shared(configs: Sequence[SummaryConfig], included: Sequence[List[FileInfo]]) -> None:
+    """
+    Read every file once and fill in each config's FileInfo for it.
+    """
+    # (absolute path, read limit) -> (config position, FileInfo) for each config using that file
+    users = defaultdict(list)  # type: Dict[Tuple[str, Optional[int]], List[Tuple[int, FileInfo]]]
+    for position, (config, files) in enumerate(zip(configs, included)):
+        limit = read_limit(config)
+        for fileinfo in files:
+            users[(os.path.abspath(fileinfo.path), limit)].append((position, fileinfo))
+
+    # Each processor's sharing key, worked out once per config
+    processor_keys = [[_processor_key(p) for p in config.processors] for config in configs]
+    # (config position, extension) -> (processors that apply, their keys)
+    chains = {}  # type: Dict[Tuple[int, str], Tuple[List[object], Tuple[object, ...]]]
+
+    def chain_for(position: int, path: str) -> Tuple[List[object], Tuple[object, ...]]:
+        ext = file_extension(path)
+        chain = chains.get((position, ext))
+        if chain is None:
+            steps = processor_plan(configs[position].processors).steps(path)
+            chain = chains[(position, ext)] = (
+                [processor for _, processor in steps],
+                tuple(processor_keys[position][i] for i, _ in steps),
+            )
+        return chain
+
+    keys = sorted(users, key=lambda key: (key[0], key[1] or 0))
+    for start in range(0, len(keys), TOKEN_BATCH_SIZE):
+        # model -> {id(text): text} still to be counted, and who needs which count
+        to_count = defaultdict(dict)  # type: Dict[str, Dict[int, str]]
+        wanted = []  # type: List[Tuple[FileInfo, str, str, str]]
+        for path, limit in keys[start:start + TOKEN_BATCH_SIZE]:
+            raw, content_hash = read_source(path, limit)
+            done = {}  # type: Dict[tuple, str]
+            for position, fileinfo in users[(path, limit)]:
+                config = configs[position]
+                fileinfo.content_hash = content_hash
+                processors, chain_keys = chain_for(position, fileinfo.path)
+                fileinfo.processed_content = _run_shared_chain(raw, fileinfo.path, processors, chain_keys, done)
+                if config.count_tokens:
+                    model = config.token_model
+                    to_count[model][id(raw)] = raw
+                    to_count[model][id(fileinfo.processed_content)] = fileinfo.processed_content
+                    wanted.append((fileinfo, model, raw, fileinfo.processed_content))
+
+        counts = {}  # type: Dict[Tuple[str, int], int]
+        for model, texts in to_count.items():
+            ids = list(texts)
+            for text_id, count in zip(ids, tokencount_batch([texts[i] for i in ids], model=model)):
+                counts[(model, text_id)] = count
+        for fileinfo, model, raw, content in wanted:
+            fileinfo.pre_tokens = counts[(model, id(raw))]
+            fileinfo.post_tokens = counts[(model, id(content))]
+
+
+def _processor_key(processor: object) -> object:
+    # Processors without a fingerprint() are never shared
+    return processor.fingerprint() if hasattr(processor, "fingerprint") else ("id", id(processor))
+
+
+def _run_shared_chain(
+    raw: str,
+    path: str,
+    processors: Sequence[object],
+    keys: Tuple[object, ...],
+    done: Dict[tuple, str]
+) -> str:
+    """
+    Run 'processors' over 'raw', reusing the output of the longest prefix of
+    the chain that already ran on this file (as recorded in 'done', keyed by
+    path and the processors' keys, see _processor_key).
+    """
+    content = raw
+    start = 0
+    for end in range(len(processors), 0, -1):
+        cached = done.get((path,) + keys[:end])
+        if cached is not None:
+            content, start = cached, end
+            break
+    for position in range(start, len(processors)):
+        content = processors[position].process(content, path)
+        done[(path,) + keys[:position + 1]] = content
+    return content
+
+
+def _mark_duplicates(files: List[FileInfo], config: SummaryConfig) -> None:
+    # Same result as config.dedupe gives in generate_summary
+    by_path = {fi.path: fi for fi in files}
+    for path, original in find_duplicates(files, config).items():
+        copy_duplicate(by_path[path], by_path[original])
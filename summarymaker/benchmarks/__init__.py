@@ -0,0 +1,9 @@
+# danai/summarymaker/benchmarks/__init__.py
+"""
+Benchmarks for the summarymaker, runnable locally.
+
+- processors: regex vs tokenize-based Python processors.
+- phases: per-phase timings of generate_summary on a synthetic tree.
+- asyncreads: sequential vs concurrent reads under simulated latency.
+- synthetic: deterministic synthetic-tree generator used by the above.
+"""
@@ -0,0 +1,65 @@
+# danai/summarymaker/benchmarks/asyncreads.py
+"""
+Compares sequential and async_reads file reading on a synthetic tree, with
+simulated per-read latency standing in for a network mount.
+
+Run with:
+    python -m summarymaker.benchmarks.asyncreads [latency_ms] [concurrency ...]
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Sequence
+
+from ..asyncreader import simulated_read_latency
+from ..config import SummaryConfig
+from ..main import generate_summary
+from .phases import default_processors
+from .synthetic import SyntheticTreeSpec, generate_tree
+
+
+def time_reads(root: str, output_path: str, latency_s: float, async_reads: int) -> float:
+    """
+    Wall time of one quiet generate_summary run with the given async_reads.
+    """
+    config = SummaryConfig(
+        base_directories=[root],
+        processors=default_processors(),
+        output_path=output_path,
+        async_reads=async_reads,
+        quiet=True,
+    )
+    with simulated_read_latency(latency_s), contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        generate_summary(config)
+        return time.perf_counter() - start
+
+
+def compare(latency_s: float, concurrencies: Sequence[int]) -> List[Dict[str, object]]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "tree")
+        generate_tree(root, SyntheticTreeSpec(depth=2, fanout=4, files_per_dir=10))
+        output_path = os.path.join(tmp, "summaries")
+        for async_reads in [0] + list(concurrencies):
+            results.append({
+                "latency_ms": latency_s * 1000,
+                "async_reads": async_reads,
+                "wall_s": time_reads(root, output_path, latency_s, async_reads),
+            })
+    return results
+
+
+def main(argv: Sequence[str]) -> None:
+    latency_ms = float(argv[0]) if argv else 5.0
+    concurrencies = [int(a) for a in argv[1:]] or [4, 16, 64]
+    print(json.dumps(compare(latency_ms / 1000, concurrencies), indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
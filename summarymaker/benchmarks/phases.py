@@ -0,0 +1,232 @@
+# danai/summarymaker/benchmarks/phases.py
+"""
+Times each phase of generate_summary separately on a synthetic tree:
+walk, read, each processor, token counting, tree render and summary write,
+plus the whole run end to end.
+
+Every phase reports its best-of-N wall time, throughput (files/s and MB/s
+over the data it handles) and peak traced memory. Results are JSON, and a
+previous result file can be passed to --compare to get per-phase ratios.
+
+Run with:
+    python -m summarymaker.benchmarks.phases [--depth 3 --fanout 4 ...] [--output result.json]
+    python -m summarymaker.benchmarks.phases --compare baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ..config import SummaryConfig
+from ..filtering.dirindex import DirectoryIndex
+from ..filtering.filters import FileInfo, collect_included_files
+from ..main import generate_summary
+from ..output.summary_generator import SummaryGenerator
+from ..output.tree_generator import TreeGenerator
+from ..processing import RemoveCommentsProcessor, TruncateProcessor
+from ..reading import read_limit, read_source
+from ..tcounter import tokencount_batch
+from .synthetic import SyntheticTreeSpec, generate_tree
+
+
+def default_processors() -> List[object]:
+    return [
+        RemoveCommentsProcessor(extensions=["py", "js"]),
+        TruncateProcessor(rules={}, default=300),
+    ]
+
+
+def measure(fn: Callable[[], object], repeat: int, trace_memory: bool) -> Dict[str, Optional[float]]:
+    """
+    Best-of-'repeat' wall time for fn(), then (optionally) one more traced
+    call for its peak Python memory. Timing runs never have tracing enabled.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    peak = None  # type: Optional[int]
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"wall_s": best, "peak_bytes": peak}
+
+
+def run_phases(
+    root: str,
+    output_path: str,
+    processors: Sequence[object],
+    repeat: int = 3,
+    trace_memory: bool = True,
+    token_model: str = "gpt-4o"
+) -> Dict[str, Dict[str, object]]:
+    """
+    Time each phase over the tree at 'root'. Each phase runs on the output of
+    the one before it, computed once outside the timed region.
+    """
+    config = SummaryConfig(
+        base_directories=[root],
+        processors=list(processors),
+        output_path=output_path,
+        token_model=token_model,
+    )
+    phases = {}  # type: Dict[str, Dict[str, object]]
+
+    def record(name: str, fn: Callable[[], object], files: int, nbytes: int) -> None:
+        result = measure(fn, repeat, trace_memory)
+        wall = result["wall_s"]
+        phases[name] = {
+            "wall_s": wall,
+            "files": files,
+            "bytes": nbytes,
+            "files_per_s": files / wall if wall else None,
+            "mb_per_s": nbytes / wall / 1e6 if wall else None,
+            "peak_bytes": result["peak_bytes"],
+        }
+
+    def walk() -> List[FileInfo]:
+        return collect_included_files(config, DirectoryIndex.build(config))
+
+    included = walk()
+    paths = [fi.path for fi in included]
+    raw_bytes = sum(os.path.getsize(p) for p in paths)
+    record("walk", walk, len(paths), 0)
+
+    limit = read_limit(config)
+    raws = [read_source(p, limit)[0] for p in paths]
+    record("read", lambda: [read_source(p, limit) for p in paths], len(paths), raw_bytes)
+
+    contents = raws
+    for position, processor in enumerate(config.processors):
+        inputs = contents
+        nbytes = sum(len(c.encode("utf-8")) for c in inputs)
+        record(
+            f"process:{position}:{type(processor).__name__}",
+            lambda: [processor.process(c, p) for c, p in zip(inputs, paths)],
+            len(paths),
+            nbytes,
+        )
+        contents = [processor.process(c, p) for c, p in zip(inputs, paths)]
+
+    changed = [c for c, r in zip(contents, raws) if c != r]
+    token_bytes = sum(len(t.encode("utf-8")) for t in raws + changed)
+    record(
+        "token_count",
+        lambda: (tokencount_batch(raws, token_model), tokencount_batch(changed, token_model)),
+        len(paths),
+        token_bytes,
+    )
+    for fi, content in zip(included, contents):
+        fi.processed_content = content
+
+    index = DirectoryIndex.build(config)
+    record("tree", lambda: TreeGenerator.generate(config, included, index), len(paths), 0)
+
+    summary_bytes = sum(len(c.encode("utf-8")) for c in contents)
+    record("summary_write", lambda: SummaryGenerator.generate(config, included), len(paths), summary_bytes)
+
+    def end_to_end() -> None:
+        # generate_summary reports per-file counts on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_summary(config)
+
+    record("end_to_end", end_to_end, len(paths), raw_bytes)
+    return phases
+
+
+def compare_results(current: Dict[str, object], baseline: Dict[str, object]) -> Dict[str, Dict[str, object]]:
+    """
+    Per-phase wall time and peak memory ratios (current / baseline).
+    Ratios above 1 are regressions.
+    """
+    out = {}  # type: Dict[str, Dict[str, object]]
+    for name, now in current["phases"].items():
+        before = baseline.get("phases", {}).get(name)
+        if not before:
+            continue
+        out[name] = {
+            "wall_ratio": now["wall_s"] / before["wall_s"] if before["wall_s"] else None,
+            "peak_ratio": (
+                now["peak_bytes"] / before["peak_bytes"]
+                if now["peak_bytes"] and before["peak_bytes"] else None
+            ),
+        }
+    return out
+
+
+def main(argv: Sequence[str]) -> None:
+    defaults = SyntheticTreeSpec()
+    parser = argparse.ArgumentParser(prog="python -m summarymaker.benchmarks.phases")
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--fanout", type=int, default=defaults.fanout)
+    parser.add_argument("--files-per-dir", type=int, default=defaults.files_per_dir)
+    parser.add_argument("--min-file-bytes", type=int, default=defaults.min_file_bytes)
+    parser.add_argument("--max-file-bytes", type=int, default=defaults.max_file_bytes)
+    parser.add_argument("--binary-ratio", type=float, default=defaults.binary_ratio)
+    parser.add_argument("--ignored-dir-ratio", type=float, default=defaults.ignored_dir_ratio)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--token-model", default="gpt-4o")
+    parser.add_argument("--output", help="write the JSON result here instead of stdout")
+    parser.add_argument("--compare", help="previous JSON result to compare against")
+    args = parser.parse_args(argv)
+
+    spec = SyntheticTreeSpec(
+        depth=args.depth,
+        fanout=args.fanout,
+        files_per_dir=args.files_per_dir,
+        min_file_bytes=args.min_file_bytes,
+        max_file_bytes=args.max_file_bytes,
+        binary_ratio=args.binary_ratio,
+        ignored_dir_ratio=args.ignored_dir_ratio,
+        seed=args.seed,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "tree")
+        tree_stats = generate_tree(root, spec)
+        phases = run_phases(
+            root,
+            os.path.join(tmp, "summaries"),
+            default_processors(),
+            repeat=args.repeat,
+            trace_memory=not args.no_memory,
+            token_model=args.token_model,
+        )
+
+    result = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "spec": spec.as_dict(),
+        "tree": tree_stats,
+        "phases": phases,
+    }  # type: Dict[str, object]
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            result["comparison"] = compare_results(result, json.load(f))
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,107 @@
+# danai/summarymaker/benchmarks/processors.py
+"""
+Compares the tokenize-based PythonStripProcessor against the chain of regex
+processors it replaces, on ordinary and on pathological Python sources.
+
+Run with:
+    python -m summarymaker.benchmarks.processors [file.py ...]
+"""
+
+import json
+import sys
+import time
+from typing import Dict, List, Sequence
+
+from ..processing import (
+    CondenseImportsProcessor,
+    PythonStripProcessor,
+    RemoveCommentsProcessor,
+    RemovePrintStatementsProcessor,
+    RemoveTypingHintsProcessor,
+)
+
+
+def regex_chain() -> List[object]:
+    return [
+        RemoveCommentsProcessor(extensions=["py"]),
+        RemoveTypingHintsProcessor(),
+        RemovePrintStatementsProcessor(),
+        CondenseImportsProcessor(),
+    ]
+
+
+def tokenize_chain() -> List[object]:
+    return [PythonStripProcessor()]
+
+
+def generated_sources(scale: int = 2000) -> Dict[str, str]:
+    """
+    Synthetic sources: ordinary code, plus shapes where the DOTALL regexes
+    either degrade badly or mis-match.
+    """
+    ordinary = "\n".join(
+        f'def func_{i}(a: int, b: str = "x") -> int:\n'
+        f'    """Docstring {i}."""\n'
+        f'    # comment {i}\n'
+        f'    print("value", a, (b, {i}))\n'
+        f'    return a + {i}\n'
+        for i in range(scale)
+    )
+    # 'print(' inside strings with no closing paren anywhere after it: each one
+    # makes the lazy 'print\(.*?\)' scan to the end of the file (quadratic).
+    unclosed_prints = 'x = "print("\n' * (scale * 5)
+    # A lone triple quote in a comment makes '""".*?"""' scan to the end
+    # (and, given a second one, delete the code in between).
+    odd_quotes = '# a stray """ in a comment\n' + "value = 1\n" * (scale * 5)
+    return {
+        "ordinary": ordinary,
+        "unclosed_prints": unclosed_prints,
+        "odd_triple_quote": odd_quotes,
+    }
+
+
+def time_chain(processors: Sequence[object], content: str, filepath: str, repeat: int) -> float:
+    """
+    Best-of-'repeat' wall time, in seconds, to run 'processors' over 'content'.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = content
+        for processor in processors:
+            result = processor.process(result, filepath)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(sources: Dict[str, str], repeat: int = 3) -> List[Dict[str, object]]:
+    """
+    Time both chains over each named source. Returns one result dict per source.
+    """
+    results = []
+    for name, content in sources.items():
+        regex_s = time_chain(regex_chain(), content, "bench.py", repeat)
+        tokenize_s = time_chain(tokenize_chain(), content, "bench.py", repeat)
+        results.append({
+            "source": name,
+            "bytes": len(content.encode("utf-8")),
+            "regex_s": regex_s,
+            "tokenize_s": tokenize_s,
+            "speedup": regex_s / tokenize_s if tokenize_s else None,
+        })
+    return results
+
+
+def main(argv: Sequence[str]) -> None:
+    if argv:
+        sources = {}
+        for path in argv:
+            with open(path, "r", encoding="utf-8") as f:
+                sources[path] = f.read()
+    else:
+        sources = generated_sources()
+    print(json.dumps(compare(sources), indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
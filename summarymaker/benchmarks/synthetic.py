@@ -0,0 +1,127 @@
+# danai/summarymaker/benchmarks/synthetic.py
+"""
+Deterministic generator of synthetic source trees for benchmarking.
+
+The same SyntheticTreeSpec (including its seed) always produces the same
+directory layout, file names and file contents, so timings from separate
+runs are directly comparable.
+"""
+
+import os
+import random
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List
+
+# Text file kinds: extension -> line templates ({i} is the line number)
+_TEXT_KINDS = {
+    ".py": [
+        "def func_{i}(a: int, b: str = 'x') -> int:",
+        "    # comment {i}",
+        "    print('value', a, b)",
+        "    return a + {i}",
+        "",
+    ],
+    ".js": [
+        "function f{i}(a, b) {{",
+        "  // comment {i}",
+        "  /* block {i} */ return a + b;",
+        "}}",
+    ],
+    ".md": [
+        "## Section {i}",
+        "",
+        "Some prose for section {i}, long enough to look like documentation.",
+    ],
+    ".json": [
+        '{{"id": {i}, "name": "item-{i}", "tags": ["a", "b", "c"]}},',
+    ],
+}
+
+# Binary kinds: '.png' is classified by extension, '.bin' has to be sniffed
+_BINARY_EXTENSIONS = [".png", ".bin"]
+
+
+@dataclass
+class SyntheticTreeSpec:
+    """
+    Shape of a synthetic tree.
+
+    depth: levels of directories below the root.
+    fanout: subdirectories per directory.
+    files_per_dir: files written in every directory.
+    min_file_bytes / max_file_bytes: file sizes are drawn uniformly from this range.
+    binary_ratio: share of files that are binary.
+    ignored_dir_ratio: share of directories replaced by an ignored directory
+        (drawn from ignored_dir_names) full of files that should never be read.
+    """
+    depth: int = 3
+    fanout: int = 4
+    files_per_dir: int = 8
+    min_file_bytes: int = 512
+    max_file_bytes: int = 8192
+    binary_ratio: float = 0.1
+    ignored_dir_ratio: float = 0.1
+    ignored_dir_names: List[str] = field(default_factory=lambda: ["node_modules", "__pycache__", ".git"])
+    seed: int = 0
+
+    def as_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+def generate_tree(root: str, spec: SyntheticTreeSpec) -> Dict[str, int]:
+    """
+    Write a synthetic tree for 'spec' under 'root' (created if missing; it
+    should be empty). Returns counts of what was written.
+    """
+    rng = random.Random(spec.seed)
+    stats = {"dirs": 0, "ignored_dirs": 0, "text_files": 0, "binary_files": 0, "bytes": 0}
+
+    stack = [(root, 0, False)]
+    while stack:
+        path, level, ignored = stack.pop()
+        os.makedirs(path, exist_ok=True)
+        stats["ignored_dirs" if ignored else "dirs"] += 1
+
+        for n in range(spec.files_per_dir):
+            size = rng.randint(spec.min_file_bytes, spec.max_file_bytes)
+            if rng.random() < spec.binary_ratio:
+                ext = rng.choice(_BINARY_EXTENSIONS)
+                data = _binary_content(rng, size)
+                stats["binary_files"] += 1
+            else:
+                ext = rng.choice(sorted(_TEXT_KINDS))
+                data = _text_content(ext, size)
+                stats["text_files"] += 1
+            with open(os.path.join(path, f"file_{n}{ext}"), "wb") as f:
+                f.write(data)
+            stats["bytes"] += len(data)
+
+        if level >= spec.depth or ignored:
+            continue
+        for n in range(spec.fanout):
+            if rng.random() < spec.ignored_dir_ratio:
+                name = rng.choice(spec.ignored_dir_names)
+                # Several ignored dirs may share a name; keep them apart
+                stack.append((os.path.join(path, f"pkg_{n}", name), level + 1, True))
+            else:
+                stack.append((os.path.join(path, f"dir_{n}"), level + 1, False))
+
+    return stats
+
+
+def _text_content(ext: str, size: int) -> bytes:
+    templates = _TEXT_KINDS[ext]
+    lines = []  # type: List[str]
+    total = 0
+    i = 0
+    while total < size:
+        line = templates[i % len(templates)].format(i=i)
+        lines.append(line)
+        total += len(line) + 1
+        i += 1
+    return "\n".join(lines).encode("utf-8")[:size]
+
+
+def _binary_content(rng: random.Random, size: int) -> bytes:
+    # A NUL early on, as real binaries have, then random bytes
+    return b"\x89BIN\x00" + bytes(rng.getrandbits(8) for _ in range(max(size - 5, 0)))
@@ -0,0 +1,122 @@
+# danai/summarymaker/budget.py
+"""
+Fits the summary into a global token budget (SummaryConfig.max_total_tokens).
+"""
+
+import fnmatch
+import os
+from typing import Callable, Dict, List
+
+from .config import SummaryConfig
+from .filtering.filters import FileInfo
+from .output.summary_generator import SUMMARY_HEADER, _make_rel_path, summary_entry_parts
+from .processing.tokentruncator import truncate_with_marker
+from .tcounter import tokencount_batch, tokencount_text
+
+BUDGET_POLICIES = ("smallest_first", "path_weights", "recency")
+
+# A file is only truncated into the leftover budget if at least this many
+# tokens of its content would survive; otherwise it is left out.
+MIN_TRUNCATED_TOKENS = 32
+
+
+def apply_token_budget(files: List[FileInfo], config: SummaryConfig) -> Dict[str, int]:
+    """
+    Decide which files make it into summary.md within config.max_total_tokens.
+
+    Files are admitted whole, in budget_policy order, as long as they fit
+    (including their '## path' / code fence wrapper). Once everything that fits
+    has been admitted, the highest-priority file that did not fit is truncated
+    to fill the remaining budget. Every other file is marked as omitted, and
+    so is every duplicate (see SummaryConfig.dedupe) of an omitted file.
+
+    Returns counts of 'kept', 'truncated' and 'omitted' files, plus the
+    'used' token estimate.
+    """
+    budget = config.max_total_tokens
+    model = config.token_model
+    if config.budget_policy not in BUDGET_POLICIES:
+        raise ValueError(f"Unknown budget_policy {config.budget_policy!r}, expected one of {BUDGET_POLICIES}")
+
+    candidates = [fi for fi in files if _is_written(fi, config)]
+    wrappers = [prefix + suffix for prefix, suffix in (summary_entry_parts(fi, config) for fi in candidates)]
+    overheads = dict(zip((fi.path for fi in candidates), tokencount_batch(wrappers, model)))
+
+    remaining = budget - tokencount_text(SUMMARY_HEADER, model)
+    skipped = []  # type: List[FileInfo]
+    kept = 0
+    for fi in sorted(candidates, key=_priority_key(config)):
+        cost = fi.post_tokens + overheads[fi.path]
+        if cost <= remaining:
+            remaining -= cost
+            kept += 1
+        else:
+            skipped.append(fi)
+
+    truncated = 0
+    if skipped:
+        first = skipped[0]
+        room = remaining - overheads[first.path]
+        if room >= MIN_TRUNCATED_TOKENS:
+            first.processed_content = truncate_with_marker(first.processed_content, room, model)
+            first.post_tokens = tokencount_text(first.processed_content, model)
+            remaining -= first.post_tokens + overheads[first.path]
+            skipped = skipped[1:]
+            truncated = 1
+
+    # A duplicate is only a reference to its original, so it goes wherever its
+    # original goes; its wrapper tokens are given back
+    dropped = {fi.path for fi in skipped}
+    orphans = [fi for fi in candidates if fi.duplicate_of in dropped and fi.path not in dropped]
+    for fi in orphans:
+        remaining += fi.post_tokens + overheads[fi.path]
+        if truncated and fi is first:
+            truncated = 0
+        else:
+            kept -= 1
+
+    for fi in skipped + orphans:
+        fi.omitted = True
+
+    return {
+        "kept": kept,
+        "truncated": truncated,
+        "omitted": len(skipped) + len(orphans),
+        "used": budget - remaining,
+    }
+
+
+def _is_written(fi: FileInfo, config: SummaryConfig) -> bool:
+    # Empty files that SummaryGenerator would skip cost nothing
+    if fi.duplicate_of:
+        return True
+    return not (config.exclude_empty_files_from_summary and not fi.processed_content.strip())
+
+
+def _priority_key(config: SummaryConfig) -> Callable[[FileInfo], tuple]:
+    """
+    Sort key for budget_policy; lower sorts first, ties broken by size then path.
+    """
+    if config.budget_policy == "path_weights":
+        weights = list(config.budget_path_weights.items())
+
+        def path_weight(fi: FileInfo) -> float:
+            rel = _make_rel_path(fi.path, config).replace(os.sep, "/")
+            matched = [w for pattern, w in weights if fnmatch.fnmatch(rel, pattern)]
+            return max(matched) if matched else 1.0
+
+        return lambda fi: (-path_weight(fi), fi.post_tokens, fi.path)
+
+    if config.budget_policy == "recency":
+        return lambda fi: (-_mtime_ns(fi), fi.post_tokens, fi.path)
+
+    return lambda fi: (fi.post_tokens, fi.path)
+
+
+def _mtime_ns(fi: FileInfo) -> int:
+    if fi.mtime_ns:
+        return fi.mtime_ns
+    try:
+        return os.stat(fi.path).st_mtime_ns
+    except OSError:
+        return 0
@@ -5,7 +5,7 @@ Defines configuration objects and defaults for the summarymaker.
 
 import os
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 @dataclass
 class SummaryConfig:
@@ -21,6 +21,13 @@ class SummaryConfig:
 
     # Optional separate scope for the directory tree. If None or empty, we use base_directories
     tree_directories: Optional[List[str]] = None
+    # Limits for tree.md (None => unlimited). Directories deeper than
+    # tree_max_depth (1 => only the entries directly under each tree directory)
+    # are not expanded, and directories with more than tree_max_entries_per_dir
+    # entries only list that many. Whatever is left out is summarised in one
+    # line, e.g. "… 2 more directories, 120 more files (4.2 MB)".
+    tree_max_depth: Optional[int] = None
+    tree_max_entries_per_dir: Optional[int] = None
 
     fully_ignored_dirs: List[str] = field(default_factory=lambda: ["__pycache__", ".git", ".idea"])
     partially_ignored_dirs: List[str] = field(default_factory=lambda: ["venv", "node_modules"])
@@ -29,8 +36,108 @@ class SummaryConfig:
     ignored_files: List[str] = field(default_factory=lambda: [".DS_Store"])
     only_include: List[str] = field(default_factory=list)
 
+    # Where the files come from: "walk" lists the directories, "git" lists the
+    # files tracked in git's index under each directory (which must be inside a
+    # git work tree), so untracked and ignored files never show up.
+    file_source: str = "walk"
+    # Only summarise files added or modified since the merge base of HEAD and
+    # this ref (e.g. "origin/main"), including uncommitted changes and untracked
+    # files. Implies file_source="git"; the tree shows the same files.
+    changed_since: Optional[str] = None
+
+    # Extra .gitignore-style patterns (e.g. "build/", "*.min.js", "/docs/**/*.png"),
+    # applied relative to each scanned directory root. Matching paths are left out
+    # of both the summary and the tree, and ignored directories are never scanned.
+    ignore_patterns: List[str] = field(default_factory=list)
+    # Also honour .gitignore files found while scanning.
+    use_gitignore: bool = False
+
+    # Size cap for included files, in bytes (None => no cap). Oversized files are
+    # either skipped ("skip") or only their first max_file_bytes are read ("head").
+    max_file_bytes: Optional[int] = None
+    oversize_files: str = "skip"
+    # Files larger than this many bytes are read lazily, line by line, when the
+    # processor chain starts with line-oriented processors that truncate them:
+    # reading stops once the line limit is reached. Their pre_tokens are then
+    # estimated from the part that was read (None => always read files whole).
+    bounded_read_bytes: Optional[int] = None
+
     processors: List[object] = field(default_factory=list)
+    # Run consecutive line-oriented processors (comment removal, truncation) as one
+    # pass over each file's lines instead of one full pass per processor.
+    fuse_processors: bool = False
     generate_tree: bool = True
     generate_summarydoc: bool = True
     exclude_empty_files_from_summary: bool = False
-    output_path: str = "summaries"
\ No newline at end of file
+    output_path: str = "summaries"
+
+    # Total token budget for summary.md (None => unlimited). Files are admitted in
+    # budget_policy order: "smallest_first", "path_weights" (highest weight from
+    # budget_path_weights first, keyed by glob on the relative path, default 1.0)
+    # or "recency" (most recently modified first). Files that do not fit are left
+    # out, except the first one, which is truncated to fill what is left.
+    max_total_tokens: Optional[int] = None
+    budget_policy: str = "smallest_first"
+    budget_path_weights: Dict[str, float] = field(default_factory=dict)
+
+    # Write the summary as numbered shards (summary-001.md, ...) of at most this
+    # many tokens each, plus summary-index.json mapping every file to its shard
+    # and byte offset, instead of one summary.md (None => one file). Files are
+    # never split, and a directory's files share a shard wherever they fit.
+    shard_max_tokens: Optional[int] = None
+
+    # Summary format: "markdown" (summary.md) or "jsonl" (summary.jsonl, one JSON
+    # record per file with its path, size, hash, token counts and processed
+    # content, plus summary.jsonl.idx with each record's byte offset). JSONL can
+    # be compressed with summary_compression "gzip" or "zstd" (needs the
+    # zstandard package), in blocks that can each be decompressed on their own.
+    summary_format: str = "markdown"
+    summary_compression: Optional[str] = None
+
+    # Number of worker processes used to read/process/count files.
+    # 1 keeps everything in-process; 0 uses one worker per CPU.
+    workers: int = 1
+
+    # Read files concurrently, with up to this many reads in flight on a thread
+    # pool driven by asyncio, to hide storage latency (e.g. on network mounts).
+    # 0 reads one file at a time. Used in-process only (workers == 1), and files
+    # are always read whole (bounded_read_bytes does not apply).
+    async_reads: int = 0
+
+    # Model whose tokeniser is used for the pre/post token counts.
+    token_model: str = "gpt-4o"
+    # Count pre/post tokens per file. When off, tiktoken is never loaded and
+    # all counts are reported as 0 (max_total_tokens needs counts).
+    count_tokens: bool = True
+
+    # Process and count each distinct file content once. Byte-identical copies
+    # (that the processors would treat alike) are shown in the summary as a
+    # reference to the first copy by path.
+    dedupe: bool = False
+
+    # SQLite file of processed results keyed by content hash and processor chain,
+    # shared by every run, config and checkout that points at it, e.g.
+    # "~/.cache/danai/results.sqlite" (None => off). Least recently used results
+    # are evicted once it holds more than result_cache_max_bytes of content.
+    result_cache: Optional[str] = None
+    result_cache_max_bytes: int = 512 * 1024 * 1024
+
+    # Keep a manifest in output_path and reuse results for unchanged files.
+    # Output files are only rewritten when their content actually changes.
+    incremental: bool = False
+
+    # Process files in sorted order and write each one straight to summary.md,
+    # releasing its content afterwards, so memory stays flat for huge trees.
+    # Not with incremental, though: the manifest keeps every file's processed
+    # content in memory (result_cache is the disk-backed alternative).
+    streaming: bool = False
+
+    # Don't print a line per file (totals are still printed).
+    quiet: bool = False
+    # Time every processor call and every file, and count the tokens each
+    # processor saves. Processors then run unfused, one call at a time.
+    instrument: bool = False
+    # Write the run report as report.json next to summary.md.
+    report_json: bool = False
+    # Deep-dive capture for the whole run: "cprofile" or "tracemalloc" (None => off).
+    profile: Optional[str] = None
@@ -0,0 +1,98 @@
+# danai/summarymaker/dedupe.py
+"""
+Content-addressed deduplication of included files (SummaryConfig.dedupe).
+
+Only files that share their size with another file are hashed. Files with the
+same content hash and the same processor dedup keys (see
+BaseProcessor.dedup_key) are duplicates; the first one by path is processed
+and the rest are shown as references to it.
+"""
+
+import os
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from .config import SummaryConfig
+from .filtering.filters import FileInfo
+from .manifest import hash_file
+
+
+def find_duplicates(files: List[FileInfo], config: SummaryConfig) -> Dict[str, str]:
+    """
+    Map the path of every duplicate file to the path of the copy it duplicates.
+    Empty files are never treated as duplicates.
+    """
+    by_size = defaultdict(list)  # type: Dict[int, List[str]]
+    for fi in files:
+        try:
+            size = os.path.getsize(fi.path)
+        except OSError:
+            continue
+        if size:
+            by_size[size].append(fi.path)
+
+    groups = defaultdict(list)  # type: Dict[Tuple[str, tuple], List[str]]
+    for paths in by_size.values():
+        if len(paths) < 2:
+            continue
+        for path in paths:
+            try:
+                digest = hash_file(path)
+            except OSError:
+                continue
+            groups[(digest, processing_key(path, config))].append(path)
+
+    duplicates = {}  # type: Dict[str, str]
+    for paths in groups.values():
+        if len(paths) < 2:
+            continue
+        paths.sort()
+        for path in paths[1:]:
+            duplicates[path] = paths[0]
+    return duplicates
+
+
+def processing_key(path: str, config: SummaryConfig) -> tuple:
+    """
+    What the processor chain makes of 'path', as far as it matters for its output.
+    Processors without a dedup_key() are keyed on the full path, so files are
+    never merged across them.
+    """
+    keys = []
+    for processor in config.processors:
+        dedup_key = getattr(processor, "dedup_key", None)
+        keys.append(dedup_key(path) if dedup_key is not None else path)
+    return tuple(keys)
+
+
+def copy_duplicate(duplicate: FileInfo, original: FileInfo) -> FileInfo:
+    """
+    Fill in a duplicate from its processed original. Its processed content
+    stays empty, as only the reference is written to the summary.
+    """
+    duplicate.duplicate_of = original.path
+    duplicate.content_hash = original.content_hash
+    duplicate.pre_tokens = original.pre_tokens
+    duplicate.post_tokens = 0
+    duplicate.processed_content = ""
+    return duplicate
+
+
+def dedupe_savings(files: List[FileInfo]) -> Dict[str, int]:
+    """
+    How many duplicates there were, and the bytes that were not processed and
+    the tokens that were not written again because of them.
+    """
+    by_path = {fi.path: fi for fi in files}
+    duplicates = [fi for fi in files if fi.duplicate_of]
+    bytes_saved = 0
+    for fi in duplicates:
+        try:
+            bytes_saved += os.path.getsize(fi.path)
+        except OSError:
+            pass
+    return {
+        "duplicates": len(duplicates),
+        "bytes_saved": bytes_saved,
+        "tokens_saved": sum(by_path[fi.duplicate_of].post_tokens for fi in duplicates),
+    }
@@ -0,0 +1,290 @@
+# danai/summarymaker/filtering/dirindex.py
+"""
+Single-pass, os.scandir-based index of the directories a run needs.
+
+The index is built once per run and shared by the filtering stage and the
+tree generator, so every directory is listed exactly once. Entry types come
+from the scandir results, and file sizes/mtimes are fetched lazily and cached.
+Paths matched by config.ignore_patterns or (optionally) .gitignore files are
+dropped while scanning, so ignored subtrees are never listed at all.
+
+With config.file_source = "git" (or config.changed_since), the index is built
+from the file list git reports instead of from directory listings.
+"""
+
+import os
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ..config import SummaryConfig
+from .gitsource import FILE_SOURCES, git_files
+from .matcher import IgnoreRules, is_ignored
+
+
+class FileEntry:
+    """
+    A single non-directory entry. size and mtime_ns trigger one stat() on
+    first access and are cached afterwards.
+    """
+    __slots__ = ("name", "path", "_stat")
+
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        self._stat = None  # type: Optional[os.stat_result]
+
+    def _ensure_stat(self) -> Optional[os.stat_result]:
+        if self._stat is None:
+            try:
+                self._stat = os.stat(self.path)
+            except OSError:
+                # Broken symlinks and vanished files report as empty
+                return None
+        return self._stat
+
+    @property
+    def size(self) -> int:
+        st = self._ensure_stat()
+        return st.st_size if st else 0
+
+    @property
+    def mtime_ns(self) -> int:
+        st = self._ensure_stat()
+        return st.st_mtime_ns if st else 0
+
+
+class IndexedDir:
+    """
+    Listing of a single scanned directory.
+
+    'subdirs' are directories that were scanned as well (or are symlinks to
+    directories, which are listed but never followed). 'omitted' are
+    partially-ignored directories, shown in the tree but never scanned.
+    Fully-ignored directories are left out altogether.
+    """
+    __slots__ = ("path", "subdirs", "omitted", "files")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.subdirs = []  # type: List[str]
+        self.omitted = []  # type: List[str]
+        self.files = []  # type: List[FileEntry]
+
+
+class DirectoryIndex:
+    """
+    Absolute directory path -> IndexedDir, for every directory under the scan roots.
+    """
+
+    def __init__(self, config: SummaryConfig):
+        self.fully_ignored = frozenset(config.fully_ignored_dirs)
+        self.partially_ignored = frozenset(config.partially_ignored_dirs)
+        self.ignore_patterns = list(config.ignore_patterns)
+        self.use_gitignore = config.use_gitignore
+        if config.file_source not in FILE_SOURCES:
+            raise ValueError(f"Unknown file_source {config.file_source!r}, expected one of {FILE_SOURCES}")
+        self.changed_since = config.changed_since
+        self.from_git = config.file_source == "git" or config.changed_since is not None
+        self.dirs = {}  # type: Dict[str, IndexedDir]
+        # Ignore rules each scanned directory inherited, and the ones it passes
+        # on to its children, so single directories can be re-scanned later
+        self._inherited = {}  # type: Dict[str, Tuple[IgnoreRules, ...]]
+        self._passed_on = {}  # type: Dict[str, Tuple[IgnoreRules, ...]]
+
+    @classmethod
+    def build(cls, config: SummaryConfig) -> "DirectoryIndex":
+        """
+        Scan every base directory and tree directory of 'config' once.
+        """
+        index = cls(config)
+        index.scan(list(config.base_directories) + list(config.tree_directories or []))
+        return index
+
+    def scan(self, roots: Sequence[str]) -> None:
+        """
+        Index each root (and everything below it that is not ignored).
+        Directories that are already indexed are not listed again.
+        """
+        for root in roots:
+            root_abs = os.path.abspath(root)
+            root_rules = IgnoreRules(root_abs, self.ignore_patterns)
+            if self.from_git:
+                self._scan_git(root_abs, root_rules)
+            else:
+                self._scan_tree([(root_abs, (root_rules,) if root_rules else ())])
+
+    def _scan_git(self, root_abs: str, root_rules: IgnoreRules) -> None:
+        """
+        Index the files git lists under 'root_abs', applying the same
+        directory and pattern rules a directory scan would.
+        """
+        if root_abs in self.dirs:
+            return
+        rules_chain = (root_rules,) if root_rules else ()
+        self.dirs[root_abs] = IndexedDir(root_abs)
+        known = set()  # type: Set[str]
+        for rel_path in git_files(root_abs, self.changed_since):
+            parts = rel_path.split("/")
+            parent = self.dirs[root_abs]
+            path = root_abs
+            for name in parts[:-1]:
+                child = os.path.join(path, name)
+                if name in self.fully_ignored or (rules_chain and is_ignored(rules_chain, child, True)):
+                    parent = None
+                    break
+                if name in self.partially_ignored:
+                    if child not in known:
+                        known.add(child)
+                        parent.omitted.append(name)
+                    parent = None
+                    break
+                if child not in known:
+                    known.add(child)
+                    parent.subdirs.append(name)
+                    self.dirs[child] = IndexedDir(child)
+                parent = self.dirs[child]
+                path = child
+            if parent is None:
+                continue
+            file_path = os.path.join(path, parts[-1])
+            if rules_chain and is_ignored(rules_chain, file_path, False):
+                continue
+            parent.files.append(FileEntry(parts[-1], file_path))
+
+    def _scan_tree(self, stack: List[Tuple[str, Tuple[IgnoreRules, ...]]]) -> None:
+        while stack:
+            path, inherited = stack.pop()
+            if path in self.dirs:
+                continue
+            indexed, rules_chain = self._scan_dir(path, inherited)
+            if indexed is None:
+                continue
+            self.dirs[path] = indexed
+            self._inherited[path] = inherited
+            self._passed_on[path] = rules_chain
+            # Reverse so the walk order matches a top-down os.walk
+            for name in reversed(indexed.subdirs):
+                stack.append((os.path.join(path, name), rules_chain))
+
+    def refresh(self, path: str) -> List[str]:
+        """
+        Re-list one already indexed directory after its entries changed.
+        New subdirectories are scanned and vanished ones dropped (with
+        everything below them); if the directory's .gitignore changed, its
+        whole subtree is re-scanned. Returns every directory that was
+        re-listed, added or dropped.
+        """
+        inherited = self._inherited.get(path)
+        if inherited is None:
+            return []
+        old = self.dirs[path]
+        indexed, rules_chain = self._scan_dir(path, inherited)
+        if indexed is None:
+            return self._drop_tree(path)
+
+        touched = [path]
+        if rules_chain != self._passed_on[path]:
+            # Different ignore rules below here: everything has to be re-scanned
+            touched += self._drop_tree(path)
+            stale = []  # type: List[str]
+        else:
+            stale = [name for name in old.subdirs if name not in indexed.subdirs]
+        for name in stale:
+            touched += self._drop_tree(os.path.join(path, name))
+
+        self.dirs[path] = indexed
+        self._inherited[path] = inherited
+        self._passed_on[path] = rules_chain
+        for name in indexed.subdirs:
+            child = os.path.join(path, name)
+            if child not in self.dirs:
+                touched.append(child)
+                self._scan_tree([(child, rules_chain)])
+        return touched
+
+    def _drop_tree(self, path: str) -> List[str]:
+        prefix = path + os.sep
+        dropped = [p for p in self.dirs if p == path or p.startswith(prefix)]
+        for p in dropped:
+            del self.dirs[p]
+            self._inherited.pop(p, None)
+            self._passed_on.pop(p, None)
+        return dropped
+
+    def _scan_dir(
+        self,
+        path: str,
+        rules_chain: Tuple[IgnoreRules, ...]
+    ) -> Tuple[Optional[IndexedDir], Tuple[IgnoreRules, ...]]:
+        """
+        List one directory, returning its IndexedDir and the ignore rules that
+        apply to its children (the inherited chain plus its own .gitignore).
+        """
+        try:
+            with os.scandir(path) as scandir_it:
+                entries = list(scandir_it)
+        except OSError:
+            return None, rules_chain
+
+        if self.use_gitignore:
+            for entry in entries:
+                if entry.name == ".gitignore":
+                    rules = IgnoreRules.from_file(path, entry.path)
+                    if rules:
+                        rules_chain = rules_chain + (rules,)
+                    break
+
+        indexed = IndexedDir(path)
+        symlinked = []  # type: List[str]
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if rules_chain and is_ignored(rules_chain, entry.path, is_dir):
+                continue
+
+            if not is_dir:
+                indexed.files.append(FileEntry(entry.name, entry.path))
+            elif entry.name in self.fully_ignored:
+                continue
+            elif entry.name in self.partially_ignored:
+                indexed.omitted.append(entry.name)
+            else:
+                indexed.subdirs.append(entry.name)
+                if entry.is_symlink():
+                    symlinked.append(entry.name)
+
+        # Symlinked directories are listed but, like os.walk, never followed
+        for name in symlinked:
+            self.dirs.setdefault(os.path.join(path, name), IndexedDir(os.path.join(path, name)))
+        return indexed, rules_chain
+
+    def scanned_dirs(self) -> List[str]:
+        """
+        Every directory that was actually listed (not symlinked directories,
+        which are indexed without being followed).
+        """
+        return list(self._inherited)
+
+    def get(self, path: str) -> Optional[IndexedDir]:
+        return self.dirs.get(path)
+
+    def walk(self, top: str) -> Iterator[Tuple[str, IndexedDir]]:
+        """
+        Top-down walk over indexed directories below 'top', like os.walk.
+        Yields (root, IndexedDir) where root is built from 'top' exactly as given,
+        so relative base directories yield relative paths.
+        """
+        top_abs = os.path.abspath(top)
+        if top_abs not in self.dirs:
+            self.scan([top])
+        stack = [(top, top_abs)]
+        while stack:
+            root, root_abs = stack.pop()
+            indexed = self.dirs.get(root_abs)
+            if indexed is None:
+                continue
+            yield root, indexed
+            for name in reversed(indexed.subdirs):
+                stack.append((os.path.join(root, name), os.path.join(root_abs, name)))
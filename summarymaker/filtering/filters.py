@@ -3,12 +3,15 @@
 Handles logic for including or excluding directories/files.
 """
 
+import codecs
 import os
 import mimetypes
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, Iterator, List, Optional
 
 from ..config import SummaryConfig
+from .dirindex import DirectoryIndex
+from .matcher import FileMatcher
 
 @dataclass
 class FileInfo:
@@ -18,79 +21,128 @@ class FileInfo:
     """
     path: str
     processed_content: str = ""
-
-def collect_included_files(config: SummaryConfig) -> List[FileInfo]:
+    pre_tokens: int = 0
+    post_tokens: int = 0
+    size: int = 0
+    mtime_ns: int = 0
+    content_hash: str = ""
+    # Left out of the summary (e.g. it did not fit max_total_tokens)
+    omitted: bool = False
+    # Path of an identical file this one is shown as a reference to (see config.dedupe)
+    duplicate_of: str = ""
+
+def collect_included_files(config: SummaryConfig, index: Optional[DirectoryIndex] = None) -> List[FileInfo]:
     """
     Recursively walk each directory in 'config.base_directories', 
     applying ignore/include logic to figure out which files to keep.
     Returns a list of FileInfo objects for included files.
     """
-    included_files: List[FileInfo] = []
+    return list(iter_included_files(config, index))
+
+def iter_included_files(config: SummaryConfig, index: Optional[DirectoryIndex] = None) -> Iterator[FileInfo]:
+    """
+    Lazy version of collect_included_files: yields each included file
+    as soon as the walk reaches it, without building the full list.
 
-    # Ensure output directory doesn't get included
-    output_abs = os.path.abspath(config.output_path)
+    The walk runs over a shared DirectoryIndex (built here if not given),
+    which already leaves out fully- and partially-ignored directories and
+    anything matched by ignore patterns. The name/extension rules are
+    compiled once into a FileMatcher.
+    """
+    if index is None:
+        index = DirectoryIndex.build(config)
+    matcher = FileMatcher(config)
+    skip_oversize = config.max_file_bytes is not None and config.oversize_files == "skip"
+    # summary.jsonl records each file's size; take it from the index's stat
+    # rather than stat-ing every file again while writing
+    record_size = config.summary_format == "jsonl"
 
     for base_dir in config.base_directories:
-        for root, dirs, files in os.walk(base_dir):
-            root_abs = os.path.abspath(root)
-
-            # FULLY-IGNORED directories: remove them from scanning
-            dirs[:] = [d for d in dirs if d not in config.fully_ignored_dirs]
-
-            # PARTIALLY-IGNORED directories: we want them to appear in the tree, 
-            # but we skip scanning inside. So we remove them from 'dirs'.
-            filtered_dirs = []
-            for d in dirs:
-                if d in config.partially_ignored_dirs:
-                    # skip scanning inside
-                    # do not add it to filtered_dirs so os.walk doesn't descend
-                    pass
-                else:
-                    filtered_dirs.append(d)
-            dirs[:] = filtered_dirs
+        for root, indexed in index.walk(base_dir):
+            # Exclude anything in the output folder, one check per directory
+            if matcher.dir_excluded(indexed.path):
+                continue
 
             # For each file in this folder, decide if we keep it
-            for filename in files:
-                file_path = os.path.join(root, filename)
+            for entry in indexed.files:
+                filename = entry.name
                 file_ext = os.path.splitext(filename)[1].lower()
 
-                # Exclude anything in the output folder
-                if output_abs in os.path.abspath(file_path):
+                if not matcher.include_name(filename, file_ext):
                     continue
 
-                # Check ignore-lists
-                if filename in config.ignored_files:
+                # Skip oversized files without opening them (size comes from the index)
+                if skip_oversize and entry.size > config.max_file_bytes:
                     continue
 
-                # Skip ignored extensions unless explicitly allowed
-                if file_ext in config.ignored_file_extensions:
-                    if file_ext not in config.allowed_file_extensions:
-                        continue
-
-                # If only_include is non-empty, skip anything not in that list
-                if config.only_include and file_ext not in config.only_include:
-                    continue
+                file_path = os.path.join(root, filename)
 
                 # Check if file is likely binary (unless exempt)
-                if is_binary_file(file_path, config.allowed_file_extensions):
-                    if file_ext not in config.allowed_file_extensions:
+                if file_ext not in matcher.allowed_extensions:
+                    if is_binary_file(file_path, config.allowed_file_extensions):
                         continue
 
-                included_files.append(FileInfo(path=file_path))
-
-    return included_files
+                yield FileInfo(path=file_path, size=entry.size if record_size else 0)
 
 def is_binary_file(file_path: str, allowed_extensions: List[str]) -> bool:
     """
-    Checks if file is binary using 'mimetypes'. If the extension is
-    explicitly exempted, we treat it as non-binary by definition.
+    Checks if file is binary. If the extension is explicitly exempted,
+    we treat it as non-binary by definition.
+
+    Extensions that 'mimetypes' maps to text/*, to media types or to a
+    compression encoding get a fixed verdict, cached per extension, without
+    the file being opened. Everything else (unknown or extensionless files,
+    application/* types) is decided by sniffing the first few KB.
     """
     _, ext = os.path.splitext(file_path)
     if ext in allowed_extensions:
         return False
 
-    mime_type, _ = mimetypes.guess_type(file_path)
-    if mime_type is None:
-        # If we cannot guess the type, treat as binary
+    verdict = _extension_verdict(ext)
+    if verdict is not None:
+        return verdict
+    return _sniff_binary(file_path)
+
+# Extension -> True (binary) / False (text) / None (must sniff content)
+_EXTENSION_VERDICTS = {}  # type: Dict[str, Optional[bool]]
+
+# Leading bytes inspected when sniffing
+SNIFF_BYTES = 8192
+
+def _extension_verdict(ext: str) -> Optional[bool]:
+    if ext in _EXTENSION_VERDICTS:
+        return _EXTENSION_VERDICTS[ext]
+
+    verdict = None
+    if ext:
+        mime_type, encoding = mimetypes.guess_type("_" + ext)
+        if encoding is not None:
+            # Compressed (gzip, bzip2, xz...)
+            verdict = True
+        elif mime_type is not None:
+            if mime_type.startswith("text/"):
+                verdict = False
+            elif mime_type.split("/")[0] in ("image", "audio", "video", "font") and not mime_type.endswith("+xml"):
+                verdict = True
+
+    _EXTENSION_VERDICTS[ext] = verdict
+    return verdict
+
+def _sniff_binary(file_path: str) -> bool:
+    """
+    Read only the first SNIFF_BYTES: binary if they hold a NUL byte
+    or are not valid UTF-8 (ignoring a multi-byte character cut off at the end).
+    """
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+    except OSError:
+        return True
+
+    if b"\x00" in head:
+        return True
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
         return True
-    return not mime_type.startswith("text")
\ No newline at end of file
+    return False
@@ -0,0 +1,228 @@
+# danai/summarymaker/filtering/matcher.py
+"""
+Compiled include/exclude rules.
+
+FileMatcher turns the name/extension lists in SummaryConfig into frozensets once
+per run. IgnoreRules compiles a set of .gitignore-style patterns into a single
+regex, so each path is checked with one match call regardless of pattern count.
+"""
+
+import os
+import re
+from typing import Iterable, List, Optional, Sequence
+
+from ..config import SummaryConfig
+
+
+class FileMatcher:
+    """
+    Name/extension rules from SummaryConfig, compiled for fast per-file checks.
+    """
+
+    def __init__(self, config: SummaryConfig):
+        self.ignored_files = frozenset(config.ignored_files)
+        self.ignored_extensions = frozenset(config.ignored_file_extensions)
+        self.allowed_extensions = frozenset(config.allowed_file_extensions)
+        self.only_include = frozenset(config.only_include)
+        self.output_abs = os.path.abspath(config.output_path)
+
+    def dir_excluded(self, dir_abs: str) -> bool:
+        """
+        True if everything in this (absolute) directory is excluded from the
+        summary, i.e. it is the output folder or lies inside it.
+        """
+        return dir_abs == self.output_abs or dir_abs.startswith(self.output_abs + os.sep)
+
+    def include_name(self, filename: str, file_ext: str) -> bool:
+        """
+        Apply the ignored_files / extension / only_include rules to one file.
+        'file_ext' is the lower-cased extension, including the dot.
+        """
+        # Check ignore-lists
+        if filename in self.ignored_files:
+            return False
+
+        # Skip ignored extensions unless explicitly allowed
+        if file_ext in self.ignored_extensions and file_ext not in self.allowed_extensions:
+            return False
+
+        # If only_include is non-empty, skip anything not in that list
+        if self.only_include and file_ext not in self.only_include:
+            return False
+
+        return True
+
+
+class IgnoreRules:
+    """
+    A list of .gitignore-style patterns, anchored at 'base' (an absolute directory).
+
+    Supports comments, '!' negation, trailing '/' (directories only), leading or
+    inner '/' (anchored to base), '*', '?', '[...]' and '**'. As in git, the last
+    matching pattern wins.
+    """
+
+    def __init__(self, base: str, patterns: Iterable[str]):
+        self.base = base
+        self.patterns = tuple(patterns)
+        self._prefix_len = len(base.rstrip(os.sep)) + 1
+
+        # Alternatives are stored last-rule-first, so the first alternative the
+        # regex engine manages to match is the last matching rule.
+        any_alternatives = []  # type: List[str]
+        file_alternatives = []  # type: List[str]
+        self._any_negated = []  # type: List[bool]
+        self._file_negated = []  # type: List[bool]
+
+        for raw in self.patterns:
+            parsed = _parse_pattern(raw)
+            if parsed is None:
+                continue
+            regex, negated, dir_only = parsed
+            any_alternatives.append(regex)
+            self._any_negated.append(negated)
+            if not dir_only:
+                file_alternatives.append(regex)
+                self._file_negated.append(negated)
+
+        self._any_negated.reverse()
+        self._file_negated.reverse()
+        self._any_re = _compile_alternatives(reversed(any_alternatives))
+        self._file_re = _compile_alternatives(reversed(file_alternatives))
+
+    @classmethod
+    def from_file(cls, base: str, path: str) -> Optional["IgnoreRules"]:
+        """
+        Load a .gitignore file. Returns None if it is unreadable or has no patterns.
+        """
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                rules = cls(base, f.read().splitlines())
+        except OSError:
+            return None
+        return rules if rules else None
+
+    def __bool__(self) -> bool:
+        return self._any_re is not None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IgnoreRules):
+            return NotImplemented
+        return self.base == other.base and self.patterns == other.patterns
+
+    def __hash__(self) -> int:
+        return hash((self.base, self.patterns))
+
+    def match(self, path_abs: str, is_dir: bool) -> Optional[bool]:
+        """
+        True if 'path_abs' is ignored by these rules, False if it is explicitly
+        re-included by a '!' pattern, None if no pattern matches it.
+        """
+        regex, negated = (self._any_re, self._any_negated) if is_dir else (self._file_re, self._file_negated)
+        if regex is None:
+            return None
+        rel = path_abs[self._prefix_len:]
+        if os.sep != "/":
+            rel = rel.replace(os.sep, "/")
+        m = regex.fullmatch(rel)
+        if m is None:
+            return None
+        return not negated[m.lastindex - 1]
+
+
+def is_ignored(rules_chain: Sequence[IgnoreRules], path_abs: str, is_dir: bool) -> bool:
+    """
+    Check a path against a chain of rule sets, ordered from lowest to highest
+    precedence (e.g. config patterns, then each .gitignore from the root down).
+    """
+    for rules in reversed(rules_chain):
+        verdict = rules.match(path_abs, is_dir)
+        if verdict is not None:
+            return verdict
+    return False
+
+
+def _compile_alternatives(alternatives: Iterable[str]):
+    alternatives = list(alternatives)
+    if not alternatives:
+        return None
+    return re.compile("|".join(f"({alt})" for alt in alternatives), re.DOTALL)
+
+
+def _parse_pattern(raw: str):
+    """
+    Translate one .gitignore line into (regex, negated, dir_only), or None.
+    """
+    line = raw.rstrip("\n")
+    # Trailing spaces are ignored unless escaped
+    while line.endswith(" ") and not line.endswith("\\ "):
+        line = line[:-1]
+    if not line or line.startswith("#"):
+        return None
+
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith("\\#") or line.startswith("\\!"):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # A slash anywhere but the end anchors the pattern to the .gitignore's directory
+    anchored = "/" in line
+    line = line.lstrip("/")
+
+    regex = _translate_glob(line)
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return regex, negated, dir_only
+
+
+def _translate_glob(pattern: str) -> str:
+    """
+    Convert a gitignore glob (without anchoring slashes) into a regex body.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                at_end = i + 2 == n
+                followed_by_slash = i + 2 < n and pattern[i + 2] == "/"
+                if at_start and followed_by_slash:
+                    # '**/' matches zero or more leading directories
+                    out.append("(?:.*/)?")
+                    i += 3
+                    continue
+                if at_start and at_end:
+                    out.append(".*")
+                    i += 2
+                    continue
+            out.append("[^/]*")
+            while i < n and pattern[i] == "*":
+                i += 1
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "^") else i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
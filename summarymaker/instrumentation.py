@@ -0,0 +1,298 @@
+# danai/summarymaker/instrumentation.py
+"""
+Run instrumentation: phase timings, per-processor and per-file aggregates,
+and optional cProfile/tracemalloc capture.
+
+generate_summary always returns a RunReport with phase timings and totals.
+With config.instrument, the pipeline also times every processor call and
+every file, and counts the tokens each processor saves. Per-worker stats are
+collected in PipelineStats objects and merged into the report.
+"""
+
+import io
+import json
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from .config import SummaryConfig
+from .processing.plan import processor_plan
+from .tcounter import tokencount_text
+
+REPORT_FILENAME = "report.json"
+PROFILE_FILENAME = "profile.pstats"
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+# How many functions / allocation sites are listed in the report
+PROFILE_TOP = 25
+
+
+class ProcessorStats:
+    """
+    Aggregates for one processor (in one position of the chain) over all files.
+    """
+    __slots__ = ("calls", "seconds", "bytes_in", "bytes_out", "tokens_in", "tokens_out")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    def merge(self, other: "ProcessorStats") -> None:
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def to_dict(self) -> Dict[str, object]:
+        out = {name: getattr(self, name) for name in self.__slots__}  # type: Dict[str, object]
+        out["tokens_saved"] = self.tokens_in - self.tokens_out
+        return out
+
+    # Slotted objects need explicit pickling support to cross process boundaries
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+class PipelineStats:
+    """
+    Timings collected while reading, processing and counting files.
+    One instance is used in-process, or one per task in a worker, and
+    the results are merged into the RunReport.
+    """
+
+    def __init__(self):
+        self.read_s = 0.0
+        self.process_s = 0.0
+        self.count_s = 0.0
+        self.processors = {}  # type: Dict[int, ProcessorStats]
+        # path -> {"bytes_in", "bytes_out", "read_s", "process_s"}
+        self.files = {}  # type: Dict[str, Dict[str, float]]
+        # path -> where a file that was not processed came from ("manifest", "result_cache")
+        self.sources = {}  # type: Dict[str, str]
+
+    def run_processors(self, content: str, filepath: str, config: SummaryConfig, start: int = 0) -> str:
+        """
+        Run config.processors over 'content' one at a time, timing each call
+        and counting the tokens it removed (that counting goes into count_s).
+        Fused execution is not used here, since it would hide which processor
+        the time went to. Processors that do not apply to the file's extension
+        are skipped, as they are in a normal run.
+
+        :param start: Number of the file's processors that were already applied
+            to 'content' (by a bounded read); only the ones after them are run.
+        """
+        model = config.token_model
+        count = config.count_tokens
+        count_start = time.perf_counter()
+        tokens = tokencount_text(content, model) if count else 0
+        self.count_s += time.perf_counter() - count_start
+        for position, processor in processor_plan(config.processors).steps(filepath)[start:]:
+            start = time.perf_counter()
+            result = processor.process(content, filepath)
+            elapsed = time.perf_counter() - start
+
+            stats = self.processors.get(position)
+            if stats is None:
+                stats = self.processors[position] = ProcessorStats()
+            stats.calls += 1
+            stats.seconds += elapsed
+            stats.bytes_in += len(content.encode("utf-8"))
+            stats.bytes_out += len(result.encode("utf-8"))
+            stats.tokens_in += tokens
+            if count and result != content:
+                count_start = time.perf_counter()
+                tokens = tokencount_text(result, model)
+                self.count_s += time.perf_counter() - count_start
+            stats.tokens_out += tokens
+            content = result
+        return content
+
+    def add_file(self, path: str, raw: str, content: str, read_s: float, process_s: float) -> None:
+        self.read_s += read_s
+        self.process_s += process_s
+        self.files[path] = {
+            "bytes_in": len(raw.encode("utf-8")),
+            "bytes_out": len(content.encode("utf-8")),
+            "read_s": read_s,
+            "process_s": process_s,
+        }
+
+    def merge(self, other: "PipelineStats") -> None:
+        self.read_s += other.read_s
+        self.process_s += other.process_s
+        self.count_s += other.count_s
+        for position, stats in other.processors.items():
+            mine = self.processors.get(position)
+            if mine is None:
+                self.processors[position] = stats
+            else:
+                mine.merge(stats)
+        self.files.update(other.files)
+        self.sources.update(other.sources)
+
+
+class RunReport:
+    """
+    What generate_summary did and where the time went.
+
+    - phases: wall time per phase, in the order they ran.
+    - totals: file count and pre/post token totals.
+    - pipeline: summed read/process/count time (across workers, so it can
+      exceed the 'process' phase wall time). Only with config.instrument.
+    - processors: ProcessorStats per processor. Only with config.instrument.
+    - files: per-file token counts and "source": "processed" (with sizes and
+      timings), "manifest", "result_cache" or "duplicate". Only with
+      config.instrument.
+    - budget: token budget outcome, if max_total_tokens was set.
+    - dedupe: duplicates found and bytes/tokens saved, if config.dedupe was set.
+    - profile: cProfile/tracemalloc results, if config.profile was set.
+    """
+
+    def __init__(self, config: SummaryConfig):
+        self.config = config
+        self.phases = OrderedDict()  # type: OrderedDict
+        self.totals = {"files": 0, "pre_tokens": 0, "post_tokens": 0}  # type: Dict[str, int]
+        self.stats = PipelineStats() if config.instrument else None  # type: Optional[PipelineStats]
+        self.files = []  # type: List[Dict[str, object]]
+        self.budget = None  # type: Optional[Dict[str, int]]
+        self.dedupe = None  # type: Optional[Dict[str, int]]
+        self.profile = None  # type: Optional[Dict[str, object]]
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time the enclosed block as phase 'name' (repeated phases add up).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def add_file(self, fileinfo) -> None:
+        """
+        Count a processed file into the totals (and the per-file list, if instrumenting).
+        """
+        self.totals["files"] += 1
+        self.totals["pre_tokens"] += fileinfo.pre_tokens
+        self.totals["post_tokens"] += fileinfo.post_tokens
+        if self.stats is None:
+            return
+        entry = OrderedDict([
+            ("path", fileinfo.path),
+            ("pre_tokens", fileinfo.pre_tokens),
+            ("post_tokens", fileinfo.post_tokens),
+        ])  # type: Dict[str, object]
+        timings = self.stats.files.pop(fileinfo.path, None)
+        if fileinfo.duplicate_of:
+            entry["source"] = "duplicate"
+        elif timings is None:
+            # Never read this run
+            entry["source"] = self.stats.sources.pop(fileinfo.path, "manifest")
+        else:
+            entry["source"] = "processed"
+            entry.update(timings)
+        self.files.append(entry)
+
+    def to_dict(self) -> Dict[str, object]:
+        out = OrderedDict([
+            ("phases", dict(self.phases)),
+            ("totals", dict(self.totals, tokens_saved=self.totals["pre_tokens"] - self.totals["post_tokens"])),
+        ])  # type: Dict[str, object]
+        if self.stats is not None:
+            out["pipeline"] = {
+                "read_s": self.stats.read_s,
+                "process_s": self.stats.process_s,
+                "count_s": self.stats.count_s,
+            }
+            out["processors"] = [
+                dict(stats.to_dict(), position=position, processor=type(self.config.processors[position]).__name__)
+                for position, stats in sorted(self.stats.processors.items())
+            ]
+            out["files"] = self.files
+        if self.budget is not None:
+            out["budget"] = self.budget
+        if self.dedupe is not None:
+            out["dedupe"] = self.dedupe
+        if self.profile is not None:
+            out["profile"] = self.profile
+        return out
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+
+@contextmanager
+def profiling(config: SummaryConfig, report: RunReport) -> Iterator[None]:
+    """
+    Capture a cProfile or tracemalloc profile of the enclosed block, as chosen
+    by config.profile, and attach a summary of it to 'report'. With cProfile,
+    the full stats are also dumped to PROFILE_FILENAME in config.output_path.
+    Only the main process is profiled.
+    """
+    mode = config.profile
+    if mode is None:
+        yield
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode {mode!r}, expected one of {PROFILE_MODES}")
+
+    if mode == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+        os.makedirs(config.output_path, exist_ok=True)
+        dump_path = os.path.join(config.output_path, PROFILE_FILENAME)
+        profiler.dump_stats(dump_path)
+        report.profile = {"mode": mode, "path": dump_path, "top": _top_functions(profiler)}
+        return
+
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        yield
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    report.profile = {
+        "mode": mode,
+        "peak_bytes": peak,
+        "top": [
+            {"site": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:PROFILE_TOP]
+        ],
+    }
+
+
+def _top_functions(profiler) -> List[Dict[str, object]]:
+    import pstats
+
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({name})",
+            "calls": ncalls,
+            "tottime_s": tottime,
+            "cumtime_s": cumtime,
+        })
+    rows.sort(key=lambda row: row["cumtime_s"], reverse=True)
+    return rows[:PROFILE_TOP]
+
@@ -3,42 +3,219 @@
 Entry point for the summarymaker functionality.
 """
 
+import os
+from typing import Dict, Iterator, List, Optional
+
 from .config import SummaryConfig
-from .filtering.filters import collect_included_files
+from .filtering.dirindex import DirectoryIndex
+from .filtering.filters import FileInfo, collect_included_files, iter_included_files
 from .output.tree_generator import TreeGenerator
 from .output.summary_generator import SummaryGenerator
-from .tcounter import tokencount_text
+from .output.shards import ShardedSummaryGenerator
+from .output.jsonl_generator import COMPRESSIONS, SUMMARY_FORMATS, JsonlSummaryGenerator
+from .manifest import SummaryManifest
+from .budget import BUDGET_POLICIES, apply_token_budget
+from .dedupe import dedupe_savings
+from .filtering.gitsource import FILE_SOURCES
+from .instrumentation import PROFILE_MODES, REPORT_FILENAME, RunReport, profiling
+from .pipeline import iter_processed_files
+from .reading import OVERSIZE_MODES
 
-def generate_summary(config: SummaryConfig) -> None:
+def generate_summary(config: SummaryConfig) -> RunReport:
     """
     Orchestrates the entire process of:
       1. Determining which files to include or ignore.
       2. Processing files via any configured processors.
       3. Generating a directory tree output.
       4. Generating a combined summary of included file contents.
+
+    With config.streaming, steps 2 and 4 are fused: files are processed in
+    sorted order and each one is written to summary.md (and its content
+    released) before the next is read. Files are processed a batch at a
+    time (see pipeline.TOKEN_BATCH_SIZE and TOKEN_BATCH_CHARS), so at most
+    one batch's text is resident; with config.incremental the manifest still
+    holds every file's processed content.
+    
+    With config.max_total_tokens, files are fitted into the budget (see
+    budget.apply_token_budget) before summary.md is written. This needs every
+    file's token count up front, so it cannot be combined with streaming.
+    The same goes for config.shard_max_tokens, which splits the summary into
+    shards (see ShardedSummaryGenerator).
     
     :param config: A SummaryConfig object with user-defined or default rules.
+    :return: A RunReport with phase timings and totals (and, with
+             config.instrument, per-processor and per-file aggregates).
+    """
+    check_config(config)
+
+    report = RunReport(config)
+    with profiling(config, report):
+        _run(config, report)
+
+    write_report(config, report)
+    return report
+
+
+def check_config(config: SummaryConfig) -> None:
+    """
+    Raise ValueError for option combinations that cannot work together.
+    """
+    if config.max_total_tokens is not None and config.streaming:
+        raise ValueError("max_total_tokens cannot be combined with streaming=True")
+    if config.max_total_tokens is not None and not config.count_tokens:
+        raise ValueError("max_total_tokens needs count_tokens=True")
+    if config.shard_max_tokens is not None and config.streaming:
+        raise ValueError("shard_max_tokens cannot be combined with streaming=True")
+    if config.shard_max_tokens is not None and not config.count_tokens:
+        raise ValueError("shard_max_tokens needs count_tokens=True")
+    if config.summary_format not in SUMMARY_FORMATS:
+        raise ValueError(f"Unknown summary_format {config.summary_format!r}, expected one of {SUMMARY_FORMATS}")
+    if config.summary_compression is not None and config.summary_compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown summary_compression {config.summary_compression!r}, expected one of {COMPRESSIONS}")
+    if config.summary_compression is not None and config.summary_format != "jsonl":
+        raise ValueError("summary_compression needs summary_format='jsonl'")
+    if config.shard_max_tokens is not None and config.summary_format != "markdown":
+        raise ValueError("shard_max_tokens needs summary_format='markdown'")
+    if config.budget_policy not in BUDGET_POLICIES:
+        raise ValueError(f"Unknown budget_policy {config.budget_policy!r}, expected one of {BUDGET_POLICIES}")
+    if config.file_source not in FILE_SOURCES:
+        raise ValueError(f"Unknown file_source {config.file_source!r}, expected one of {FILE_SOURCES}")
+    if config.profile is not None and config.profile not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode {config.profile!r}, expected one of {PROFILE_MODES}")
+    if config.oversize_files not in OVERSIZE_MODES:
+        raise ValueError(f"Unknown oversize_files {config.oversize_files!r}, expected one of {OVERSIZE_MODES}")
+
+
+def write_report(config: SummaryConfig, report: RunReport) -> None:
+    """
+    Save 'report' as report.json in config.output_path, if config.report_json is set.
     """
-    # 1. Collect files based on filtering rules
-    included_files = collect_included_files(config)
+    if config.report_json:
+        os.makedirs(config.output_path, exist_ok=True)
+        report.write_json(os.path.join(config.output_path, REPORT_FILENAME))
 
-    pre_processed_tokens = 0
-    post_processed_tokens = 0
 
+def _run(config: SummaryConfig, report: RunReport) -> None:
+    # 1. Collect files based on filtering rules, from a single scan of the
+    #    directories that is shared with the tree generator
+    with report.phase("scan"):
+        index = DirectoryIndex.build(config)
+        if config.streaming:
+            # Only a sorted index of paths is kept resident
+            included_files = sorted(iter_included_files(config, index), key=lambda x: x.path)
+        else:
+            included_files = collect_included_files(config, index)
+
+    # In incremental mode, results for unchanged files come from the manifest
+    manifest = SummaryManifest.load(config) if config.incremental else None
+
+    # 2. Apply all processors in sequence (optionally across worker processes)
+    with report.phase("process"):
+        processed = report_tokens(
+            iter_processed_files(included_files, config, manifest, report.stats),
+            config,
+            report
+        )
+        if config.streaming and config.generate_summarydoc:
+            # 4. (streamed) Write each file to the summary as soon as it is processed
+            summary_generator(config).stream(config, processed)
+        else:
+            for _ in processed:
+                pass
 
-    # 2. Apply all processors in sequence
-    for fileinfo in included_files:
-        with open(fileinfo.path, "r", encoding="utf-8") as f:
-            content = f.read()
-            pre_tokens = tokencount_text(content)
-            pre_processed_tokens += pre_tokens
+    write_outputs(config, report, included_files, index, manifest)
 
-        for processor in config.processors:
-            content = processor.process(content, fileinfo.path)
-            post_tokens = tokencount_text(content)
-            post_processed_tokens += post_tokens
 
-        fileinfo.processed_content = content
+def write_outputs(
+    config: SummaryConfig,
+    report: RunReport,
+    included_files: List[FileInfo],
+    index: DirectoryIndex,
+    manifest: Optional[SummaryManifest] = None
+) -> None:
+    """
+    Everything after processing: print the totals, save the manifest, apply
+    the token budget and write tree.md and the summary (unless it was streamed).
+    """
+    totals = report.totals
+    print("------")
+    if not config.count_tokens:
+        print(f"Files: {totals['files']} (token counting off)")
+    else:
+        _print_token_totals(totals)
+
+    if config.dedupe:
+        report.dedupe = saved = dedupe_savings(included_files)
+        print(
+            f"Duplicates: {saved['duplicates']} files – "
+            f"{saved['bytes_saved']} bytes and {saved['tokens_saved']} tokens saved"
+        )
+
+    if manifest is not None:
+        with report.phase("manifest"):
+            manifest.save()
+
+    if config.max_total_tokens is not None and config.generate_summarydoc:
+        with report.phase("budget"):
+            report.budget = budget = apply_token_budget(included_files, config)
+        print(
+            f"Token budget: {budget['used']}/{config.max_total_tokens} used – "
+            f"kept: {budget['kept']}, truncated: {budget['truncated']}, omitted: {budget['omitted']}"
+        )
+
+    # 3. Generate and save the directory tree (if enabled)
+    if config.generate_tree:
+        with report.phase("tree"):
+            TreeGenerator.generate(config, included_files, index)
+
+    # 4. Generate the summary of included file contents (if enabled)
+    if config.generate_summarydoc and not config.streaming:
+        with report.phase("summary"):
+            if config.shard_max_tokens is not None:
+                shards = ShardedSummaryGenerator.generate(config, included_files)
+                print(f"Summary split into {len(shards)} shards of up to {config.shard_max_tokens} tokens")
+            else:
+                summary_generator(config).generate(config, included_files)
+
+
+def summary_generator(config: SummaryConfig):
+    """
+    The generator class for config.summary_format (both share generate/stream).
+    """
+    if config.summary_format == "jsonl":
+        return JsonlSummaryGenerator
+    return SummaryGenerator
+
+
+def _print_token_totals(totals: Dict[str, int]) -> None:
+    print(f"Pre-processed tokens: {totals['pre_tokens']}")
+    print(f"Post-processed tokens: {totals['post_tokens']}")
+    print("------")
+    print(f"Token reduction: {totals['pre_tokens'] - totals['post_tokens']}")
+
+
+def report_tokens(
+    processed_files: Iterator[FileInfo],
+    config: SummaryConfig,
+    report: RunReport
+) -> Iterator[FileInfo]:
+    """
+    Add per-file token counts to 'report' as files pass through, and
+    print them unless config.quiet is set.
+    """
+    for fileinfo in processed_files:
+        report.add_file(fileinfo)
+        if config.quiet:
+            yield fileinfo
+            continue
+        if not config.count_tokens:
+            print(fileinfo.path)
+            yield fileinfo
+            continue
+
+        pre_tokens = fileinfo.pre_tokens
+        post_tokens = fileinfo.post_tokens
+
         if pre_tokens > post_tokens:
             custstring = f"REDUCTION: {pre_tokens - post_tokens}"
             print(f"{post_tokens} in {fileinfo.path} – pre: {pre_tokens}, post: {post_tokens} | {custstring}")
@@ -49,20 +226,4 @@ def generate_summary(config: SummaryConfig) -> None:
             custstring = f"INCREASE: {post_tokens - pre_tokens}"
             print(f"{post_tokens} in {fileinfo.path} – pre: {pre_tokens}, post: {post_tokens} | {custstring}")
 
-        
-
-    print("------")
-    print(f"Pre-processed tokens: {post_processed_tokens}")
-    print(f"Post-processed tokens: {pre_processed_tokens}")
-    print("------")
-    print(f"Token reduction: {post_processed_tokens - pre_processed_tokens}")
-    
-    # 3. Generate and save the directory tree (if enabled)
-
-
-    if config.generate_tree:
-        TreeGenerator.generate(config, included_files)
-
-    # 4. Generate the summary of included file contents (if enabled)
-    if config.generate_summarydoc:
-        SummaryGenerator.generate(config, included_files)
\ No newline at end of file
+        yield fileinfo
@@ -0,0 +1,186 @@
+# danai/summarymaker/manifest.py
+"""
+On-disk manifest used for incremental summary rebuilds.
+
+The manifest lives in config.output_path and records, for every included file,
+its size, mtime, content hash, token counts and processed content, together with
+a fingerprint of the processor configuration that produced them. On the next run,
+files whose stat (or, failing that, content hash) still matches are restored from
+the manifest instead of being read and processed again.
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Sequence
+
+from .config import SummaryConfig
+from .filtering.filters import FileInfo
+from .reading import is_partial_hash, read_limit
+
+MANIFEST_FILENAME = ".summary_manifest.json"
+MANIFEST_VERSION = 1
+
+# Files modified this close to the previous manifest write may have changed again
+# within the same mtime tick, so their stat alone is not trusted.
+RACY_WINDOW_NS = 2 * 10**9
+
+
+@dataclass
+class ManifestEntry:
+    size: int
+    mtime_ns: int
+    content_hash: str
+    pre_tokens: int
+    post_tokens: int
+    processed_content: str
+
+
+class SummaryManifest:
+    """
+    Path -> ManifestEntry map for one output_path, valid for one processor fingerprint.
+    """
+
+    def __init__(self, path: str, fingerprint: str, entries: Dict[str, ManifestEntry] = None, written_ns: int = 0):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.entries = entries or {}
+        self.written_ns = written_ns
+        self.changed = False
+
+    @classmethod
+    def load(cls, config: SummaryConfig) -> "SummaryManifest":
+        """
+        Load the manifest from config.output_path. A missing or unreadable manifest,
+        or one written for a different processor configuration, starts out empty.
+        """
+        path = os.path.join(config.output_path, MANIFEST_FILENAME)
+        fingerprint = processor_fingerprint(config)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, fingerprint)
+
+        if data.get("version") != MANIFEST_VERSION or data.get("fingerprint") != fingerprint:
+            return cls(path, fingerprint)
+
+        try:
+            entries = {p: ManifestEntry(**e) for p, e in data.get("files", {}).items()}
+        except TypeError:
+            return cls(path, fingerprint)
+        return cls(path, fingerprint, entries, data.get("written_ns", 0))
+
+    def restore(self, fileinfo: FileInfo) -> bool:
+        """
+        Fill in fileinfo from its manifest entry if the file is unchanged.
+        Always records the file's current size and mtime on fileinfo.
+        Returns True if the stored result was reused.
+        """
+        stat_file(fileinfo)
+
+        entry = self.entries.get(fileinfo.path)
+        if entry is None or entry.size != fileinfo.size:
+            return False
+
+        stat_matches = entry.mtime_ns == fileinfo.mtime_ns
+        if not stat_matches or fileinfo.mtime_ns >= self.written_ns - RACY_WINDOW_NS:
+            # Size matches but mtime does not (or is too recent to trust): compare
+            # content. A hash of part of the file cannot vouch for the rest.
+            if is_partial_hash(entry.content_hash) or hash_file(fileinfo.path) != entry.content_hash:
+                return False
+            if not stat_matches:
+                entry.mtime_ns = fileinfo.mtime_ns
+                self.changed = True
+
+        fileinfo.content_hash = entry.content_hash
+        fileinfo.pre_tokens = entry.pre_tokens
+        fileinfo.post_tokens = entry.post_tokens
+        fileinfo.processed_content = entry.processed_content
+        return True
+
+    def record(self, fileinfo: FileInfo) -> None:
+        """
+        Store a freshly processed file in the manifest. Its size and mtime must
+        have been recorded before it was read (by restore() or stat_file()).
+        """
+        self.entries[fileinfo.path] = ManifestEntry(
+            size=fileinfo.size,
+            mtime_ns=fileinfo.mtime_ns,
+            content_hash=fileinfo.content_hash,
+            pre_tokens=fileinfo.pre_tokens,
+            post_tokens=fileinfo.post_tokens,
+            processed_content=fileinfo.processed_content,
+        )
+        self.changed = True
+
+    def prune(self, included_files: Sequence[FileInfo]) -> None:
+        """
+        Drop entries for files that are no longer included.
+        """
+        keep = {fi.path for fi in included_files}
+        stale = [p for p in self.entries if p not in keep]
+        for p in stale:
+            del self.entries[p]
+        if stale:
+            self.changed = True
+
+    def save(self) -> None:
+        """
+        Write the manifest back to disk (atomically), if anything changed.
+        """
+        if not self.changed and os.path.exists(self.path):
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "fingerprint": self.fingerprint,
+            "written_ns": time.time_ns(),
+            "files": {p: asdict(e) for p, e in sorted(self.entries.items())},
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self.changed = False
+
+
+def stat_file(fileinfo: FileInfo) -> None:
+    """
+    Record the file's current size and mtime on fileinfo, as the manifest
+    matches them on the next run. Taken before reading, so a file changed
+    while it is read is caught by its hash next time.
+    """
+    st = os.stat(fileinfo.path)
+    fileinfo.size = st.st_size
+    fileinfo.mtime_ns = st.st_mtime_ns
+
+
+def processor_fingerprint(config: SummaryConfig) -> str:
+    """
+    Hash of everything that affects a file's processed content and token counts,
+    including how much of each file is read. Shared by the manifest and the
+    result cache.
+    """
+    parts = [config.token_model]
+    if not config.count_tokens:
+        parts.append("no-token-counts")
+    parts.append(f"read_limit={read_limit(config)}")
+    parts.append(f"bounded_read_bytes={config.bounded_read_bytes}")
+    for processor in config.processors:
+        fingerprint = getattr(processor, "fingerprint", None)
+        parts.append(fingerprint() if fingerprint else type(processor).__qualname__)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    """
+    sha256 of a file's raw bytes, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
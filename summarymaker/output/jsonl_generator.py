@@ -0,0 +1,193 @@
+# danai/summarymaker/output/jsonl_generator.py
+"""
+Writes the summary as JSON Lines (config.summary_format = "jsonl"), with a
+sidecar index for reading single records.
+
+summary.jsonl holds one record per file:
+    {"path", "size", "hash", "pre_tokens", "post_tokens", "content"}
+(plus "duplicate_of" for files deduplicated against another one). "hash" is
+the sha256 of the file, or "partial:<sha256>" of the part that was read if
+only its head was (see reading.PARTIAL_HASH_PREFIX).
+
+summary.jsonl.idx holds one line per record with its path and byte offset
+and length. With gzip or zstd compression, records are compressed in
+independent blocks (gzip members / zstd frames, so the file is still one
+valid stream), and the index also gives the block's offset and length:
+a reader decompresses that block only.
+"""
+
+import gzip
+import io
+import json
+from typing import IO, Callable, Dict, Iterable, List, Optional
+
+from ..config import SummaryConfig
+from ..filtering.filters import FileInfo
+from .summary_generator import SummaryGenerator, _make_rel_path
+from .writer import open_output
+
+SUMMARY_FORMATS = ("markdown", "jsonl")
+COMPRESSIONS = ("gzip", "zstd")
+_EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+# Uncompressed size at which a compressed block is closed. Reading one record
+# costs decompressing at most about this much.
+JSONL_BLOCK_BYTES = 64 * 1024
+
+
+def jsonl_filename(config: SummaryConfig) -> str:
+    return "summary.jsonl" + _EXTENSIONS[config.summary_compression]
+
+
+JSONL_INDEX_FILENAME = "summary.jsonl.idx"
+
+
+class JsonlSummaryGenerator:
+    @staticmethod
+    def generate(config: SummaryConfig, included_files: List[FileInfo]) -> None:
+        """
+        Writes summary.jsonl (optionally compressed) and its index, with one
+        record per file in path order. The same files are included as in summary.md.
+        """
+        sorted_files = sorted(included_files, key=lambda x: x.path)
+        JsonlSummaryGenerator.stream(config, sorted_files, release=False)
+
+    @staticmethod
+    def stream(config: SummaryConfig, sorted_files: Iterable[FileInfo], release: bool = True) -> None:
+        """
+        Like SummaryGenerator.stream: writes each file's record as it arrives
+        and, with release=True, drops its processed content afterwards.
+        """
+        compress = _compressor(config.summary_compression)
+        with open_output(config, jsonl_filename(config), binary=True) as out, \
+                open_output(config, JSONL_INDEX_FILENAME) as index:
+            writer = _RecordWriter(out, index, compress)
+            for fi in sorted_files:
+                if SummaryGenerator.has_entry(fi, config):
+                    rel_path = _make_rel_path(fi.path, config)
+                    writer.add(rel_path, _record(fi, rel_path, config))
+                if release:
+                    fi.processed_content = ""
+            writer.close()
+
+
+class _RecordWriter:
+    """
+    Appends encoded records to 'out' and their locations to 'index', collecting
+    records into blocks when compressing.
+    """
+
+    def __init__(self, out: IO[bytes], index: IO[str], compress: Optional[Callable[[bytes], bytes]]):
+        self.out = out
+        self.index = index
+        self.compress = compress
+        self.position = 0
+        self.block = []  # type: List[bytes]
+        self.block_size = 0
+        self.block_entries = []  # type: List[Dict[str, object]]
+
+    def add(self, rel_path: str, record: bytes) -> None:
+        if self.compress is None:
+            self.out.write(record)
+            self._index({"path": rel_path, "offset": self.position, "length": len(record)})
+            self.position += len(record)
+            return
+
+        self.block_entries.append({"path": rel_path, "offset": self.block_size, "length": len(record)})
+        self.block.append(record)
+        self.block_size += len(record)
+        if self.block_size >= JSONL_BLOCK_BYTES:
+            self._flush()
+
+    def close(self) -> None:
+        if self.block:
+            self._flush()
+
+    def _flush(self) -> None:
+        data = self.compress(b"".join(self.block))
+        self.out.write(data)
+        for entry in self.block_entries:
+            entry["block"] = self.position
+            entry["block_length"] = len(data)
+            self._index(entry)
+        self.position += len(data)
+        self.block, self.block_size, self.block_entries = [], 0, []
+
+    def _index(self, entry: Dict[str, object]) -> None:
+        self.index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def _record(fi: FileInfo, rel_path: str, config: SummaryConfig) -> bytes:
+    record = {
+        "path": rel_path,
+        "size": fi.size,
+        "hash": fi.content_hash,
+        "pre_tokens": fi.pre_tokens,
+        "post_tokens": fi.post_tokens,
+        "content": fi.processed_content,
+    }  # type: Dict[str, object]
+    if fi.duplicate_of:
+        record["duplicate_of"] = _make_rel_path(fi.duplicate_of, config)
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def load_jsonl_index(index_path: str) -> Dict[str, Dict[str, object]]:
+    """
+    Read summary.jsonl.idx into a path -> location map.
+    """
+    entries = {}  # type: Dict[str, Dict[str, object]]
+    with open(index_path, "r", encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            entries[entry["path"]] = entry
+    return entries
+
+
+def read_jsonl_record(summary_path: str, entry: Dict[str, object]) -> Dict[str, object]:
+    """
+    Read one record from summary.jsonl[.gz|.zst], given its index entry,
+    without reading (or decompressing) the rest of the file.
+
+    Usage Example:
+        index = load_jsonl_index("summaries/summary.jsonl.idx")
+        record = read_jsonl_record("summaries/summary.jsonl.gz", index["src/main.py"])
+    """
+    with open(summary_path, "rb") as f:
+        if "block" not in entry:
+            f.seek(entry["offset"])
+            data = f.read(entry["length"])
+        else:
+            f.seek(entry["block"])
+            block = _decompressor(summary_path)(f.read(entry["block_length"]))
+            data = block[entry["offset"]:entry["offset"] + entry["length"]]
+    return json.loads(data.decode("utf-8"))
+
+
+def _compressor(compression: Optional[str]) -> Optional[Callable[[bytes], bytes]]:
+    if compression is None:
+        return None
+    if compression == "gzip":
+        def compress_gzip(data: bytes) -> bytes:
+            # mtime=0 keeps the output identical for identical input
+            buffer = io.BytesIO()
+            with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as g:
+                g.write(data)
+            return buffer.getvalue()
+        return compress_gzip
+    return _zstandard().ZstdCompressor().compress
+
+
+def _decompressor(summary_path: str) -> Callable[[bytes], bytes]:
+    if summary_path.endswith(_EXTENSIONS["gzip"]):
+        return gzip.decompress
+    if summary_path.endswith(_EXTENSIONS["zstd"]):
+        return _zstandard().ZstdDecompressor().decompress
+    raise ValueError(f"Cannot tell the compression of {summary_path} from its name")
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("summary_compression='zstd' needs the 'zstandard' package (pip install zstandard)")
+    return zstandard
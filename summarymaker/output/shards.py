@@ -0,0 +1,145 @@
+# danai/summarymaker/output/shards.py
+"""
+Writes the summary as numbered shards of bounded token size, plus an index.
+"""
+
+import glob
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from typing import Dict, List, Sequence, Tuple
+
+from ..config import SummaryConfig
+from ..filtering.filters import FileInfo
+from ..tcounter import tokencount_batch, tokencount_text
+from .summary_generator import SummaryGenerator, _make_rel_path, summary_entry_parts
+from .writer import encode_output, replace_if_changed
+
+SHARD_INDEX_FILENAME = "summary-index.json"
+SHARD_FILENAME = "summary-{:03d}.md"
+SHARD_HEADER = "# Directory Contents (part {} of {})\n\n"
+
+_SHARD_FILENAME_RE = re.compile(r"^summary-(\d{3,})\.md$")
+
+
+class ShardedSummaryGenerator:
+    @staticmethod
+    def generate(config: SummaryConfig, included_files: List[FileInfo]) -> List[str]:
+        """
+        Writes the summary as summary-001.md, summary-002.md, ... of at most
+        config.shard_max_tokens tokens each, plus summary-index.json, which
+        maps each file to its shard, byte offset, length and token count.
+
+        Files are packed whole, in path order (so reading the shards in order
+        gives the same sequence as summary.md), and the files of a directory
+        are kept in one shard whenever they fit in one. A single file larger
+        than the limit gets a shard of its own.
+
+        Shards are written in parallel. Shards left over from an earlier run
+        with more shards are removed.
+
+        :return: The shard file names, in order.
+        """
+        model = config.token_model
+        files = [fi for fi in sorted(included_files, key=lambda x: x.path) if SummaryGenerator.has_entry(fi, config)]
+        wrappers = [prefix + suffix for prefix, suffix in (summary_entry_parts(fi, config) for fi in files)]
+        costs = [fi.post_tokens + overhead for fi, overhead in zip(files, tokencount_batch(wrappers, model))]
+
+        # Leave room for the widest header a shard could get
+        header_tokens = tokencount_text(SHARD_HEADER.format(999, 999), model)
+        limit = max(config.shard_max_tokens - header_tokens, 1)
+        shards = pack_shards([fi.path for fi in files], costs, limit)
+
+        names = [SHARD_FILENAME.format(number) for number in range(1, len(shards) + 1)]
+        index_entries = {}  # type: Dict[str, Dict[str, object]]
+        contents = []  # type: List[bytes]
+        shard_info = []  # type: List[Dict[str, object]]
+        for number, (name, members) in enumerate(zip(names, shards), start=1):
+            parts = [encode_output(SHARD_HEADER.format(number, len(shards)))]
+            offset = len(parts[0])
+            for i in members:
+                section = encode_output(SummaryGenerator.render_entry(files[i], config))
+                index_entries[_make_rel_path(files[i].path, config)] = {
+                    "shard": name,
+                    "offset": offset,
+                    "length": len(section),
+                    "tokens": costs[i],
+                }
+                parts.append(section)
+                offset += len(section)
+            contents.append(b"".join(parts))
+            shard_info.append({
+                "file": name,
+                "files": len(members),
+                "tokens": header_tokens + sum(costs[i] for i in members),
+                "bytes": offset,
+            })
+
+        os.makedirs(config.output_path, exist_ok=True)
+        paths = [os.path.join(config.output_path, name) for name in names]
+        if paths:
+            with ThreadPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as pool:
+                list(pool.map(lambda item: _write_bytes(item[0], item[1], config.incremental), zip(paths, contents)))
+        _remove_stale_shards(config.output_path, len(names))
+
+        index = {
+            "shard_max_tokens": config.shard_max_tokens,
+            "shards": shard_info,
+            "files": index_entries,
+        }
+        _write_bytes(
+            os.path.join(config.output_path, SHARD_INDEX_FILENAME),
+            encode_output(json.dumps(index, indent=2) + "\n"),
+            config.incremental
+        )
+        return names
+
+
+def pack_shards(paths: Sequence[str], costs: Sequence[int], limit: int) -> List[List[int]]:
+    """
+    Split positions 0..len(paths)-1 (in path order) into consecutive shards
+    whose summed cost stays within 'limit'.
+
+    Each directory's run of files goes into the current shard if it fits,
+    else into a fresh shard if it fits there; directories too large for any
+    shard are split file by file.
+    """
+    shards = []  # type: List[List[int]]
+    current = []  # type: List[int]
+    used = 0
+    for _, group in groupby(range(len(paths)), key=lambda i: os.path.dirname(paths[i])):
+        group = list(group)
+        group_cost = sum(costs[i] for i in group)
+        if current and used + group_cost > limit and group_cost <= limit:
+            shards.append(current)
+            current, used = [], 0
+        for i in group:
+            if current and used + costs[i] > limit:
+                shards.append(current)
+                current, used = [], 0
+            current.append(i)
+            used += costs[i]
+    if current:
+        shards.append(current)
+    return shards
+
+
+def _write_bytes(path: str, data: bytes, incremental: bool) -> None:
+    if not incremental:
+        with open(path, "wb") as f:
+            f.write(data)
+        return
+    # As in open_output: leave unchanged files (and their mtimes) alone
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    replace_if_changed(tmp_path, path)
+
+
+def _remove_stale_shards(output_path: str, count: int) -> None:
+    for path in glob.glob(os.path.join(output_path, "summary-*.md")):
+        match = _SHARD_FILENAME_RE.match(os.path.basename(path))
+        if match and int(match.group(1)) > count:
+            os.remove(path)
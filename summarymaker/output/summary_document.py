@@ -0,0 +1,98 @@
+# danai/summarymaker/output/summary_document.py
+"""
+A summary.md that can be updated in place, one file's section at a time.
+"""
+
+import os
+from typing import Dict, List, Sequence
+
+from ..config import SummaryConfig
+from ..filtering.filters import FileInfo
+from .summary_generator import SUMMARY_HEADER, SummaryGenerator
+from .writer import encode_output
+
+
+class SummaryDocument:
+    """
+    summary.md held as one rendered section per file, in path order, with the
+    byte offset each section starts at.
+
+    update() re-renders only the sections of files that changed (or were added
+    or removed). The file on disk is rewritten from the first changed section
+    onwards; everything before it is left untouched, and unchanged sections
+    after it are written from memory rather than rendered again.
+
+    The output is byte-for-byte what SummaryGenerator.generate would write.
+    """
+
+    def __init__(self, config: SummaryConfig):
+        self.config = config
+        self.path = os.path.join(config.output_path, "summary.md")
+        self.paths = []  # type: List[str]
+        self.sections = []  # type: List[bytes]
+        self.offsets = []  # type: List[int]
+
+    def write(self, files: Sequence[FileInfo]) -> None:
+        """
+        Render every file and write the whole document.
+        """
+        ordered = sorted(files, key=lambda x: x.path)
+        self.paths = [fi.path for fi in ordered]
+        self.sections = [self._render(fi) for fi in ordered]
+        os.makedirs(self.config.output_path, exist_ok=True)
+        with open(self.path, "wb") as f:
+            self._write_from(f, 0)
+
+    def update(self, files: Sequence[FileInfo], changed: Sequence[str]) -> int:
+        """
+        Bring the document in line with 'files', where 'changed' are the paths
+        whose content may differ from the last write. Returns the number of
+        bytes written.
+        """
+        ordered = sorted(files, key=lambda x: x.path)
+        changed_paths = set(changed)
+        previous = dict(zip(self.paths, self.sections))  # type: Dict[str, bytes]
+
+        paths = [fi.path for fi in ordered]
+        sections = [
+            previous[fi.path] if fi.path in previous and fi.path not in changed_paths else self._render(fi)
+            for fi in ordered
+        ]
+
+        first = 0
+        limit = min(len(paths), len(self.paths))
+        while first < limit and paths[first] == self.paths[first] and sections[first] == self.sections[first]:
+            first += 1
+        if first == len(paths) == len(self.paths):
+            return 0
+
+        self.paths, self.sections = paths, sections
+        if not os.path.exists(self.path):
+            self.write(ordered)
+            return self.offsets[-1]
+        with open(self.path, "r+b") as f:
+            return self._write_from(f, first)
+
+    def _write_from(self, f, first: int) -> int:
+        # offsets[i] is where section i starts; the last entry is the file size
+        if first:
+            offsets = self.offsets[:first + 1]
+            start = offsets[-1]
+            f.seek(start)
+        else:
+            header = encode_output(SUMMARY_HEADER)
+            start = 0
+            f.seek(0)
+            f.write(header)
+            offsets = [len(header)]
+        position = offsets[-1]
+        for section in self.sections[first:]:
+            f.write(section)
+            position += len(section)
+            offsets.append(position)
+        f.truncate()
+        self.offsets = offsets
+        return position - start
+
+    def _render(self, fi: FileInfo) -> bytes:
+        return encode_output(SummaryGenerator.render_entry(fi, self.config))
@@ -4,9 +4,12 @@ Generates a file summarising the contents of included files.
 """
 
 import os
-from typing import List
+from typing import IO, Iterable, List, Tuple
 from ..config import SummaryConfig
 from ..filtering.filters import FileInfo
+from .writer import open_output
+
+SUMMARY_HEADER = "# Directory Contents\n\n"
 
 class SummaryGenerator:
     @staticmethod
@@ -15,29 +18,74 @@ class SummaryGenerator:
         Writes out a 'summary.md' (or whichever name you prefer)
         containing the processed contents of each file.
         """
-        output_file = os.path.join(config.output_path, "summary.md")
-        os.makedirs(config.output_path, exist_ok=True)
+        # Sort files by path for consistent output
+        sorted_files = sorted(included_files, key=lambda x: x.path)
+        SummaryGenerator.stream(config, sorted_files, release=False)
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write("# Directory Contents\n\n")
+    @staticmethod
+    def stream(config: SummaryConfig, sorted_files: Iterable[FileInfo], release: bool = True) -> None:
+        """
+        Writes 'summary.md' from an iterable of files that is already sorted by path,
+        writing each file as soon as it arrives. With release=True, each file's
+        processed content is dropped once written, so only one file's content
+        needs to be held in memory at a time.
+        """
+        with open_output(config, "summary.md") as f:
+            f.write(SUMMARY_HEADER)
 
-            # Sort files by path for consistent output
-            sorted_files = sorted(included_files, key=lambda x: x.path)
             for fi in sorted_files:
-                folder = os.path.dirname(fi.path)
-                if _contains_partially_ignored(folder, config):
-                    # Skip summarising partially-ignored directories
-                    continue
+                SummaryGenerator._write_entry(f, fi, config)
+                if release:
+                    fi.processed_content = ""
+
+    @staticmethod
+    def _write_entry(f: IO[str], fi: FileInfo, config: SummaryConfig) -> None:
+        if not SummaryGenerator.has_entry(fi, config):
+            return
+
+        prefix, suffix = summary_entry_parts(fi, config)
+        f.write(prefix)
+        f.write(fi.processed_content)
+        f.write(suffix)
+
+    @staticmethod
+    def render_entry(fi: FileInfo, config: SummaryConfig) -> str:
+        """
+        The section written for one file ('' if the file is left out).
+        """
+        if not SummaryGenerator.has_entry(fi, config):
+            return ""
+        prefix, suffix = summary_entry_parts(fi, config)
+        return prefix + fi.processed_content + suffix
 
-                # Skip empty files if config says so
-                if config.exclude_empty_files_from_summary and not fi.processed_content.strip():
-                    continue
+    @staticmethod
+    def has_entry(fi: FileInfo, config: SummaryConfig) -> bool:
+        # Left out by the token budget
+        if fi.omitted:
+            return False
 
-                rel_file = _make_rel_path(fi.path, config)
-                f.write(f"## {rel_file}\n\n")
-                f.write("```\n")
-                f.write(fi.processed_content)
-                f.write("\n```\n\n")
+        folder = os.path.dirname(fi.path)
+        if _contains_partially_ignored(folder, config):
+            # Skip summarising partially-ignored directories
+            return False
+
+        # Duplicates are written as a reference, whatever their content
+        if fi.duplicate_of:
+            return True
+
+        # Skip empty files if config says so
+        if config.exclude_empty_files_from_summary and not fi.processed_content.strip():
+            return False
+        return True
+
+def summary_entry_parts(fi: FileInfo, config: SummaryConfig) -> Tuple[str, str]:
+    """
+    The text written before and after a file's content in the summary.
+    """
+    rel_file = _make_rel_path(fi.path, config)
+    if fi.duplicate_of:
+        return f"## {rel_file}\n\nIdentical to `{_make_rel_path(fi.duplicate_of, config)}`.\n\n", ""
+    return f"## {rel_file}\n\n```\n", "\n```\n\n"
 
 def _make_rel_path(path: str, config: SummaryConfig) -> str:
     """
@@ -5,167 +5,253 @@ Generates a 'pretty' ASCII directory tree representation, saving it to tree.md.
 Supports:
 - Fully ignored directories (excluded entirely).
 - Partially ignored directories (included but marked as '# contents omitted').
+- Depth and per-directory entry limits (tree_max_depth, tree_max_entries_per_dir),
+  beyond which entries are summarised as "… N more files (X MB)".
 """
 
 import os
-from typing import List, Dict, Set
+from typing import IO, Callable, Dict, Iterable, List, Optional, Tuple
 from ..config import SummaryConfig
+from ..filtering.dirindex import DirectoryIndex, FileEntry, IndexedDir
 from ..filtering.filters import FileInfo
+from .writer import open_output
 
 class TreeGenerator:
     @staticmethod
-    def generate(config: SummaryConfig, included_files: List[FileInfo]) -> None:
+    def generate(
+        config: SummaryConfig,
+        included_files: List[FileInfo],
+        index: Optional[DirectoryIndex] = None,
+        cache: Optional[Dict[Tuple[str, str, bool], List[str]]] = None
+    ) -> None:
         """
         Build a textual ASCII representation of the directory tree, ignoring
         fully_ignored_dirs and marking partially_ignored_dirs as omitted.
         If config.tree_directories is provided and non-empty, we scope the tree
         to those directories only. Otherwise, we use config.base_directories.
 
+        The tree is rendered from a DirectoryIndex (normally the one already
+        built for filtering), so no directory is listed twice.
+
+        If a 'cache' dict is passed, each rendered branch is stored in it and
+        reused on later calls, so only branches dropped from it (see
+        invalidate_tree_cache) are rendered again.
+
         Saves the output to 'tree.md' inside config.output_path.
         """
-        output_file = os.path.join(config.output_path, "tree.md")
-        os.makedirs(config.output_path, exist_ok=True)
-
         # Determine the directories to walk for the tree
         if config.tree_directories and len(config.tree_directories) > 0:
             top_scope = config.tree_directories
         else:
             top_scope = config.base_directories
 
-        # Build the dir_map from scratch for the tree
-        dir_map = {}  # type: Dict[str, Dict[str, Set[str]]]
-
-        def ensure_dir_in_map(d: str):
-            if d not in dir_map:
-                dir_map[d] = {"subdirs": set(), "files": set()}
-
-        # Walk each top-scope directory
-        for base_dir in top_scope:
-            for root, dirs, files in os.walk(base_dir):
-                root_abs = os.path.abspath(root)
-
-                # Skip if any segment is fully ignored
-                if _is_tree_ignored(root_abs, config):
-                    dirs[:] = []  # don't descend further
-                    continue
-
-                ensure_dir_in_map(root_abs)
-
-                filtered_dirs = []
-                for d in dirs:
-                    subdir_abs = os.path.abspath(os.path.join(root_abs, d))
-
-                    # If fully ignored, skip
-                    if _is_tree_ignored(subdir_abs, config):
-                        continue
-
-                    # If partially ignored, add a special marker to the subdir list
-                    if _contains_partially_ignored(subdir_abs, config):
-                        dir_map[root_abs]["subdirs"].add(f"{d}/ # contents omitted")
-                        # we do NOT descend into it
-                        continue
-
-                    # Otherwise, keep it and ensure it’s in the map
-                    filtered_dirs.append(d)
-                    ensure_dir_in_map(subdir_abs)
-                    dir_map[root_abs]["subdirs"].add(d)
-
-                # Modify in-place so os.walk won't descend into partially ignored or fully ignored
-                dirs[:] = filtered_dirs
-
-                # Add files to the map
-                for f in files:
-                    dir_map[root_abs]["files"].add(f)
-
-        # Generate the tree lines
-        lines = ["# Directory Tree\n"]
-
-        for top_dir in top_scope:
-            top_abs = os.path.abspath(top_dir)
-            lines.append(f"{top_abs}/")
-
-            if top_abs not in dir_map:
-                lines.append("")  # blank line
-                continue
-
-            subdirs_sorted = sorted(dir_map[top_abs]["subdirs"])
-            files_sorted = sorted(dir_map[top_abs]["files"])
-            items = subdirs_sorted + files_sorted
-
-            for idx, item in enumerate(items):
-                is_last = (idx == len(items) - 1)
-
-                # If we previously appended "dir # contents omitted", treat it as a special "directory" label
-                # but do NOT expand it further
-                if item.endswith("# contents omitted"):
-                    prefix_char = "└── " if is_last else "├── "
-                    lines.append(prefix_char + item)
-                    continue
-
-                path_item = os.path.join(top_abs, item)
-                if os.path.isdir(path_item):
-                    prefix_char = ""  # we'll manage prefix in recursion
-                    lines += _build_ascii_tree(
-                        config, path_item, prefix="", is_last=is_last, dir_map=dir_map
-                    )
-                else:
-                    prefix_char = "└── " if is_last else "├── "
-                    lines.append(prefix_char + item)
-            lines.append("")
-
-        # Write out
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines) + "\n")
-
-
-def _build_ascii_tree(
-    config: SummaryConfig,
-    current_path: str,
-    prefix: str,
-    is_last: bool,
-    dir_map: Dict[str, Dict[str, Set[str]]]
-) -> List[str]:
+        if index is None:
+            index = DirectoryIndex.build(config)
+
+        # Lines are written as they are produced; they are only kept (in
+        # 'out') when branches have to be cached
+        out = [] if cache is not None else None  # type: Optional[List[str]]
+        with open_output(config, "tree.md") as f:
+            write = _line_writer(f, out)
+
+            write("# Directory Tree\n")
+            for top_dir in top_scope:
+                top_abs = os.path.abspath(top_dir)
+                write(f"{top_abs}/")
+
+                # Skip if any segment of the top directory is fully ignored
+                indexed = None if _is_tree_ignored(top_abs, config) else index.get(top_abs)
+                if indexed is not None:
+                    _render_children(config, index, top_abs, indexed, write, cache, out)
+                write("")
+
+
+class _Frame:
     """
-    Recursively build lines for current_path in an ASCII tree style.
+    A directory whose entries are being written: its path, the prefix for
+    its entries, their depth, the entries themselves and the next position.
+    'key'/'start' record where its branch began, for the cache.
     """
-    lines = []
-    current_name = os.path.basename(current_path)
+    __slots__ = ("path", "prefix", "depth", "entries", "position", "key", "start")
+
+    def __init__(self, path, prefix, depth, entries, key=None, start=0):
+        self.path = path
+        self.prefix = prefix
+        self.depth = depth
+        self.entries = entries
+        self.position = 0
+        self.key = key
+        self.start = start
 
-    branch_prefix = "└── " if is_last else "├── "
-    lines.append(prefix + branch_prefix + current_name)
 
-    # If partially ignored, show # contents omitted (though we already handle that above)
-    if _contains_partially_ignored(current_path, config):
-        lines.append(prefix + ("    " if is_last else "│   ") + "# contents omitted")
-        return lines
+def _line_writer(f: IO[str], out: Optional[List[str]] = None) -> Callable[[str], None]:
+    # Every line ends with a newline, as "\n".join(lines) + "\n" would give
+    if out is None:
+        return lambda line: f.write(line + "\n")
 
-    sub_prefix = prefix + ("    " if is_last else "│   ")
+    def write(line: str) -> None:
+        out.append(line)
+        f.write(line + "\n")
+    return write
 
-    # If not in dir_map, no subdirectories or files
-    if current_path not in dir_map:
-        return lines
 
-    subdirs_sorted = sorted(dir_map[current_path]["subdirs"])
-    files_sorted = sorted(dir_map[current_path]["files"])
-    items = subdirs_sorted + files_sorted
+def _render_children(
+    config: SummaryConfig,
+    index: DirectoryIndex,
+    top_abs: str,
+    top: IndexedDir,
+    write: Callable[[str], None],
+    cache: Optional[Dict[Tuple[str, str, bool], List[str]]] = None,
+    out: Optional[List[str]] = None
+) -> None:
+    """
+    Write the ASCII tree below 'top_abs', one line at a time. The walk keeps
+    an explicit stack of directories (so depth is not limited by recursion)
+    and only holds one directory's entries per level.
 
-    for idx, item in enumerate(items):
-        path_item = os.path.join(current_path, item)
-        last_item = (idx == len(items) - 1)
+    With a 'cache' (and 'out', the list of lines written so far), each
+    directory's branch is stored in the cache under (path, prefix, is_last)
+    and written from there when it is found.
+    """
+    max_depth = config.tree_max_depth
+    max_entries = config.tree_max_entries_per_dir
+    stack = [_Frame(top_abs, "", 1, _dir_entries(top, max_entries))]
+    while stack:
+        frame = stack[-1]
+        if frame.position == len(frame.entries):
+            stack.pop()
+            if frame.key is not None:
+                cache[frame.key] = out[frame.start:]
+            continue
 
-        if item.endswith("# contents omitted"):
-            # Already flagged as partial
-            file_prefix = sub_prefix + ("└── " if last_item else "├── ")
-            lines.append(file_prefix + item)
+        kind, label = frame.entries[frame.position]
+        frame.position += 1
+        is_last = frame.position == len(frame.entries)
+        branch = "└── " if is_last else "├── "
+        if kind != _DIR:
+            write(frame.prefix + branch + label)
             continue
 
-        if os.path.isdir(path_item):
-            lines += _build_ascii_tree(config, path_item, sub_prefix, last_item, dir_map)
-        else:
-            file_prefix = sub_prefix + ("└── " if last_item else "├── ")
-            lines.append(file_prefix + item)
+        path = os.path.join(frame.path, label)
+        key = (path, frame.prefix, is_last)
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            for line in cached:
+                write(line)
+            continue
+        start = len(out) if out is not None else 0
+
+        write(frame.prefix + branch + label)
+        sub_prefix = frame.prefix + ("    " if is_last else "│   ")
+        indexed = index.get(path)
+
+        if _contains_partially_ignored(path, config):
+            # Shown, but its contents are omitted
+            write(sub_prefix + "# contents omitted")
+        elif indexed is not None and max_depth is not None and frame.depth >= max_depth:
+            if indexed.subdirs or indexed.omitted or indexed.files:
+                write(sub_prefix + "└── " + _collapsed_label(index, path))
+        elif indexed is not None:
+            entries = _dir_entries(indexed, max_entries)
+            stack.append(_Frame(path, sub_prefix, frame.depth + 1, entries, key if cache is not None else None, start))
+            continue
+
+        if cache is not None:
+            cache[key] = out[start:]
+
+
+# Entry kinds in a directory listing
+_DIR = "dir"
+_OTHER = "other"
+
+
+def _sorted_items(indexed: IndexedDir) -> Tuple[List[str], List[FileEntry]]:
+    """
+    Sorted subdirectory labels (including '# contents omitted' markers) and file entries.
+    """
+    subdirs = indexed.subdirs + [f"{d}/ # contents omitted" for d in indexed.omitted]
+    return sorted(subdirs), sorted(indexed.files, key=lambda entry: entry.name)
 
-    return lines
+
+def _dir_entries(indexed: IndexedDir, max_entries: Optional[int]) -> List[Tuple[str, str]]:
+    """
+    (kind, label) for each line under a directory: subdirectories first, then
+    files. Beyond 'max_entries', the rest is folded into one summary line.
+    """
+    subdirs, files = _sorted_items(indexed)
+    entries = [(_OTHER if label.endswith("# contents omitted") else _DIR, label) for label in subdirs]
+    if max_entries is None or len(subdirs) + len(files) <= max_entries:
+        entries += [(_OTHER, entry.name) for entry in files]
+        return entries
+
+    shown = max(max_entries, 0)
+    hidden_dirs = max(len(subdirs) - shown, 0)
+    shown_files = max(shown - len(subdirs), 0)
+    hidden_bytes = sum(entry.size for entry in files[shown_files:])
+    entries = entries[:shown] + [(_OTHER, entry.name) for entry in files[:shown_files]]
+    entries.append((_OTHER, "… " + _count_label(hidden_dirs, len(files) - shown_files, hidden_bytes, "more ")))
+    return entries
+
+
+def _collapsed_label(index: DirectoryIndex, path: str) -> str:
+    """
+    Summary line for a directory below tree_max_depth: everything under it.
+    Only running totals are kept, however many files that is.
+    """
+    dirs = 0
+    file_count = 0
+    total_bytes = 0
+    stack = [path]
+    while stack:
+        indexed = index.get(stack.pop())
+        if indexed is None:
+            continue
+        dirs += len(indexed.subdirs) + len(indexed.omitted)
+        file_count += len(indexed.files)
+        total_bytes += sum(entry.size for entry in indexed.files)
+        stack.extend(os.path.join(indexed.path, name) for name in indexed.subdirs)
+    return "… " + _count_label(dirs, file_count, total_bytes, "")
+
+
+def _count_label(dirs: int, file_count: int, total_bytes: int, more: str) -> str:
+    parts = []
+    if dirs:
+        parts.append(f"{dirs} {more}{'directory' if dirs == 1 else 'directories'}")
+    if file_count:
+        parts.append(f"{file_count} {more}{'file' if file_count == 1 else 'files'}")
+    label = ", ".join(parts)
+    if file_count:
+        label += f" ({_format_size(total_bytes)})"
+    return label
+
+
+def _format_size(size: float) -> str:
+    if size < 1024:
+        return f"{int(size)} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+
+
+def invalidate_tree_cache(cache: Dict[Tuple[str, str, bool], List[str]], changed_dirs: Iterable[str]) -> None:
+    """
+    Drop the cached branches a change to 'changed_dirs' affects: the changed
+    directories themselves, everything below them and every ancestor.
+    """
+    changed = set(changed_dirs)
+    if not changed:
+        return
+    affected = set()
+    for path in changed:
+        while True:
+            affected.add(path)
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+    for key in [k for k in cache if k[0] in affected or any(k[0].startswith(d + os.sep) for d in changed)]:
+        del cache[key]
 
 
 def _is_tree_ignored(path: str, config: SummaryConfig) -> bool:
@@ -0,0 +1,61 @@
+# danai/summarymaker/output/writer.py
+"""
+Helpers for writing output files.
+"""
+
+import filecmp
+import os
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+from ..config import SummaryConfig
+
+@contextmanager
+def open_output(config: SummaryConfig, filename: str, binary: bool = False) -> Iterator[IO]:
+    """
+    Open 'filename' inside config.output_path for writing (as UTF-8 text, or
+    in binary mode if 'binary' is set).
+
+    In incremental mode the content is written to a temporary file first and
+    only moved into place if it differs from what is already on disk, so
+    unchanged outputs keep their mtime and are not rewritten.
+    """
+    os.makedirs(config.output_path, exist_ok=True)
+    output_file = os.path.join(config.output_path, filename)
+
+    mode, encoding = ("wb", None) if binary else ("w", "utf-8")
+    if not config.incremental:
+        with open(output_file, mode, encoding=encoding) as f:
+            yield f
+        return
+
+    tmp_file = output_file + ".tmp"
+    try:
+        with open(tmp_file, mode, encoding=encoding) as f:
+            yield f
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+    replace_if_changed(tmp_file, output_file)
+
+
+def replace_if_changed(tmp_file: str, output_file: str) -> bool:
+    """
+    Move tmp_file over output_file unless both already hold the same bytes.
+    Returns True if output_file was (re)written.
+    """
+    if os.path.exists(output_file) and filecmp.cmp(tmp_file, output_file, shallow=False):
+        os.remove(tmp_file)
+        return False
+    os.replace(tmp_file, output_file)
+    return True
+
+
+def encode_output(text: str) -> bytes:
+    """
+    Encode text exactly as open_output would write it (text-mode newline
+    translation, UTF-8), for outputs written in binary mode at known offsets.
+    """
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode("utf-8")
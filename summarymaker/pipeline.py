@@ -0,0 +1,500 @@
+# danai/summarymaker/pipeline.py
+"""
+Runs the per-file work (read -> processors -> token counts) for included files,
+either in-process or fanned out across a pool of worker processes.
+"""
+
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import SummaryConfig
+from .dedupe import copy_duplicate, find_duplicates
+from .filtering.filters import FileInfo
+from .instrumentation import PipelineStats
+from .manifest import SummaryManifest
+from .resultcache import ResultCache
+from .processing.fused import bounded_line_stages, run_line_stages, run_processors
+from .processing.plan import processor_plan
+from .reading import LineSource, read_limit, read_source
+from .tcounter import tokencount_batch, tokencount_text
+
+# How many files are read and processed before their token counts
+# are sent to tiktoken's batch encoder in one go (in-process mode).
+TOKEN_BATCH_SIZE = 256
+# A batch is also cut short once its files' raw and processed text add up to
+# this many characters, so a few huge files are never held 256 at a time.
+TOKEN_BATCH_CHARS = 8 * 1024 * 1024
+
+# Upper bound on how many files are sent to a worker process as one task.
+MAX_CHUNK_SIZE = 64
+
+# Config shipped to each worker process once, by the pool initialiser, and
+# the worker's own connection to the result cache (if one is used).
+_worker_config = None  # type: Optional[SummaryConfig]
+_worker_cache = None  # type: Optional[ResultCache]
+
+
+def read_and_process(
+    path: str,
+    config: SummaryConfig,
+    stats: Optional[PipelineStats] = None,
+    cache: Optional[ResultCache] = None
+) -> Tuple[str, str, str, float]:
+    """
+    Read a single file and run it through every processor in sequence.
+    Returns (raw_content, processed_content, content_hash, raw_scale).
+
+    raw_scale is 1.0 unless the file was read lazily (see
+    config.bounded_read_bytes). raw_content is then only the sample that was
+    read, and raw_scale is how many times larger the whole file is.
+
+    If 'cache' holds a result for the content that was read, that is returned
+    instead of running the processors (and cache.take_tokens(path) gives its
+    token counts).
+
+    If 'stats' is given, the read and every processor call are timed into it.
+    """
+    processors = processor_plan(config.processors).chain(path)
+    bounded = _read_bounded(path, processors, config, stats)
+    if bounded is not None:
+        return bounded
+
+    if stats is not None:
+        start = time.perf_counter()
+        raw, content_hash = read_source(path, read_limit(config))
+        read_done = time.perf_counter()
+        cached = _fetch(cache, path, content_hash, stats)
+        if cached is not None:
+            return raw, cached, content_hash, 1.0
+        counted_before = stats.count_s
+        content = stats.run_processors(raw, path, config)
+        process_s = time.perf_counter() - read_done - (stats.count_s - counted_before)
+        stats.add_file(path, raw, content, read_done - start, process_s)
+        return raw, content, content_hash, 1.0
+
+    raw, content_hash = read_source(path, read_limit(config))
+    cached = _fetch(cache, path, content_hash, stats)
+    if cached is not None:
+        return raw, cached, content_hash, 1.0
+    return raw, _run_chain(raw, path, processors, config), content_hash, 1.0
+
+
+def _fetch(
+    cache: Optional[ResultCache],
+    path: str,
+    content_hash: str,
+    stats: Optional[PipelineStats]
+) -> Optional[str]:
+    if cache is None:
+        return None
+    content = cache.fetch(path, content_hash)
+    if content is not None and stats is not None:
+        stats.sources[path] = "result_cache"
+    return content
+
+
+def _read_bounded(
+    path: str,
+    processors: Sequence[object],
+    config: SummaryConfig,
+    stats: Optional[PipelineStats] = None
+) -> Optional[Tuple[str, str, str, float]]:
+    """
+    Read and process a large file lazily, if the processor chain starts by
+    truncating it: its lines are streamed through the leading line stages and
+    reading stops as soon as the line limit is reached. Returns None if the
+    file has to be read whole.
+
+    With 'stats', the leading line stages are timed as part of the read, and
+    the processors after them are timed one by one as in read_and_process.
+    """
+    if config.bounded_read_bytes is None or read_limit(config) is not None:
+        return None
+    stages, end = bounded_line_stages(path, processors)
+    if not end:
+        return None
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+    if size <= config.bounded_read_bytes:
+        return None
+
+    start = time.perf_counter()
+    with LineSource(path) as source:
+        content = "\n".join(run_line_stages(source, stages))
+    if stats is None:
+        content = _run_chain(content, path, processors[end:], config)
+        return source.sample, content, source.hexdigest(), source.size_ratio(size)
+
+    read_done = time.perf_counter()
+    counted_before = stats.count_s
+    content = stats.run_processors(content, path, config, start=end)
+    process_s = time.perf_counter() - read_done - (stats.count_s - counted_before)
+    stats.add_file(path, source.sample, content, read_done - start, process_s)
+    return source.sample, content, source.hexdigest(), source.size_ratio(size)
+
+
+def _run_chain(content: str, path: str, processors: Sequence[object], config: SummaryConfig) -> str:
+    if config.fuse_processors:
+        return run_processors(content, path, processors)
+    for processor in processors:
+        content = processor.process(content, path)
+    return content
+
+
+def process_file(
+    path: str,
+    config: SummaryConfig,
+    stats: Optional[PipelineStats] = None,
+    cache: Optional[ResultCache] = None
+) -> Tuple[str, int, int, str]:
+    """
+    Read, process and count a single file (or restore it from 'cache').
+    Returns (processed_content, pre_tokens, post_tokens, content_hash).
+
+    Only the raw and final content are tokenised. If the processors left the
+    content unchanged, the raw count is reused rather than encoding it twice.
+    """
+    raw, content, content_hash, raw_scale = read_and_process(path, config, stats, cache)
+    tokens = cache.take_tokens(path) if cache is not None else None
+    if tokens is not None:
+        return content, tokens[0], tokens[1], content_hash
+    if not config.count_tokens:
+        return content, 0, 0, content_hash
+    start = time.perf_counter()
+    pre_tokens = _scale(tokencount_text(raw, config.token_model), raw_scale)
+    if content == raw and raw_scale == 1.0:
+        post_tokens = pre_tokens
+    else:
+        post_tokens = tokencount_text(content, config.token_model)
+    if stats is not None:
+        stats.count_s += time.perf_counter() - start
+    return content, pre_tokens, post_tokens, content_hash
+
+
+def _scale(count: int, raw_scale: float) -> int:
+    # Estimated whole-file count for a lazily read sample
+    return count if raw_scale == 1.0 else int(round(count * raw_scale))
+
+
+def resolve_worker_count(config: SummaryConfig) -> int:
+    """
+    Turn config.workers into a concrete process count.
+    0 or None means one worker per CPU.
+    """
+    if not config.workers:
+        return os.cpu_count() or 1
+    return max(1, config.workers)
+
+
+def iter_processed_files(
+    included_files: List[FileInfo],
+    config: SummaryConfig,
+    manifest: Optional[SummaryManifest] = None,
+    stats: Optional[PipelineStats] = None
+) -> Iterator[FileInfo]:
+    """
+    Process each FileInfo and yield it in input order, with
+    processed_content, pre_tokens and post_tokens filled in.
+
+    If a manifest is given, unchanged files are restored from it and only the
+    rest are processed; those results are then recorded back into the manifest.
+    With config.result_cache, files whose content was processed the same way
+    before (in any run) are restored from that cache once they have been read,
+    and new results are added to it.
+
+    If 'stats' is given (see config.instrument), per-file and per-processor
+    timings are collected into it, including those from worker processes.
+
+    With config.dedupe, only one copy of each set of identical files is
+    processed; the others are filled in from it (see dedupe.copy_duplicate).
+    A duplicate that comes before its original in 'included_files' is
+    yielded right after the original instead.
+    """
+    duplicates = find_duplicates(included_files, config) if config.dedupe else {}
+    if not duplicates:
+        for fileinfo in _iter_unique(included_files, config, manifest, stats):
+            yield fileinfo
+        return
+
+    unique = [fi for fi in included_files if fi.path not in duplicates]
+    originals = set(duplicates.values())
+    processed = _iter_unique(unique, config, manifest, stats)
+    done = {}  # type: Dict[str, FileInfo]
+    waiting = {}  # type: Dict[str, List[FileInfo]]
+    for fileinfo in included_files:
+        original = duplicates.get(fileinfo.path)
+        if original is not None:
+            if original in done:
+                yield copy_duplicate(fileinfo, done[original])
+            else:
+                waiting.setdefault(original, []).append(fileinfo)
+            continue
+        fileinfo = next(processed)
+        if fileinfo.path in originals:
+            done[fileinfo.path] = fileinfo
+        yield fileinfo
+        for duplicate in waiting.pop(fileinfo.path, ()):
+            yield copy_duplicate(duplicate, fileinfo)
+
+
+def _iter_unique(
+    included_files: List[FileInfo],
+    config: SummaryConfig,
+    manifest: Optional[SummaryManifest],
+    stats: Optional[PipelineStats]
+) -> Iterator[FileInfo]:
+    cache = ResultCache.open(config)
+    if manifest is None and cache is None:
+        for fileinfo in _iter_pending(included_files, config, stats):
+            yield fileinfo
+        return
+
+    try:
+        pending = included_files
+        if manifest is not None:
+            pending = [fi for fi in pending if not manifest.restore(fi)]
+        pending_ids = {id(fi) for fi in pending}
+        processed = _iter_pending(pending, config, stats, cache)
+        for fileinfo in included_files:
+            if id(fileinfo) not in pending_ids:
+                # Restored from the manifest
+                if stats is not None:
+                    stats.sources[fileinfo.path] = "manifest"
+                yield fileinfo
+                continue
+            fileinfo = next(processed)
+            if cache is not None:
+                cache.store(fileinfo)
+            if manifest is not None:
+                manifest.record(fileinfo)
+            yield fileinfo
+        if manifest is not None:
+            manifest.prune(included_files)
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def _iter_pending(
+    included_files: List[FileInfo],
+    config: SummaryConfig,
+    stats: Optional[PipelineStats],
+    cache: Optional[ResultCache] = None
+) -> Iterator[FileInfo]:
+    """
+    Read, process and count files that have no reusable result (other than
+    in 'cache', which is checked as each file is read).
+
+    In-process, files are read concurrently if config.async_reads is set.
+    With more than one worker, files are spread across a process pool. The
+    config (and with it the processors) is sent to each worker once, when the
+    pool starts, rather than being pickled alongside every file. Workers look
+    up the cache through their own connection and report their hits back.
+    """
+    workers = resolve_worker_count(config)
+
+    if workers == 1 or len(included_files) < 2:
+        iter_files = _iter_async if config.async_reads > 0 else _iter_in_process
+        for fileinfo in iter_files(included_files, config, stats, cache):
+            yield fileinfo
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Files go to workers in chunks, with only a few chunks in flight at once,
+    # so finished results never pile up far ahead of the consumer.
+    chunksize = min(MAX_CHUNK_SIZE, max(1, len(included_files) // (workers * 4)))
+    chunks = [included_files[i:i + chunksize] for i in range(0, len(included_files), chunksize)]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(config, cache is not None)
+    ) as executor:
+        in_flight = deque()  # type: Deque[Tuple[List[FileInfo], object]]
+        next_chunk = 0
+        while in_flight or next_chunk < len(chunks):
+            while next_chunk < len(chunks) and len(in_flight) < workers * 2:
+                chunk = chunks[next_chunk]
+                paths = [fi.path for fi in chunk]
+                in_flight.append((chunk, executor.submit(_process_chunk_in_worker, paths, stats is not None)))
+                next_chunk += 1
+
+            chunk, future = in_flight.popleft()
+            results, chunk_stats, touched = future.result()
+            if stats is not None:
+                stats.merge(chunk_stats)
+            if cache is not None:
+                cache.add_touched(touched)
+            for fileinfo, result in zip(chunk, results):
+                yield _apply_result(fileinfo, result)
+
+
+def _iter_in_process(
+    included_files: List[FileInfo],
+    config: SummaryConfig,
+    stats: Optional[PipelineStats],
+    cache: Optional[ResultCache] = None
+) -> Iterator[FileInfo]:
+    """
+    Read and process files in batches (of up to TOKEN_BATCH_SIZE files and
+    TOKEN_BATCH_CHARS characters), then count each batch's tokens with a
+    single multi-threaded tiktoken call. Cache hits come with their counts.
+    """
+    batch = []  # type: List[FileInfo]
+    # The files of the batch that still need counting
+    uncounted = []  # type: List[FileInfo]
+    raws = []  # type: List[str]
+    scales = []  # type: List[float]
+    chars = 0
+    for position, fileinfo in enumerate(included_files, 1):
+        raw, fileinfo.processed_content, fileinfo.content_hash, raw_scale = read_and_process(
+            fileinfo.path, config, stats, cache
+        )
+        batch.append(fileinfo)
+        tokens = cache.take_tokens(fileinfo.path) if cache is not None else None
+        if tokens is not None:
+            fileinfo.pre_tokens, fileinfo.post_tokens = tokens
+            chars += len(fileinfo.processed_content)
+        else:
+            uncounted.append(fileinfo)
+            raws.append(raw)
+            scales.append(raw_scale)
+            chars += len(raw) + len(fileinfo.processed_content)
+
+        if len(batch) >= TOKEN_BATCH_SIZE or chars >= TOKEN_BATCH_CHARS or position == len(included_files):
+            _count_batch(uncounted, raws, scales, config, stats)
+            for done in batch:
+                yield done
+            batch, uncounted, raws, scales, chars = [], [], [], [], 0
+
+
+def _iter_async(
+    included_files: List[FileInfo],
+    config: SummaryConfig,
+    stats: Optional[PipelineStats],
+    cache: Optional[ResultCache] = None
+) -> Iterator[FileInfo]:
+    """
+    Like _iter_in_process, but with up to config.async_reads file reads in
+    flight at once (see AsyncReader). Files are processed in the order their
+    reads complete and yielded in input order.
+
+    Reads stay within a window of the next file to yield, so one slow read
+    holds back at most that many finished files. The window is at least a
+    token batch, so batches are not cut short while reads keep up.
+    """
+    from .asyncreader import AsyncReader
+
+    limit = read_limit(config)
+
+    def timed_read(path: str) -> Tuple[str, str, float]:
+        start = time.perf_counter()
+        raw, content_hash = read_source(path, limit)
+        return raw, content_hash, time.perf_counter() - start
+
+    paths = [fi.path for fi in included_files]
+    window = max(TOKEN_BATCH_SIZE, config.async_reads * 4)
+    reader = AsyncReader(paths, timed_read, config.async_reads, max_ahead=window, hold_results=True)
+    counted = {}  # type: Dict[int, FileInfo]
+    next_out = 0
+    batch = []  # type: List[FileInfo]
+    raws = []  # type: List[str]
+    positions = []  # type: List[int]
+    chars = 0
+
+    for received, (position, result) in enumerate(reader, 1):
+        raw, content_hash, read_s = result
+        fileinfo = included_files[position]
+        fileinfo.content_hash = content_hash
+        cached = _fetch(cache, fileinfo.path, content_hash, stats)
+        if cached is not None:
+            fileinfo.processed_content = cached
+            fileinfo.pre_tokens, fileinfo.post_tokens = cache.take_tokens(fileinfo.path)
+            counted[position] = fileinfo
+        else:
+            if stats is not None:
+                start = time.perf_counter()
+                counted_before = stats.count_s
+                fileinfo.processed_content = stats.run_processors(raw, fileinfo.path, config)
+                process_s = time.perf_counter() - start - (stats.count_s - counted_before)
+                stats.add_file(fileinfo.path, raw, fileinfo.processed_content, read_s, process_s)
+            else:
+                processors = processor_plan(config.processors).chain(fileinfo.path)
+                fileinfo.processed_content = _run_chain(raw, fileinfo.path, processors, config)
+            batch.append(fileinfo)
+            raws.append(raw)
+            positions.append(position)
+            chars += len(raw) + len(fileinfo.processed_content)
+
+        # A full window means no further read can start before some file is
+        # yielded, which may need the batch counted first
+        window_full = received - next_out >= reader.max_ahead
+        if batch and (
+            len(batch) >= TOKEN_BATCH_SIZE or chars >= TOKEN_BATCH_CHARS or received == len(paths) or window_full
+        ):
+            _count_batch(batch, raws, [1.0] * len(batch), config, stats)
+            counted.update(zip(positions, batch))
+            batch, raws, positions, chars = [], [], [], 0
+        while next_out in counted:
+            reader.done()
+            yield counted.pop(next_out)
+            next_out += 1
+
+
+def _count_batch(
+    batch: List[FileInfo],
+    raws: List[str],
+    scales: List[float],
+    config: SummaryConfig,
+    stats: Optional[PipelineStats]
+) -> None:
+    """
+    Fill in pre_tokens and post_tokens for a batch with one tiktoken call.
+    Post counts are only taken for files the processors changed.
+    Counts stay 0 if config.count_tokens is off.
+    """
+    if not config.count_tokens or not batch:
+        return
+    start = time.perf_counter()
+    changed = [
+        i for i, fi in enumerate(batch)
+        if fi.processed_content != raws[i] or scales[i] != 1.0
+    ]
+    counts = tokencount_batch(
+        raws + [batch[i].processed_content for i in changed],
+        model=config.token_model
+    )
+    if stats is not None:
+        stats.count_s += time.perf_counter() - start
+    pre_counts, post_counts = counts[:len(batch)], counts[len(batch):]
+
+    for fileinfo, pre_tokens, raw_scale in zip(batch, pre_counts, scales):
+        fileinfo.pre_tokens = _scale(pre_tokens, raw_scale)
+        fileinfo.post_tokens = fileinfo.pre_tokens
+    for i, post_tokens in zip(changed, post_counts):
+        batch[i].post_tokens = post_tokens
+
+
+def _apply_result(fileinfo: FileInfo, result: Tuple[str, int, int, str]) -> FileInfo:
+    fileinfo.processed_content, fileinfo.pre_tokens, fileinfo.post_tokens, fileinfo.content_hash = result
+    return fileinfo
+
+
+def _init_worker(config: SummaryConfig, use_cache: bool) -> None:
+    global _worker_config, _worker_cache
+    _worker_config = config
+    _worker_cache = ResultCache.open(config) if use_cache else None
+
+
+def _process_chunk_in_worker(
+    paths: List[str],
+    instrument: bool
+) -> Tuple[List[Tuple[str, int, int, str]], Optional[PipelineStats], List[Tuple[float, str, str]]]:
+    stats = PipelineStats() if instrument else None
+    results = [process_file(path, _worker_config, stats, _worker_cache) for path in paths]
+    touched = _worker_cache.take_touched() if _worker_cache is not None else []
+    return results, stats, touched
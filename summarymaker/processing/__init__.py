@@ -7,15 +7,21 @@ so they can be more easily used elsewhere.
 
 from .remover import RemoveCommentsProcessor
 from .truncator import TruncateProcessor
+from .tokentruncator import TokenTruncateProcessor
 from .typeremover import RemoveTypingHintsProcessor
 from .printremover import RemovePrintStatementsProcessor
 from .importcondenser import CondenseImportsProcessor
+from .pythonstripper import PythonStripProcessor
+from .outliner import OutlineProcessor
 
 
 __all__ = [
     "RemoveCommentsProcessor",
     "TruncateProcessor",
+    "TokenTruncateProcessor",
     "RemoveTypingHintsProcessor",
     "RemovePrintStatementsProcessor",
-    "CondenseImportsProcessor"
+    "CondenseImportsProcessor",
+    "PythonStripProcessor",
+    "OutlineProcessor"
 ]
@@ -3,6 +3,8 @@
 Defines the base processor interface or class for transforming file contents.
 """
 
+import json
+import os
 from abc import ABC, abstractmethod
 
 class BaseProcessor(ABC):
@@ -15,4 +17,58 @@ class BaseProcessor(ABC):
         """
         Takes in the file content and returns transformed content.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def applies_to(self, ext: str) -> bool:
+        """
+        Whether process() may change files with extension 'ext' (as returned by
+        file_extension, e.g. ".py", or "" for none). Files it never changes
+        skip this processor altogether (see .plan). The default is True;
+        processors limited to some file types should override this.
+        """
+        return True
+
+    def line_stage(self, filepath: str):
+        """
+        Describes what process() does to 'filepath' as a line stage for fused
+        execution: a LineFilter, LineLimit or PASSTHROUGH (see .fused), or None
+        if this processor can only run on the whole string via process().
+        """
+        return None
+
+    def dedup_key(self, filepath: str):
+        """
+        A hashable value capturing everything about 'filepath' that process()
+        depends on. Files with identical content and equal keys must come out
+        identically, so that only one of them is processed (see
+        SummaryConfig.dedupe). The default is the file extension; processors
+        that look at more of the path should override this.
+        """
+        return file_extension(filepath)
+
+    def fingerprint(self) -> str:
+        """
+        Returns a stable string identifying this processor and its parameters.
+        Two processors with equal fingerprints must transform content identically,
+        so subclasses holding state outside their instance attributes should override this.
+        """
+        params = json.dumps(vars(self), sort_keys=True, default=_fingerprint_value)
+        return f"{type(self).__module__}.{type(self).__qualname__}:{params}"
+
+
+def _fingerprint_value(value):
+    # Sets are listed in sorted order, since their repr() order depends on the
+    # hash seed and would give a new fingerprint in every process
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return repr(value)
+
+
+def file_extension(filepath: str) -> str:
+    """
+    The extension processors are dispatched on: everything from the last '.'
+    in the file name, as written (".py", ".gitignore", "" for "Makefile").
+    """
+    name = os.path.basename(filepath)
+    dot = name.rfind(".")
+    return name[dot:] if dot >= 0 else ""
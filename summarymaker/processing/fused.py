@@ -0,0 +1,130 @@
+# danai/summarymaker/processing/fused.py
+"""
+Fused, single-pass execution of line-oriented processors.
+
+Processors that work line by line can describe that work as a line stage
+(see BaseProcessor.line_stage). Consecutive line stages are composed so each
+file is split once and every line flows through all of them in a single pass,
+stopping as soon as a truncation limit is reached. Processors without a line
+stage run through their usual whole-string process().
+"""
+
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+
+class LineFilter:
+    """
+    Line stage that maps each line to a new line, or to None to drop it.
+    """
+    __slots__ = ("fn",)
+
+    def __init__(self, fn: Callable[[str], Optional[str]]):
+        self.fn = fn
+
+
+class LineLimit:
+    """
+    Line stage that passes the first 'limit' lines through, then emits
+    'marker' in place of the next line and ends the stream.
+    """
+    __slots__ = ("limit", "marker")
+
+    def __init__(self, limit: int, marker: str):
+        self.limit = limit
+        self.marker = marker
+
+
+# Line stage for processors that leave a particular file untouched.
+PASSTHROUGH = LineFilter(lambda line: line)
+
+
+def run_processors(content: str, filepath: str, processors: Sequence[object]) -> str:
+    """
+    Run 'processors' over 'content' in order, producing exactly what calling
+    each processor's process() in turn would, but fusing every run of
+    consecutive line stages into one pass over the lines.
+    """
+    stages = [_line_stage(p, filepath) for p in processors]
+
+    i = 0
+    while i < len(processors):
+        if stages[i] is None:
+            content = processors[i].process(content, filepath)
+            i += 1
+            continue
+
+        j = i
+        while j < len(processors) and stages[j] is not None:
+            j += 1
+        fused = [stage for stage in stages[i:j] if stage is not PASSTHROUGH]
+        if fused:
+            content = "\n".join(run_line_stages(content.split("\n"), fused))
+        i = j
+    return content
+
+
+def bounded_line_stages(filepath: str, processors: Sequence[object]) -> Tuple[List[object], int]:
+    """
+    If the chain starts with line stages that include a LineLimit, return
+    (stages, n): the stages of processors[:n], where processors[n - 1] is the
+    last LineLimit in that leading run. Feeding a file's lines through these
+    stages needs only as many lines as it takes to exhaust the limit, so the
+    file never has to be read in full. Returns ([], 0) otherwise.
+    """
+    stages = []  # type: List[object]
+    end = 0
+    for position, processor in enumerate(processors):
+        stage = _line_stage(processor, filepath)
+        if stage is None:
+            break
+        stages.append(stage)
+        if stage.__class__ is LineLimit:
+            end = position + 1
+    return [stage for stage in stages[:end] if stage is not PASSTHROUGH], end
+
+
+def run_line_stages(lines: Iterable[str], stages: Sequence[object]) -> List[str]:
+    """
+    Push each line through 'stages' and collect what comes out of the last one.
+    Stops consuming 'lines' as soon as any LineLimit is exhausted, since no
+    later line could get past it.
+    """
+    out = []  # type: List[str]
+    received = [0] * len(stages)
+
+    def push(line: str, start: int) -> bool:
+        """Returns True once a limit is exhausted."""
+        for s in range(start, len(stages)):
+            received[s] += 1
+            stage = stages[s]
+            if stage.__class__ is LineLimit:
+                if received[s] > stage.limit:
+                    # Replace this line with the marker, let it flow on, then stop
+                    if s + 1 < len(stages):
+                        push(stage.marker, s + 1)
+                    else:
+                        out.append(stage.marker)
+                    return True
+            else:
+                line = stage.fn(line)
+                if line is None:
+                    return False
+        out.append(line)
+        return False
+
+    for line in lines:
+        if push(line, 0):
+            break
+
+    # Between separate process() calls, a stage whose predecessor produced no
+    # lines at all still sees one empty line (''.split('\n') == ['']).
+    for s in range(1, len(stages)):
+        if received[s] == 0:
+            push("", s)
+
+    return out
+
+
+def _line_stage(processor: object, filepath: str):
+    line_stage = getattr(processor, "line_stage", None)
+    return line_stage(filepath) if line_stage is not None else None
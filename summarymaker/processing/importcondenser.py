@@ -4,20 +4,24 @@ Processor to condense import statements in file content.
 
 import re
 from collections import defaultdict
-from .baseprocessor import BaseProcessor
+from .baseprocessor import BaseProcessor, file_extension
+
+_IMPORT_PATTERN = re.compile(r'^(?:from\s+(\S+)\s+import\s+([\w\s,]+)|import\s+(\S+))', re.MULTILINE)
 
 class CondenseImportsProcessor(BaseProcessor):
     """
     Condenses import statements in the file content.
     """
+    def applies_to(self, ext: str) -> bool:
+        return ext == '.py'
+
     def process(self, content: str, filepath: str) -> str:
-        if not filepath.endswith('.py'):
+        if file_extension(filepath) != '.py':
             return content
-        
-        import_pattern = re.compile(r'^(?:from\s+(\S+)\s+import\s+([\w\s,]+)|import\s+(\S+))', re.MULTILINE)
+
         imports = defaultdict(set)
         
-        for match in import_pattern.finditer(content):
+        for match in _IMPORT_PATTERN.finditer(content):
             if match.group(1) and match.group(2):
                 module, items = match.group(1), match.group(2).split(',')
                 for item in items:
@@ -42,7 +46,7 @@ class CondenseImportsProcessor(BaseProcessor):
         condensed_imports_str = f"truncated_imports:[{', '.join(condensed_imports)}]"
         
         # Remove original import statements
-        content = re.sub(import_pattern, '', content)
+        content = _IMPORT_PATTERN.sub('', content)
         
         # Add condensed import statement at the top
         return condensed_imports_str + '\n' + content.strip()
\ No newline at end of file
@@ -0,0 +1,507 @@
+# danai/summarymaker/processing/outliner.py
+"""
+Processor that replaces large source files with an outline of their structure.
+
+Python files are outlined from their 'ast', with each signature taken from
+the file's tokens so it keeps its original text. JavaScript and TypeScript
+files go through a lightweight scanner that tracks strings, comments and
+bracket depth. Either way the outline keeps imports, class and function
+signatures and the first line of each docstring, and drops every body.
+"""
+
+import ast
+import bisect
+import io
+import re
+import tokenize
+from typing import List, Optional, Tuple
+
+from .baseprocessor import BaseProcessor, file_extension
+from ..tcounter import tokencount_text
+
+OUTLINE_MARKER = "... [OUTLINE: bodies omitted] ..."
+
+PYTHON_EXTENSIONS = (".py", ".pyi")
+JS_EXTENSIONS = (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".mts", ".cts")
+
+
+class OutlineProcessor(BaseProcessor):
+    """
+    Outlines Python and JS/TS files at or above a size or token threshold,
+    keeping imports, class and function signatures and one-line docstrings.
+    Smaller files, and files that fail to parse, are left unchanged, so a
+    TruncateProcessor after this one still bounds those.
+
+    Usage Example:
+        config.processors = [
+            OutlineProcessor(min_bytes=20000),  # big modules become outlines
+            TruncateProcessor(rules={}, default=300)
+        ]
+    """
+
+    def __init__(
+        self,
+        min_bytes: Optional[int] = 20000,
+        min_tokens: Optional[int] = None,
+        docstrings: bool = True,
+        model: str = "gpt-4o"
+    ):
+        """
+        :param min_bytes: Outline files of at least this many bytes (None => no size threshold).
+        :param min_tokens: Outline files of at least this many tokens (None => no token threshold).
+                           Tokens are only counted for files below min_bytes.
+                           With both thresholds None, every file is outlined.
+        :param docstrings: Keep the first line of each docstring (or JSDoc comment).
+        :param model: Model whose tokeniser min_tokens is measured in.
+        """
+        self.min_bytes = min_bytes
+        self.min_tokens = min_tokens
+        self.docstrings = docstrings
+        self.model = model
+
+    def applies_to(self, ext: str) -> bool:
+        ext = ext.lower()
+        return ext in PYTHON_EXTENSIONS or ext in JS_EXTENSIONS
+
+    def process(self, content: str, filepath: str) -> str:
+        ext = file_extension(filepath).lower()
+        if ext in PYTHON_EXTENSIONS:
+            outline_source = outline_python
+        elif ext in JS_EXTENSIONS:
+            outline_source = outline_js
+        else:
+            return content
+
+        if not self._is_large(content):
+            return content
+        outline = outline_source(content, self.docstrings)
+        if outline is None or len(outline) >= len(content):
+            return content
+        return outline
+
+    def _is_large(self, content: str) -> bool:
+        if self.min_bytes is None and self.min_tokens is None:
+            return True
+        if self.min_bytes is not None and len(content.encode("utf-8")) >= self.min_bytes:
+            return True
+        return self.min_tokens is not None and tokencount_text(content, self.model) >= self.min_tokens
+
+
+# ----- Python -----
+
+_OPENERS = {"(", "[", "{"}
+_CLOSERS = {")", "]", "}"}
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+_NON_CODE = {tokenize.COMMENT, tokenize.NL, tokenize.INDENT, tokenize.DEDENT}
+
+
+def outline_python(content: str, docstrings: bool = True) -> Optional[str]:
+    """
+    Outline of a Python module, or None if it does not parse.
+    """
+    try:
+        tree = ast.parse(content)
+        tokens = list(tokenize.generate_tokens(io.StringIO(content).readline))
+    except (SyntaxError, ValueError, RecursionError, tokenize.TokenError):
+        return None
+    return _PythonOutline(tokens, docstrings).render(tree)
+
+
+class _PythonOutline:
+    """
+    One-shot state for outlining a single module.
+    """
+
+    def __init__(self, tokens: List[tokenize.TokenInfo], docstrings: bool):
+        self.tokens = tokens
+        self.starts = [tok.start for tok in tokens]
+        self.docstrings = docstrings
+        self.out = [OUTLINE_MARKER]
+
+    def render(self, tree: ast.Module) -> str:
+        doc = self._docstring(tree)
+        if doc:
+            self.out.append(doc)
+        for node in tree.body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                self.out.append(_import_line(node))
+            elif isinstance(node, _DEFINITIONS):
+                self.out.append("")
+                self._definition(node, 0)
+        return "\n".join(self.out)
+
+    def _definition(self, node: ast.stmt, depth: int) -> None:
+        indent = "    " * depth
+        statements = self._header(node)
+        for decorator in statements[:-1]:
+            self.out.append(indent + decorator)
+        header = indent + statements[-1]
+        doc = self._docstring(node)
+
+        members = []  # type: List[ast.stmt]
+        if isinstance(node, ast.ClassDef):
+            members = [
+                member for member in node.body
+                if isinstance(member, _DEFINITIONS)
+                or (isinstance(member, ast.AnnAssign) and isinstance(member.target, ast.Name))
+            ]
+
+        if not doc and not members:
+            self.out.append(header + " ...")
+            return
+        self.out.append(header)
+        if doc:
+            self.out.append(indent + "    " + doc)
+        for member in members:
+            if isinstance(member, ast.AnnAssign):
+                # Class attribute declaration (e.g. a dataclass field), without its value
+                self.out.append(indent + "    " + self._statement((member.lineno, member.col_offset), stop="="))
+            else:
+                self._definition(member, depth + 1)
+
+    def _header(self, node: ast.stmt) -> List[str]:
+        """
+        The decorator lines of a def/class, followed by its signature up to
+        and including the ':' that opens its body.
+        """
+        # Decorated nodes start at their def/class line in 3.8+, but at the
+        # first decorator before that; the earliest line covers both
+        first_line = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+        position = bisect.bisect_left(self.starts, (first_line, 0))
+        statements = []  # type: List[str]
+        current = []  # type: List[tokenize.TokenInfo]
+        depth = 0
+        for tok in self.tokens[position:]:
+            if tok.type in _NON_CODE:
+                continue
+            if tok.type == tokenize.NEWLINE:
+                statements.append(self._join(current))
+                current = []
+                continue
+            if tok.string in _OPENERS:
+                depth += 1
+            elif tok.string in _CLOSERS:
+                depth -= 1
+            current.append(tok)
+            if tok.string == ":" and depth == 0 and current[0].string in ("def", "class", "async"):
+                break
+        statements.append(self._join(current))
+        return statements
+
+    def _statement(self, start: Tuple[int, int], stop: str) -> str:
+        """
+        The statement at 'start', up to its end or to the first top-level 'stop'.
+        """
+        position = bisect.bisect_left(self.starts, start)
+        current = []  # type: List[tokenize.TokenInfo]
+        depth = 0
+        for tok in self.tokens[position:]:
+            if tok.type in _NON_CODE:
+                continue
+            if tok.type in (tokenize.NEWLINE, tokenize.ENDMARKER) or (tok.string == stop and depth == 0):
+                break
+            if tok.string in _OPENERS:
+                depth += 1
+            elif tok.string in _CLOSERS:
+                depth -= 1
+            current.append(tok)
+        return self._join(current)
+
+    def _join(self, tokens: List[tokenize.TokenInfo]) -> str:
+        """
+        Tokens back to source on one line: original spacing within a line,
+        one space (or none, next to brackets) across line breaks, and no
+        trailing comma before a closing bracket on its own line.
+        """
+        parts = []  # type: List[str]
+        previous = None  # type: Optional[tokenize.TokenInfo]
+        for tok in tokens:
+            if previous is not None:
+                if tok.start[0] == previous.end[0]:
+                    # tok.line starts with the physical line tok starts on
+                    parts.append(tok.line[previous.end[1]:tok.start[1]])
+                elif tok.string in _CLOSERS:
+                    if previous.string == ",":
+                        parts.pop()
+                elif previous.string not in _OPENERS:
+                    parts.append(" ")
+            parts.append(tok.string)
+            previous = tok
+        return "".join(parts)
+
+    def _docstring(self, node: ast.AST) -> str:
+        if not self.docstrings:
+            return ""
+        doc = ast.get_docstring(node)
+        if not doc or not doc.strip():
+            return ""
+        # The first paragraph, on one line
+        line = " ".join(doc.strip().split("\n\n", 1)[0].split())
+        if '"""' in line or line.endswith(('"', "\\")):
+            return repr(line)
+        return '"""' + line + '"""'
+
+
+def _import_line(node: ast.stmt) -> str:
+    names = ", ".join(
+        alias.name + (f" as {alias.asname}" if alias.asname else "")
+        for alias in node.names
+    )
+    if isinstance(node, ast.Import):
+        return f"import {names}"
+    return f"from {'.' * node.level}{node.module or ''} import {names}"
+
+
+# ----- JavaScript / TypeScript -----
+
+_JS_IMPORT = re.compile(r"(?:import\b|export\s*(?:\*|\{)|(?:const|let|var)\s.*=\s*require\s*\()")
+_JS_DECLARATION = re.compile(
+    r"(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?"
+    r"(?:(?:async\s+)?function\b|class\b|interface\b|enum\b|type\s+[\w$]+|namespace\b)"
+)
+_JS_CLASS = re.compile(r"(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?class\b")
+_JS_VARIABLE = re.compile(r"(?:export\s+)?(?:const|let|var)\s+[\w$]+")
+_JS_EXPORTS = re.compile(r"(?:module\.)?exports\b")
+_JS_FUNCTION_VALUE = re.compile(r"=>|=\s*(?:async\s+)?function\b")
+_JS_MEMBER = re.compile(
+    r"(?:(?:public|private|protected|static|readonly|abstract|override|async|get|set|declare)\s+)*"
+    r"\*?(?:#?[\w$]+|\[[^\]]+\])\s*\??\s*(?:<[^>]*>)?\s*\("
+)
+_JS_KEYWORDS = {"if", "for", "while", "switch", "catch", "return", "function", "with"}
+# A '/' after one of these (or at the start of a line) starts a regex literal, not a division
+_JS_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+
+# How many physical lines one signature may span
+MAX_JS_HEADER_LINES = 10
+
+
+def outline_js(content: str, docstrings: bool = True) -> str:
+    """
+    Outline of a JavaScript or TypeScript module.
+    """
+    texts = content.split("\n")
+    codes, depths, docs = _scan_js(content)
+    out = [OUTLINE_MARKER]
+    classes = []  # type: List[int]  # body depth of each open class
+
+    for row, code in enumerate(codes):
+        depth = depths[row]
+        while classes and depth < classes[-1]:
+            classes.pop()
+            out.append("  " * len(classes) + "}")
+        if depth != (classes[-1] if classes else 0) or not code.strip():
+            continue
+
+        indent = "  " * len(classes)
+        text, joined = _js_header(texts, codes, depths, row, through_brackets=False)
+        if not classes and _JS_IMPORT.match(joined):
+            text, joined = _js_header(texts, codes, depths, row, through_brackets=True)
+            out.append(text)
+            continue
+
+        if classes:
+            member = _JS_MEMBER.match(joined)
+            if member is None or joined.split("(", 1)[0].split()[-1] in _JS_KEYWORDS:
+                continue
+        elif not _JS_DECLARATION.match(joined) and not _JS_EXPORTS.match(joined) and not (
+            _JS_VARIABLE.match(joined) and _JS_FUNCTION_VALUE.search(joined)
+        ):
+            continue
+
+        if docstrings and docs[row]:
+            out.append(indent + "/** " + docs[row] + " */")
+        arrow = joined.find("=>")
+        if not classes and arrow >= 0 and _JS_VARIABLE.match(joined):
+            out.append(indent + text[:arrow + 2] + " ...")
+            continue
+        brace = _body_brace(joined)
+        if brace >= 0:
+            if not classes and _JS_CLASS.match(joined) and joined.endswith("{"):
+                out.append(indent + text[:brace].rstrip() + " {")
+                classes.append(depth + 1)
+            else:
+                out.append(indent + text[:brace].rstrip() + " { ... }")
+            continue
+        out.append(indent + text)
+
+    while classes:
+        classes.pop()
+        out.append("  " * len(classes) + "}")
+    return "\n".join(out)
+
+
+def _body_brace(code: str) -> int:
+    """
+    Index of the first '{' outside parentheses and square brackets, or -1.
+    """
+    depth = 0
+    for i, c in enumerate(code):
+        if c in "([":
+            depth += 1
+        elif c in ")]":
+            depth -= 1
+        elif c == "{" and depth == 0:
+            return i
+    return -1
+
+
+def _js_header(
+    texts: List[str],
+    codes: List[str],
+    depths: List[int],
+    row: int,
+    through_brackets: bool
+) -> Tuple[str, str]:
+    """
+    The statement starting at 'row' as (source text, code), joined onto one
+    line. It continues onto following lines while they are nested deeper;
+    unless 'through_brackets', only until a line ends with '{' or ';' (the
+    start of a body), and for at most MAX_JS_HEADER_LINES lines.
+    Comments are dropped, and the two strings line up character for character.
+    """
+    text_parts, code_parts = [], []  # type: List[str], List[str]
+    end = row
+    while True:
+        code = codes[end]
+        start, stop = len(code) - len(code.lstrip()), len(code.rstrip())
+        text_parts.append(texts[end][start:stop])
+        code_parts.append(code[start:stop])
+        end += 1
+        if end >= len(codes) or depths[end] <= depths[row]:
+            break
+        if not through_brackets and (
+            end - row >= MAX_JS_HEADER_LINES or code_parts[-1].endswith(("{", ";"))
+        ):
+            break
+    return " ".join(text_parts), " ".join(code_parts)
+
+
+def _scan_js(content: str) -> Tuple[List[str], List[int], List[Optional[str]]]:
+    """
+    Split JS/TS source into lines and return, per line:
+      - its code, with comments and the insides of string, template and regex
+        literals blanked to spaces (so it lines up with the original line),
+      - the bracket depth at its start,
+      - the first line of a /** ... */ comment directly above it, if any.
+    """
+    codes = []  # type: List[str]
+    depths = []  # type: List[int]
+    docs = []  # type: List[Optional[str]]
+    code = []  # type: List[str]
+    depth = 0
+    line_depth = 0
+    pending_doc = None  # type: Optional[str]
+
+    def end_line() -> None:
+        nonlocal code, line_depth, pending_doc
+        line = "".join(code)
+        codes.append(line)
+        depths.append(line_depth)
+        if line.strip():
+            docs.append(pending_doc)
+            pending_doc = None
+        else:
+            docs.append(None)
+        code = []
+        line_depth = depth
+
+    i, n = 0, len(content)
+    while i < n:
+        c = content[i]
+        if c == "\n":
+            end_line()
+            i += 1
+        elif c == "/" and content.startswith("//", i):
+            end = content.find("\n", i)
+            end = n if end < 0 else end
+            code.append(" " * (end - i))
+            i = end
+        elif c == "/" and content.startswith("/*", i):
+            end = content.find("*/", i + 2)
+            end = n if end < 0 else end + 2
+            comment = content[i:end]
+            if comment.startswith("/**") and comment != "/**/":
+                pending_doc = _jsdoc_summary(comment) or pending_doc
+            for piece_index, piece in enumerate(comment.split("\n")):
+                if piece_index:
+                    end_line()
+                code.append(" " * len(piece))
+            i = end
+        elif c in "'\"`":
+            end = _string_end(content, i, c)
+            # The opening quote is kept, so the literal still shows as one
+            for piece_index, piece in enumerate(content[i:end].split("\n")):
+                if piece_index:
+                    end_line()
+                    code.append(" " * len(piece))
+                else:
+                    code.append(c + " " * (len(piece) - 1))
+            i = end
+        elif c == "/" and _starts_regex(code):
+            end = _regex_end(content, i)
+            code.append("/" + " " * (end - i - 1))
+            i = end
+        else:
+            if c in _OPENERS:
+                depth += 1
+            elif c in _CLOSERS:
+                depth = max(depth - 1, 0)
+            code.append(c)
+            i += 1
+    end_line()
+    return codes, depths, docs
+
+
+def _string_end(content: str, start: int, quote: str) -> int:
+    """
+    Index just past the literal opened at 'start'. Ordinary strings also end
+    at a line break (so a stray quote cannot swallow the rest of the file);
+    template literals may span lines.
+    """
+    i, n = start + 1, len(content)
+    while i < n:
+        c = content[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == quote:
+            return i + 1
+        if c == "\n" and quote != "`":
+            return i
+        i += 1
+    return n
+
+
+def _starts_regex(code: List[str]) -> bool:
+    line = "".join(code).rstrip()
+    if not line:
+        return True
+    return line[-1] in _JS_REGEX_PRECEDERS or line.endswith(("return", "typeof"))
+
+
+def _regex_end(content: str, start: int) -> int:
+    i, n = start + 1, len(content)
+    in_class = False
+    while i < n:
+        c = content[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "\n":
+            return i
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            return i + 1
+        i += 1
+    return n
+
+
+def _jsdoc_summary(comment: str) -> Optional[str]:
+    for line in comment[3:-2].split("\n"):
+        line = line.strip().lstrip("*").strip()
+        if line and not line.startswith("@"):
+            return line
+    return None
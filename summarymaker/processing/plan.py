@@ -0,0 +1,91 @@
+# danai/summarymaker/processing/plan.py
+"""
+Per-extension processor plans.
+
+Processors declare which file extensions they can change (see
+BaseProcessor.applies_to). A ProcessorPlan asks every processor once per
+extension and keeps the answer, so each file only passes through the
+processors that can change it (a .json file never enters a Python-only
+processor) for the cost of one dict lookup.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from .baseprocessor import file_extension
+
+# How many plans processor_plan keeps before starting over
+MAX_CACHED_PLANS = 32
+
+
+class ProcessorPlan:
+    """
+    A processor chain, narrowed down for each file extension on first use.
+
+    Usage Example:
+        plan = processor_plan(config.processors)
+        for processor in plan.chain(path):
+            content = processor.process(content, path)
+    """
+
+    def __init__(self, processors: Sequence[object]):
+        self.processors = tuple(processors)
+        # extension -> ((position in self.processors, processor), ...)
+        self._steps = {}  # type: Dict[str, Tuple[Tuple[int, object], ...]]
+        self._chains = {}  # type: Dict[str, List[object]]
+
+    def chain(self, filepath: str) -> List[object]:
+        """
+        The processors that apply to 'filepath', in order. Running these gives
+        the same result as running the whole chain.
+        """
+        ext = file_extension(filepath)
+        chain = self._chains.get(ext)
+        if chain is None:
+            self._compile(ext)
+            chain = self._chains[ext]
+        return chain
+
+    def steps(self, filepath: str) -> Tuple[Tuple[int, object], ...]:
+        """
+        Like chain(), but with each processor's position in the full chain.
+        """
+        ext = file_extension(filepath)
+        steps = self._steps.get(ext)
+        if steps is None:
+            steps = self._compile(ext)
+        return steps
+
+    def _compile(self, ext: str) -> Tuple[Tuple[int, object], ...]:
+        steps = tuple(
+            (position, processor)
+            for position, processor in enumerate(self.processors)
+            if _applies(processor, ext)
+        )
+        self._steps[ext] = steps
+        self._chains[ext] = [processor for _, processor in steps]
+        return steps
+
+
+# tuple of processor ids -> plan. An id can be reused once its processor is
+# garbage collected, so a hit only counts if the plan holds the same objects.
+_plans = {}  # type: Dict[Tuple[int, ...], ProcessorPlan]
+
+
+def processor_plan(processors: Sequence[object]) -> ProcessorPlan:
+    """
+    The plan for 'processors', built the first time they are used and shared
+    by every later call with the same processor objects (in this process).
+    """
+    processors = tuple(processors)
+    key = tuple(id(processor) for processor in processors)
+    plan = _plans.get(key)
+    if plan is None or not all(a is b for a, b in zip(plan.processors, processors)):
+        if len(_plans) >= MAX_CACHED_PLANS:
+            _plans.clear()
+        plan = _plans[key] = ProcessorPlan(processors)
+    return plan
+
+
+def _applies(processor: object, ext: str) -> bool:
+    applies_to = getattr(processor, "applies_to", None)
+    return applies_to(ext) if applies_to is not None else True
@@ -3,13 +3,19 @@ Processor to remove all print statements from file content.
 """
 
 import re
-from .baseprocessor import BaseProcessor
+from .baseprocessor import BaseProcessor, file_extension
+
+# Regular expression to match print statements
+_PRINT_PATTERN = re.compile(r'print\(.*?\)\s*', re.DOTALL)
 
 class RemovePrintStatementsProcessor(BaseProcessor):
     """
     Removes all print statements from the file content.
     """
+    def applies_to(self, ext: str) -> bool:
+        return ext == '.py'
+
     def process(self, content: str, filepath: str) -> str:
-        # Regular expression to match print statements
-        print_pattern = re.compile(r'print\(.*?\)\s*', re.DOTALL)
-        return re.sub(print_pattern, '', content)
\ No newline at end of file
+        if file_extension(filepath) != '.py':
+            return content
+        return _PRINT_PATTERN.sub('', content)
\ No newline at end of file
@@ -0,0 +1,379 @@
+# danai/summarymaker/processing/pythonstripper.py
+"""
+Python-aware processor built on the stdlib 'tokenize' module.
+
+Strips comments, docstrings, print calls and annotations and condenses
+module-level imports in a single linear pass over each file's tokens, instead
+of one backtracking regex scan per transformation.
+"""
+
+import io
+import keyword
+import tokenize
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from .baseprocessor import BaseProcessor, file_extension
+
+_OPENERS = {"(", "[", "{"}
+_CLOSERS = {")", "]", "}"}
+_SKIPPED = {tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT}
+# Statements starting with these are never annotated assignments, even when a
+# one-line body follows their ':' ('case [a]: y = 1'). 'match' and 'case' are
+# soft keywords, so keyword.iskeyword does not cover them.
+_COMPOUND_KEYWORDS = {
+    "if", "elif", "else", "for", "while", "with", "try", "except", "finally",
+    "def", "class", "async", "lambda", "match", "case",
+}
+
+
+class PythonStripProcessor(BaseProcessor):
+    """
+    Strips Python source down for summaries, replacing the regex-based
+    RemoveCommentsProcessor (for .py), RemoveTypingHintsProcessor,
+    RemovePrintStatementsProcessor and CondenseImportsProcessor.
+
+    - comments: every '#' comment (full-line comments drop the whole line).
+    - docstrings: module, class and function docstrings.
+    - prints: statements that consist of a single print(...) call.
+    - annotations: parameter and return annotations, and annotations on
+      assignments ('x: int = 1' -> 'x = 1'). Bare declarations such as
+      dataclass fields ('x: int') are kept, since removing them loses structure.
+    - condense_imports: module-level imports are collected into a single
+      'truncated_imports:[...]' line at the top, as CondenseImportsProcessor does.
+
+    If removing statements would leave a block empty, a 'pass' is put in its place,
+    so the output stays valid Python. Files that fail to tokenize are returned unchanged.
+
+    Usage Example:
+        config.processors = [PythonStripProcessor(prints=False)]
+    """
+
+    def __init__(
+        self,
+        comments: bool = True,
+        docstrings: bool = True,
+        prints: bool = True,
+        annotations: bool = True,
+        condense_imports: bool = True
+    ):
+        self.comments = comments
+        self.docstrings = docstrings
+        self.prints = prints
+        self.annotations = annotations
+        self.condense_imports = condense_imports
+
+    def applies_to(self, ext: str) -> bool:
+        return ext == '.py'
+
+    def process(self, content: str, filepath: str) -> str:
+        if file_extension(filepath) != '.py':
+            return content
+        try:
+            return _PythonStripper(self).run(content)
+        except (tokenize.TokenError, IndentationError, SyntaxError):
+            return content
+
+
+class _Block:
+    __slots__ = ("indent", "kept", "first_dropped")
+
+    def __init__(self, indent: str):
+        self.indent = indent
+        self.kept = 0
+        self.first_dropped = None  # type: Optional[int]
+
+
+class _PythonStripper:
+    """
+    One-shot state for stripping a single file.
+    """
+
+    def __init__(self, options: PythonStripProcessor):
+        self.options = options
+        self.lines = []  # type: List[str]
+        self.drop_rows = set()  # type: Set[int]
+        self.pass_rows = {}  # type: Dict[int, str]
+        self.spans = {}  # type: Dict[int, List[Tuple[int, int]]]
+        self.imports = OrderedDict()  # type: OrderedDict
+        self.blocks = [_Block("")]
+        self.expect_docstring = True
+        self.last_was_header = False
+
+    def run(self, content: str) -> str:
+        reader = io.StringIO(content).readline
+
+        def readline() -> str:
+            line = reader()
+            if line:
+                self.lines.append(line)
+            return line
+
+        statement = []  # type: List[tokenize.TokenInfo]
+        for tok in tokenize.generate_tokens(readline):
+            if tok.type == tokenize.COMMENT:
+                if self.options.comments:
+                    self._drop_comment(tok)
+            elif tok.type == tokenize.INDENT:
+                self.blocks.append(_Block(tok.string))
+                self.expect_docstring = self.last_was_header
+            elif tok.type == tokenize.DEDENT:
+                self._close_block(self.blocks.pop())
+            elif tok.type == tokenize.NEWLINE:
+                if statement:
+                    self._statement(statement)
+                statement = []
+            elif tok.type not in _SKIPPED and tok.type != tokenize.ENDMARKER:
+                statement.append(tok)
+
+        return self._rebuild()
+
+    # ----- per-statement decisions -----
+
+    def _statement(self, toks: List[tokenize.TokenInfo]) -> None:
+        first = toks[0]
+        block = self.blocks[-1]
+        expect_docstring = self.expect_docstring
+        self.expect_docstring = False
+        self.last_was_header = (
+            (first.string in ("def", "class") or (first.string == "async" and len(toks) > 1 and toks[1].string == "def"))
+            and toks[-1].string == ":"
+        )
+
+        if expect_docstring and self.options.docstrings and all(t.type == tokenize.STRING for t in toks):
+            self._drop_statement(toks, block)
+            return
+
+        if self.options.prints and first.type == tokenize.NAME and first.string == "print" \
+                and len(toks) > 1 and toks[1].string == "(" and _matching_close(toks, 1) == len(toks) - 1:
+            self._drop_statement(toks, block)
+            return
+
+        if self.options.condense_imports and len(self.blocks) == 1 and first.string in ("import", "from"):
+            if self._collect_import(toks):
+                self._drop_statement(toks, block)
+                return
+
+        if self.options.annotations:
+            header_end = _def_header_end(toks)
+            if header_end != -1:
+                # Also covers one-line defs ('def f(x: int): return x')
+                self._strip_signature(toks[:header_end + 1])
+            elif first.type == tokenize.NAME and first.string not in _COMPOUND_KEYWORDS \
+                    and not keyword.iskeyword(first.string):
+                self._strip_assignment_annotation(toks)
+
+        block.kept += 1
+
+    def _drop_statement(self, toks: List[tokenize.TokenInfo], block: _Block) -> None:
+        start_row, end_row = toks[0].start[0], toks[-1].end[0]
+        self.drop_rows.update(range(start_row, end_row + 1))
+        if block.first_dropped is None:
+            block.first_dropped = start_row
+
+    def _close_block(self, block: _Block) -> None:
+        if block.kept == 0 and block.first_dropped is not None:
+            self.pass_rows[block.first_dropped] = block.indent + "pass\n"
+
+    def _drop_comment(self, tok: tokenize.TokenInfo) -> None:
+        row, col = tok.start
+        line = self.lines[row - 1]
+        start = col
+        while start > 0 and line[start - 1] in " \t":
+            start -= 1
+        if start == 0:
+            self.drop_rows.add(row)
+        else:
+            self.spans.setdefault(row, []).append((start, tok.end[1]))
+
+    def _collect_import(self, toks: List[tokenize.TokenInfo]) -> bool:
+        names = [t.string for t in toks]
+        if names[0] == "import":
+            # import a.b as c, d
+            for part in _split_top_level(toks[1:]):
+                if "as" in part:
+                    part = part[:part.index("as")]
+                self.imports.setdefault("".join(part), set())
+            return True
+
+        # from x import a, b as c / from . import (x, y) / from x import *
+        if "import" not in names:
+            return False
+        split_at = names.index("import")
+        module = "".join(names[1:split_at])
+        items = self.imports.setdefault(module, set())
+        for part in _split_top_level(toks[split_at + 1:]):
+            words = [w for w in part if w not in ("(", ")")]
+            if words:
+                items.add(" ".join(words))
+        return True
+
+    def _strip_signature(self, toks: List[tokenize.TokenInfo]) -> None:
+        """
+        Remove parameter annotations and the return annotation from a def header.
+        """
+        depth = 0
+        in_default = False
+        open_lambdas = 0
+        i = 0
+        while i < len(toks):
+            tok = toks[i]
+            s = tok.string
+            if tok.type == tokenize.NAME and s == "lambda":
+                # A lambda's parameter list ends at its own ':'
+                open_lambdas += 1
+            elif s == ":" and open_lambdas:
+                open_lambdas -= 1
+            elif tok.type == tokenize.OP and s in _OPENERS:
+                depth += 1
+            elif tok.type == tokenize.OP and s in _CLOSERS:
+                depth -= 1
+            elif depth == 1 and s == ",":
+                in_default = False
+            elif depth == 1 and s == "=":
+                in_default = True
+            elif depth == 1 and s == ":" and not in_default and i > 0 and toks[i - 1].type == tokenize.NAME:
+                # Parameter annotation: runs to the next ',', '=' or ')' at depth 1
+                end = i + 1
+                inner = 0
+                while end < len(toks):
+                    e = toks[end].string
+                    if toks[end].type == tokenize.OP and e in _OPENERS:
+                        inner += 1
+                    elif toks[end].type == tokenize.OP and e in _CLOSERS:
+                        if inner == 0:
+                            break
+                        inner -= 1
+                    elif inner == 0 and e in (",", "="):
+                        break
+                    end += 1
+                self._add_span(tok.start, toks[end - 1].end)
+                i = end
+                continue
+            elif depth == 0 and s == "->":
+                # Return annotation: runs to the header's final ':'
+                self._add_span(toks[i - 1].end, toks[-2].end)
+                return
+            i += 1
+
+    def _strip_assignment_annotation(self, toks: List[tokenize.TokenInfo]) -> None:
+        """
+        'target: annotation = value' -> 'target = value'. Bare declarations are kept.
+        """
+        colon = _annotation_colon(toks)
+        if colon is None:
+            return
+        depth = 0
+        for j in range(colon + 1, len(toks)):
+            s = toks[j].string
+            if toks[j].type == tokenize.OP and s in _OPENERS:
+                depth += 1
+            elif toks[j].type == tokenize.OP and s in _CLOSERS:
+                depth -= 1
+            elif depth == 0 and s == "=":
+                self._add_span(toks[colon].start, toks[j - 1].end)
+                return
+
+    def _add_span(self, start: Tuple[int, int], end: Tuple[int, int]) -> None:
+        # Only single-line spans are removed; annotations wrapped over
+        # several lines are left as they are.
+        if start[0] == end[0] and end[1] > start[1]:
+            self.spans.setdefault(start[0], []).append((start[1], end[1]))
+
+    # ----- output -----
+
+    def _rebuild(self) -> str:
+        out = []  # type: List[str]
+        for row, line in enumerate(self.lines, 1):
+            if row in self.pass_rows:
+                out.append(self.pass_rows[row])
+                continue
+            if row in self.drop_rows:
+                continue
+            spans = self.spans.get(row)
+            if spans:
+                for start, end in sorted(spans, reverse=True):
+                    line = line[:start] + line[end:]
+            out.append(line)
+        body = "".join(out)
+
+        if not self.imports:
+            return body
+        condensed = []
+        for module, items in self.imports.items():
+            if items:
+                condensed.append(f"{module}[{', '.join(sorted(items))}]")
+            else:
+                condensed.append(module)
+        return f"truncated_imports:[{', '.join(condensed)}]" + "\n" + body.strip()
+
+
+def _matching_close(toks: List[tokenize.TokenInfo], open_index: int) -> int:
+    depth = 0
+    for i in range(open_index, len(toks)):
+        tok = toks[i]
+        if tok.type == tokenize.OP and tok.string in _OPENERS:
+            depth += 1
+        elif tok.type == tokenize.OP and tok.string in _CLOSERS:
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def _def_header_end(toks: List[tokenize.TokenInfo]) -> int:
+    """
+    Index of the ':' ending a 'def name(...) [-> ...]:' header at the start of
+    'toks', or -1 if the statement is not a def.
+    """
+    i = 1 if toks[0].string == "async" else 0
+    if len(toks) < i + 4 or toks[i].string != "def" or toks[i + 2].string != "(":
+        return -1
+    close = _matching_close(toks, i + 2)
+    if close == -1:
+        return -1
+    depth = 0
+    for j in range(close + 1, len(toks)):
+        tok = toks[j]
+        if tok.type == tokenize.OP and tok.string in _OPENERS:
+            depth += 1
+        elif tok.type == tokenize.OP and tok.string in _CLOSERS:
+            depth -= 1
+        elif depth == 0 and tok.string == ":":
+            return j
+    return -1
+
+
+def _annotation_colon(toks: List[tokenize.TokenInfo]) -> Optional[int]:
+    """
+    Index of the ':' in 'name(.attr|[...])*: ...', or None if the statement
+    does not start with an annotated target.
+    """
+    i = 1
+    while i < len(toks):
+        s = toks[i].string
+        if s == ":":
+            return i
+        if s == "." and i + 1 < len(toks) and toks[i + 1].type == tokenize.NAME:
+            i += 2
+        elif s == "[":
+            close = _matching_close(toks, i)
+            if close == -1:
+                return None
+            i = close + 1
+        else:
+            return None
+    return None
+
+
+def _split_top_level(toks: List[tokenize.TokenInfo]) -> List[List[str]]:
+    """
+    Split import name tokens on top-level commas.
+    """
+    parts = [[]]  # type: List[List[str]]
+    for tok in toks:
+        if tok.string == ",":
+            parts.append([])
+        else:
+            parts[-1].append(tok.string)
+    return [p for p in parts if p]
@@ -3,7 +3,12 @@ Processor to remove comments from various file types.
 """
 
 import re
-from .baseprocessor import BaseProcessor
+from .baseprocessor import BaseProcessor, file_extension
+from .fused import PASSTHROUGH, LineFilter
+
+_JS_LINE_COMMENT = re.compile(r'//.*')
+_BLOCK_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_HTML_COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
 
 class RemoveCommentsProcessor(BaseProcessor):
     """
@@ -13,7 +18,7 @@ class RemoveCommentsProcessor(BaseProcessor):
         self.extensions = extensions
 
     def process(self, content: str, filepath: str) -> str:
-        ext = filepath.split('.')[-1]
+        ext = file_extension(filepath)[1:]
         if ext in self.extensions:
             if ext == 'py':
                 return self._remove_python_comments(content)
@@ -29,6 +34,25 @@ class RemoveCommentsProcessor(BaseProcessor):
                 return self._remove_general_comments(content)
         return content
 
+    def applies_to(self, ext: str) -> bool:
+        return bool(ext) and ext[1:] in self.extensions
+
+    def line_stage(self, filepath: str):
+        ext = file_extension(filepath)[1:]
+        if ext not in self.extensions:
+            return PASSTHROUGH
+        if ext in ['py', 'rb', 'erb']:
+            return LineFilter(_drop_hash_comment)
+        elif ext in ['js', 'css', 'html']:
+            # Block comments can span lines
+            return None
+        else:
+            return LineFilter(_drop_general_comment)
+
+    def dedup_key(self, filepath: str):
+        ext = file_extension(filepath)[1:]
+        return ext if ext in self.extensions else None
+
     def _remove_python_comments(self, content: str) -> str:
         lines = content.split("\n")
         new_lines = []
@@ -40,18 +64,18 @@ class RemoveCommentsProcessor(BaseProcessor):
 
     def _remove_js_comments(self, content: str) -> str:
         # Remove single-line and multi-line comments
-        content = re.sub(r'//.*', '', content)
-        content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
+        content = _JS_LINE_COMMENT.sub('', content)
+        content = _BLOCK_COMMENT.sub('', content)
         return content
 
     def _remove_css_comments(self, content: str) -> str:
         # Remove multi-line comments
-        content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
+        content = _BLOCK_COMMENT.sub('', content)
         return content
 
     def _remove_html_comments(self, content: str) -> str:
         # Remove HTML comments
-        content = re.sub(r'<!--.*?-->', '', content, flags=re.DOTALL)
+        content = _HTML_COMMENT.sub('', content)
         return content
 
     def _remove_ruby_comments(self, content: str) -> str:
@@ -72,4 +96,13 @@ class RemoveCommentsProcessor(BaseProcessor):
             if line.strip().startswith("#") or line.strip().startswith("//"):
                 continue
             new_lines.append(line)
-        return "\n".join(new_lines)
\ No newline at end of file
+        return "\n".join(new_lines)
+
+
+def _drop_hash_comment(line: str):
+    return None if line.strip().startswith("#") else line
+
+
+def _drop_general_comment(line: str):
+    stripped = line.strip()
+    return None if stripped.startswith("#") or stripped.startswith("//") else line
@@ -0,0 +1,81 @@
+# danai/summarymaker/processing/tokentruncator.py
+"""
+Extended processor: truncates content to token limits rather than line counts.
+"""
+
+from typing import Dict, List, Optional
+from .truncator import TRUNCATION_MARKER, TruncateProcessor
+from ..tcounter import tokencount_text, truncate_to_tokens
+
+class TokenTruncateProcessor(TruncateProcessor):
+    """
+    Truncates file content to a number of tokens, based on:
+      1. Extension-specific token limits (via 'rules' dict).
+      2. An optional 'default' token limit for extensions not in 'rules'.
+      3. A list of 'exceptions' that should never be truncated.
+
+    The limit includes the truncation marker, so unlike a line limit it also
+    bounds long-lined files such as minified bundles.
+
+    Usage Example:
+        config.processors = [
+            TokenTruncateProcessor(
+                rules={".json": 500},
+                default=4000,  # anything else truncated at 4000 tokens
+                exceptions=["README.md"]
+            )
+        ]
+    """
+
+    def __init__(
+        self,
+        rules: Optional[Dict[str, int]] = None,
+        default: Optional[int] = None,
+        exceptions: Optional[List[str]] = None,
+        model: str = "gpt-4o"
+    ):
+        """
+        :param rules: A dict mapping file extensions (e.g. ".json") to max token count.
+        :param default: A token limit to apply if the extension isn't in rules (None => no limit).
+        :param exceptions: A list of filenames or paths to NEVER truncate
+                           (matching absolute path or just basename).
+        :param model: Model whose tokeniser the limits are measured in.
+        """
+        super().__init__(rules or {}, default, exceptions)
+        self.model = model
+
+    def process(self, content: str, filepath: str) -> str:
+        limit = self.token_limit(filepath)
+
+        # If limit is None, we do not truncate this file
+        if limit is None:
+            return content
+        return truncate_with_marker(content, limit, self.model)
+
+    def line_stage(self, filepath: str):
+        # Token limits depend on the whole prefix, not on single lines
+        return None
+
+    def token_limit(self, filepath: str) -> Optional[int]:
+        """
+        The token limit that applies to 'filepath', or None if it is not truncated.
+        """
+        return self._limit(filepath)
+
+    def line_limit(self, filepath: str) -> Optional[int]:
+        # Files are never cut at a line count (see token_limit)
+        return None
+
+
+def truncate_with_marker(content: str, max_tokens: int, model: str = "gpt-4o") -> str:
+    """
+    Truncate 'content' so that it, plus a trailing truncation marker line,
+    fits within 'max_tokens'. Content that already fits is returned unchanged.
+    """
+    prefix, truncated = truncate_to_tokens(content, max_tokens, model)
+    if not truncated:
+        return content
+    marker = "\n" + TRUNCATION_MARKER
+    room = max(max_tokens - tokencount_text(marker, model), 0)
+    prefix, _ = truncate_to_tokens(prefix, room, model)
+    return prefix + marker
@@ -6,7 +6,10 @@ an optional default, and a list of exceptions.
 
 import os
 from typing import Optional, Dict, List
-from .baseprocessor import BaseProcessor
+from .baseprocessor import BaseProcessor, file_extension
+from .fused import PASSTHROUGH, LineLimit
+
+TRUNCATION_MARKER = "... [CONTENT TRUNCATED] ..."
 
 class TruncateProcessor(BaseProcessor):
     """
@@ -42,19 +45,7 @@ class TruncateProcessor(BaseProcessor):
         self.exceptions = exceptions or []
 
     def process(self, content: str, filepath: str) -> str:
-        # If the file is an exception, skip truncation
-        if self._is_exception(filepath):
-            return content
-
-        # Extract extension
-        _, ext = os.path.splitext(filepath)
-        ext = ext.lower()
-
-        # Figure out the line limit for this extension
-        if ext in self.rules:
-            limit = self.rules[ext]
-        else:
-            limit = self.default
+        limit = self._limit(filepath)
 
         # If limit is None, we do not truncate this file
         if limit is None:
@@ -63,10 +54,47 @@ class TruncateProcessor(BaseProcessor):
         lines = content.split("\n")
         if len(lines) > limit:
             truncated = lines[:limit]
-            truncated.append("... [CONTENT TRUNCATED] ...")
+            truncated.append(TRUNCATION_MARKER)
             return "\n".join(truncated)
         return content
 
+    def applies_to(self, ext: str) -> bool:
+        # The exceptions only ever turn truncation off
+        return self.default is not None or ext.lower() in self.rules
+
+    def line_stage(self, filepath: str):
+        limit = self._limit(filepath)
+        if limit is None:
+            return PASSTHROUGH
+        # Negative limits slice from the end, which needs the whole file
+        return LineLimit(limit, TRUNCATION_MARKER) if limit >= 0 else None
+
+    def dedup_key(self, filepath: str):
+        # Exceptions can match the full path, so the limit itself is the key
+        return self._limit(filepath)
+
+    def line_limit(self, filepath: str) -> Optional[int]:
+        """
+        The line limit that applies to 'filepath', or None if it is not truncated.
+        """
+        return self._limit(filepath)
+
+    def _limit(self, filepath: str) -> Optional[int]:
+        """
+        The rule, default or exception that applies to 'filepath', in whatever
+        unit this processor truncates by (None => not truncated).
+        """
+        # If the file is an exception, skip truncation
+        if self._is_exception(filepath):
+            return None
+
+        ext = file_extension(filepath).lower()
+
+        # Figure out the line limit for this extension
+        if ext in self.rules:
+            return self.rules[ext]
+        return self.default
+
     def _is_exception(self, filepath: str) -> bool:
         """
         Check if 'filepath' matches any item in 'self.exceptions'.
@@ -4,13 +4,19 @@ Processor to remove all typing hints (docstrings) from file content.
 """
 
 import re
-from .baseprocessor import BaseProcessor
+from .baseprocessor import BaseProcessor, file_extension
+
+# Regular expression to match docstrings
+_DOCSTRING_PATTERN = re.compile(r'""".*?"""', re.DOTALL)
 
 class RemoveTypingHintsProcessor(BaseProcessor):
     """
     Removes all typing hints (docstrings) from the file content.
     """
+    def applies_to(self, ext: str) -> bool:
+        return ext == '.py'
+
     def process(self, content: str, filepath: str) -> str:
-        # Regular expression to match docstrings
-        docstring_pattern = re.compile(r'""".*?"""', re.DOTALL)
-        return re.sub(docstring_pattern, '', content)
\ No newline at end of file
+        if file_extension(filepath) != '.py':
+            return content
+        return _DOCSTRING_PATTERN.sub('', content)
\ No newline at end of file
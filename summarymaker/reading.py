@@ -0,0 +1,176 @@
+# danai/summarymaker/reading.py
+"""
+Reads source files for the pipeline.
+"""
+
+import hashlib
+import io
+from typing import Iterator, List, Optional, Tuple
+
+from .config import SummaryConfig
+
+# Values of config.oversize_files.
+OVERSIZE_MODES = ("skip", "head")
+
+# Appended when only the head of an oversized file is read.
+HEAD_SAMPLE_MARKER = "... [CONTENT TRUNCATED] ..."
+
+# How much of a lazily read file is kept to estimate its token count.
+LINE_SAMPLE_CHARS = 64 * 1024
+
+# Prefixed to the hash of a file that was only read in part, so that two files
+# sharing a head never look identical, and the hash is never taken for (or
+# compared with) that of a whole file.
+PARTIAL_HASH_PREFIX = "partial:"
+
+
+def read_source(path: str, max_bytes: Optional[int] = None) -> Tuple[str, str]:
+    """
+    Read a file as UTF-8 text with universal newlines, exactly as open(path, "r")
+    would, and return (text, sha256 of the bytes read).
+
+    If max_bytes is given and the file is larger, only its first max_bytes are
+    read. The sample is cut back to the last complete line and followed by
+    HEAD_SAMPLE_MARKER, and its hash is marked with PARTIAL_HASH_PREFIX.
+    """
+    with open(path, "rb") as f:
+        if max_bytes is None:
+            data = f.read()
+            sampled = False
+        else:
+            data = f.read(max_bytes + 1)
+            sampled = len(data) > max_bytes
+
+    if sampled:
+        data = data[:max_bytes]
+        cut = data.rfind(b"\n")
+        if cut != -1:
+            data = data[:cut + 1]
+
+    text = _decode(data)
+    digest = hashlib.sha256(data).hexdigest()
+    if sampled:
+        return text + HEAD_SAMPLE_MARKER, PARTIAL_HASH_PREFIX + digest
+    return text, digest
+
+
+def is_partial_hash(content_hash: str) -> bool:
+    """
+    Whether 'content_hash' only covers the part of a file that was read.
+    """
+    return content_hash.startswith(PARTIAL_HASH_PREFIX)
+
+
+def read_limit(config: SummaryConfig) -> Optional[int]:
+    """
+    Byte limit to pass to read_source for this config, if any.
+    """
+    if config.max_file_bytes is not None and config.oversize_files == "head":
+        return config.max_file_bytes
+    return None
+
+
+class LineSource:
+    """
+    Lazily reads a file's lines, decoded exactly as read_source would and split
+    exactly as text.split("\n") would, so a consumer that stops early never
+    reads (or holds) the rest of the file.
+
+    Use as a context manager. Afterwards, 'sample' holds the first lines read
+    (up to LINE_SAMPLE_CHARS), 'exhausted' tells whether the whole file was
+    read, and hexdigest() is the sha256 of the bytes actually read (marked
+    with PARTIAL_HASH_PREFIX unless that was the whole file).
+
+    Usage Example:
+        with LineSource(path) as source:
+            head = [line for _, line in zip(range(10), source)]
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.exhausted = False
+        self._sample = []  # type: List[str]
+        self._sampled = 0
+        self._capped = False
+        self._digest = hashlib.sha256()
+        self._text = None  # type: Optional[io.TextIOWrapper]
+
+    def __enter__(self) -> "LineSource":
+        raw = _HashingReader(open(self.path, "rb"), self._digest)
+        self._text = io.TextIOWrapper(io.BufferedReader(raw), encoding="utf-8", errors="replace", newline=None)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._text.close()
+
+    def __iter__(self) -> Iterator[str]:
+        ended_with_newline = True
+        for line in self._text:
+            ended_with_newline = line.endswith("\n")
+            if ended_with_newline:
+                line = line[:-1]
+            self._add_to_sample(line)
+            yield line
+        if ended_with_newline:
+            # 'a\n'.split('\n') == ['a', ''] and ''.split('\n') == ['']
+            self._add_to_sample("")
+            yield ""
+        self.exhausted = True
+
+    @property
+    def sample(self) -> str:
+        return "\n".join(self._sample)
+
+    def _add_to_sample(self, line: str) -> None:
+        if self._capped:
+            return
+        if self._sampled >= LINE_SAMPLE_CHARS:
+            self._capped = True
+            return
+        self._sample.append(line)
+        self._sampled += len(line) + 1
+
+    def hexdigest(self) -> str:
+        if self.exhausted:
+            return self._digest.hexdigest()
+        return PARTIAL_HASH_PREFIX + self._digest.hexdigest()
+
+    def size_ratio(self, file_size: int) -> float:
+        """
+        How many times larger the whole file is than 'sample', for scaling
+        counts taken on the sample. 1.0 if the sample is the whole file.
+        """
+        if self.exhausted and not self._capped:
+            return 1.0
+        sample_size = len(self.sample.encode("utf-8"))
+        return max(file_size / sample_size, 1.0) if sample_size else 1.0
+
+
+class _HashingReader(io.RawIOBase):
+    """
+    Raw binary reader that feeds every byte it reads into a hash.
+    """
+
+    def __init__(self, f, digest):
+        self._f = f
+        self._digest = digest
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = self._f.readinto(b)
+        if n:
+            self._digest.update(memoryview(b)[:n])
+        return n
+
+    def close(self) -> None:
+        self._f.close()
+        super().close()
+
+
+def _decode(data: bytes) -> str:
+    # Content sniffing only checks a file's head, so undecodable bytes further
+    # in are replaced rather than failing the whole run.
+    text = data.decode("utf-8", errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
@@ -0,0 +1,207 @@
+# danai/summarymaker/resultcache.py
+"""
+Persistent, content-addressed cache of processed file results.
+
+Unlike the manifest (one per output folder, keyed by path), this cache is
+keyed by what a result actually depends on: the sha256 of the file's bytes
+and a key for the processor chain as applied to that file. One cache file can
+therefore be shared by every run, preset, branch and checkout on a machine.
+It is an SQLite database, trimmed back to config.result_cache_max_bytes
+(least recently used entries first) at the end of each run.
+
+The pipeline looks files up by the hash it reads them with, so a file is
+never read just to find out whether it is cached.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from .config import SummaryConfig
+from .dedupe import processing_key
+from .filtering.filters import FileInfo
+from .manifest import processor_fingerprint
+from .reading import is_partial_hash
+
+CACHE_SCHEMA_VERSION = 1
+
+# Queued writes go to the database once this many rows are waiting, or once
+# the queued content adds up to STORE_BATCH_BYTES, so a cold run over a large
+# tree never holds more than that in memory.
+STORE_BATCH_ROWS = 256
+STORE_BATCH_BYTES = 8 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    content_hash TEXT NOT NULL,
+    chain TEXT NOT NULL,
+    processed_content TEXT NOT NULL,
+    pre_tokens INTEGER NOT NULL,
+    post_tokens INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (content_hash, chain)
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+class ResultCache:
+    """
+    (content hash, chain key) -> processed content and token counts.
+
+    Usage Example:
+        cache = ResultCache.open(config)
+        try:
+            raw, content_hash = read_source(path)
+            content = cache.fetch(path, content_hash)
+            if content is None:
+                ...  # process raw into fileinfo
+            cache.store(fileinfo)
+        finally:
+            cache.close()
+    """
+
+    def __init__(self, path: str, config: SummaryConfig):
+        self.path = path
+        self.max_bytes = config.result_cache_max_bytes
+        self._config = config
+        self._fingerprint = processor_fingerprint(config)
+        self._chains = {}  # type: Dict[tuple, str]
+        # path -> (pre_tokens, post_tokens) of a hit not yet taken by take_tokens()
+        self._hits = {}  # type: Dict[str, Tuple[int, int]]
+        # (content hash, chain) of every result fetched or queued this run
+        self._seen = set()  # type: Set[Tuple[str, str]]
+        self._touched = []  # type: List[Tuple[float, str, str]]
+        self._pending = []  # type: List[tuple]
+        self._pending_bytes = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version != CACHE_SCHEMA_VERSION:
+            self._db.executescript("DROP TABLE IF EXISTS results;" + _SCHEMA)
+            self._db.execute(f"PRAGMA user_version={CACHE_SCHEMA_VERSION}")
+        self._db.commit()
+
+    @classmethod
+    def open(cls, config: SummaryConfig) -> Optional["ResultCache"]:
+        """
+        The cache at config.result_cache, or None if caching is off.
+        """
+        if not config.result_cache:
+            return None
+        return cls(os.path.expanduser(config.result_cache), config)
+
+    def fetch(self, path: str, content_hash: str) -> Optional[str]:
+        """
+        The processed content cached for 'path' as read with 'content_hash',
+        or None. The token counts of a hit are kept for take_tokens(). Hashes
+        of files that were only read in part never hit.
+        """
+        if not content_hash or is_partial_hash(content_hash):
+            return None
+        key = (content_hash, self._chain(path))
+        row = self._db.execute(
+            "SELECT processed_content, pre_tokens, post_tokens FROM results WHERE content_hash = ? AND chain = ?",
+            key
+        ).fetchone()
+        if row is None:
+            return None
+        self._seen.add(key)
+        self._touched.append((time.time(),) + key)
+        self._hits[path] = (row[1], row[2])
+        return row[0]
+
+    def take_tokens(self, path: str) -> Optional[Tuple[int, int]]:
+        """
+        (pre_tokens, post_tokens) of the hit fetch() just returned for 'path',
+        or None if it was a miss.
+        """
+        return self._hits.pop(path, None)
+
+    def take_touched(self) -> List[Tuple[float, str, str]]:
+        """
+        Hand over the hits recorded so far (in a worker process, for add_touched()
+        in the process that owns the cache).
+        """
+        touched, self._touched = self._touched, []
+        return touched
+
+    def add_touched(self, touched: List[Tuple[float, str, str]]) -> None:
+        """
+        Record hits fetched by another instance (see take_touched()).
+        """
+        for entry in touched:
+            self._seen.add(entry[1:])
+        self._touched.extend(touched)
+
+    def store(self, fileinfo: FileInfo) -> None:
+        """
+        Queue a processed file for writing. Results that came from the cache,
+        and files that were read only in part, are skipped. Queued writes are
+        flushed in batches (see STORE_BATCH_ROWS and STORE_BATCH_BYTES).
+        """
+        content_hash = fileinfo.content_hash
+        if content_hash and not is_partial_hash(content_hash):
+            key = (content_hash, self._chain(fileinfo.path))
+            if key not in self._seen:
+                self._seen.add(key)
+                content = fileinfo.processed_content
+                size = len(content.encode("utf-8"))
+                self._pending.append(key + (content, fileinfo.pre_tokens, fileinfo.post_tokens, size, time.time()))
+                self._pending_bytes += size
+        if (
+            len(self._pending) + len(self._touched) >= STORE_BATCH_ROWS
+            or self._pending_bytes >= STORE_BATCH_BYTES
+        ):
+            with self._db:
+                self._write()
+
+    def close(self) -> None:
+        """
+        Write what is still queued and evict down to max_bytes.
+        """
+        try:
+            with self._db:
+                self._write()
+                self._evict()
+        finally:
+            self._pending, self._touched = [], []
+            self._db.close()
+
+    def _write(self) -> None:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self._pending
+        )
+        self._db.executemany(
+            "UPDATE results SET last_used = ? WHERE content_hash = ? AND chain = ?",
+            self._touched
+        )
+        self._pending, self._touched, self._pending_bytes = [], [], 0
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        doomed = []  # type: List[Tuple[int]]
+        for rowid, size in self._db.execute("SELECT rowid, size FROM results ORDER BY last_used"):
+            doomed.append((rowid,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM results WHERE rowid = ?", doomed)
+
+    def _chain(self, path: str) -> str:
+        # Processors may treat files differently by path (see BaseProcessor.dedup_key)
+        per_path = processing_key(path, self._config)
+        chain = self._chains.get(per_path)
+        if chain is None:
+            text = self._fingerprint + "\n" + repr(per_path)
+            chain = self._chains[per_path] = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return chain
@@ -6,7 +6,7 @@ You can import these to quickly configure the summarymaker.
 
 import os
 from .config import SummaryConfig
-from .processing import RemoveHashCommentsProcessor, TruncateProcessor
+from .processing import RemoveCommentsProcessor, TruncateProcessor
 
 def get_dev_config() -> SummaryConfig:
     """
@@ -22,8 +22,8 @@ def get_dev_config() -> SummaryConfig:
         ignored_files=[".DS_Store"],
         only_include=[".py"],  # only .py
         processors=[
-            RemoveHashCommentsProcessor(),
-            TruncateProcessor(max_lines=300),
+            RemoveCommentsProcessor(extensions=["py"]),
+            TruncateProcessor(rules={}, default=300),
         ],
         generate_tree=True,
         generate_summarydoc=True,
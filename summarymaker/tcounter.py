@@ -2,13 +2,28 @@
 # ---------------------------------------------------------
 # For counting tokens, using tiktoken or any other method you wish.
 
-import tiktoken
+from functools import lru_cache
+from typing import List, Sequence
+
+@lru_cache(maxsize=None)
+def get_encoding(model="gpt-4o"):
+    """
+    Return the tiktoken encoding for the specified model.
+    Encodings are built once per model and reused for every later call.
+
+    tiktoken is imported here, on first use, so importing this module
+    (and everything built on it) stays cheap when no tokens are counted.
+    """
+    import tiktoken
+
+    return tiktoken.encoding_for_model(model)
+
 
 def tokencount_file(input_file, model="gpt-4o"):
     """
     Count the number of tokens in a text file using the specified model.
     """
-    encoding = tiktoken.encoding_for_model(model)
+    encoding = get_encoding(model)
 
     def read_file(file_path):
         with open(file_path, 'r', encoding='utf-8') as file:
@@ -23,7 +38,45 @@ def tokencount_text(text, model="gpt-4o"):
     """
     Count the number of tokens in a string using the specified model.
     """
-    encoding = tiktoken.encoding_for_model(model)
+    encoding = get_encoding(model)
     token_count = len(encoding.encode(text))
     return token_count
 
+
+def tokencount_batch(texts: Sequence[str], model="gpt-4o", num_threads=8) -> List[int]:
+    """
+    Count the tokens in many strings at once, using tiktoken's
+    multi-threaded batch encoder. Counts are returned in input order.
+    """
+    if not texts:
+        return []
+    encoding = get_encoding(model)
+    encoded = encoding.encode_batch(list(texts), num_threads=num_threads)
+    return [len(tokens) for tokens in encoded]
+
+
+def truncate_to_tokens(text, max_tokens, model="gpt-4o"):
+    """
+    Cut 'text' back to at most 'max_tokens' tokens, ending on a complete line
+    where possible. Returns (prefix, was_truncated).
+
+    The text is encoded once and the token prefix decoded once. The prefix is
+    only re-encoded to confirm its count, and trimmed line by line in the rare
+    case that re-encoding merges tokens differently.
+    """
+    encoding = get_encoding(model)
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text, False
+    if max_tokens <= 0:
+        return "", True
+
+    prefix = encoding.decode(tokens[:max_tokens]).rstrip("�")
+    cut = prefix.rfind("\n")
+    if cut > 0:
+        prefix = prefix[:cut]
+
+    while prefix and len(encoding.encode(prefix)) > max_tokens:
+        cut = prefix.rfind("\n")
+        prefix = prefix[:cut] if cut > 0 else prefix[:len(prefix) // 2]
+    return prefix, True
@@ -0,0 +1,191 @@
+# danai/summarymaker/watch.py
+"""
+Watch mode: keep summary.md and tree.md up to date while files change.
+
+After one full build, changes are picked up with inotify (or, where that is
+not available, by polling the directories and files of the index), bursts of
+events are debounced into a single update, and each update:
+  - re-lists only the directories whose entries changed,
+  - reprocesses only added and modified files,
+  - rewrites summary.md from the first changed section (SummaryDocument),
+  - re-renders only the tree branches above and below changed directories.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional
+
+from .config import SummaryConfig
+from .filtering.dirindex import DirectoryIndex
+from .filtering.filters import FileInfo, collect_included_files
+from .filtering.matcher import FileMatcher
+from .main import check_config
+from .manifest import SummaryManifest, stat_file
+from .output.summary_document import SummaryDocument
+from .output.tree_generator import TreeGenerator, invalidate_tree_cache
+from .pipeline import iter_processed_files
+from .watchers import Changes, make_watcher
+
+
+class WatchSession:
+    """
+    The state watch mode keeps between updates: the directory index, the
+    processed files, the rendered tree branches and the summary sections.
+    """
+
+    def __init__(self, config: SummaryConfig):
+        self.config = config
+        self.matcher = FileMatcher(config)
+        self.manifest = SummaryManifest.load(config) if config.incremental else None
+        self.index = None  # type: Optional[DirectoryIndex]
+        self.files = {}  # type: Dict[str, FileInfo]
+        self.tree_cache = {}  # type: Dict
+        self.document = SummaryDocument(config)
+
+    def build(self) -> None:
+        """
+        Full build, as generate_summary would do it.
+        """
+        config = self.config
+        self.index = DirectoryIndex.build(config)
+        included = collect_included_files(config, self.index)
+        for _ in iter_processed_files(included, config, self.manifest):
+            pass
+        if self.manifest is not None:
+            self.manifest.save()
+        self.files = {fi.path: fi for fi in included}
+
+        self.tree_cache.clear()
+        if config.generate_tree:
+            TreeGenerator.generate(config, included, self.index, self.tree_cache)
+        if config.generate_summarydoc:
+            self.document.write(included)
+
+    def watched_dirs(self) -> List[str]:
+        # The output folder is never watched, or every write would trigger an update
+        return [d for d in self.index.scanned_dirs() if not self.matcher.dir_excluded(d)]
+
+    def watched_files(self) -> List[str]:
+        return [os.path.abspath(p) for p in self.files]
+
+    def apply(self, changes: Changes) -> str:
+        """
+        Bring the outputs in line with 'changes'. Returns a one-line description.
+        """
+        config = self.config
+        if changes.overflow:
+            # Events were lost: re-scan and reprocess everything
+            self.build()
+            return f"rebuilt ({len(self.files)} files)"
+
+        touched = []  # type: List[str]
+        for path in sorted(changes.dirs):
+            if path in self.index.dirs:
+                touched += self.index.refresh(path)
+
+        included = collect_included_files(config, self.index)
+        old = self.files
+        modified_abs = changes.files
+        added = [fi for fi in included if fi.path not in old]
+        modified = [fi for fi in included if fi.path in old and os.path.abspath(fi.path) in modified_abs]
+        included_paths = {fi.path for fi in included}
+        removed = [path for path in old if path not in included_paths]
+
+        pending = added + modified
+        if self.manifest is not None:
+            for fileinfo in pending:
+                stat_file(fileinfo)
+        for fileinfo in iter_processed_files(pending, config):
+            if self.manifest is not None:
+                self.manifest.record(fileinfo)
+        pending_paths = {fi.path for fi in pending}
+        files = [fi if fi.path in pending_paths else old[fi.path] for fi in included]
+        self.files = {fi.path: fi for fi in files}
+
+        if self.manifest is not None:
+            self.manifest.prune(files)
+            self.manifest.save()
+
+        if config.generate_tree and touched:
+            invalidate_tree_cache(self.tree_cache, touched)
+            TreeGenerator.generate(config, files, self.index, self.tree_cache)
+
+        written = 0
+        if config.generate_summarydoc:
+            written = self.document.update(files, list(pending_paths) + removed)
+
+        return f"+{len(added)} ~{len(modified)} -{len(removed)} files, {written} bytes of summary.md rewritten"
+
+
+def check_watch_config(config: SummaryConfig) -> None:
+    """
+    Raise ValueError for options that cannot work in watch mode (see watch_summary).
+    """
+    check_config(config)
+    if config.max_total_tokens is not None:
+        raise ValueError("max_total_tokens cannot be combined with watch mode")
+    if config.shard_max_tokens is not None:
+        raise ValueError("shard_max_tokens cannot be combined with watch mode")
+    if config.dedupe:
+        raise ValueError("dedupe cannot be combined with watch mode")
+    if config.summary_format != "markdown":
+        raise ValueError("watch mode needs summary_format='markdown'")
+    if config.file_source != "walk" or config.changed_since is not None:
+        raise ValueError("watch mode needs file_source='walk'")
+
+
+def watch_summary(
+    config: SummaryConfig,
+    poll_interval: float = 0.5,
+    debounce: float = 0.2,
+    use_inotify: bool = True,
+    max_updates: Optional[int] = None
+) -> None:
+    """
+    Build tree.md and summary.md, then keep them up to date until interrupted
+    (Ctrl+C) or until 'max_updates' updates have been applied.
+
+    Events arriving within 'debounce' seconds of each other are handled as one
+    update. 'poll_interval' is how long each wait lasts (and, without inotify,
+    how often directories and files are checked).
+
+    Streaming does not apply here (summary.md is kept in memory, one section
+    per file). max_total_tokens, shard_max_tokens and dedupe are not
+    supported, since one changed file could change what every other file is
+    allotted, which shard it lands in or which copy it is shown as.
+
+    :param config: A SummaryConfig object with user-defined or default rules.
+    """
+    check_watch_config(config)
+
+    session = WatchSession(config)
+    start = time.perf_counter()
+    session.build()
+    print(f"Summarised {len(session.files)} files in {time.perf_counter() - start:.2f}s")
+
+    watcher = make_watcher(use_inotify)
+    watcher.watch(session.watched_dirs(), session.watched_files())
+    print(f"Watching {len(session.watched_dirs())} directories ({type(watcher).__name__}); Ctrl+C to stop")
+
+    updates = 0
+    try:
+        while max_updates is None or updates < max_updates:
+            changes = watcher.wait(poll_interval)
+            if changes is None:
+                continue
+            # Wait for the burst to settle
+            while True:
+                more = watcher.wait(debounce)
+                if more is None:
+                    break
+                changes.merge(more)
+
+            start = time.perf_counter()
+            summary = session.apply(changes)
+            watcher.watch(session.watched_dirs(), session.watched_files())
+            updates += 1
+            print(f"Updated in {time.perf_counter() - start:.3f}s: {summary}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
@@ -0,0 +1,235 @@
+# danai/summarymaker/watchers.py
+"""
+Change detection for watch mode.
+
+InotifyWatcher uses Linux inotify (through ctypes, so there is no extra
+dependency) and reports changes as soon as the kernel does. PollingWatcher is
+the portable fallback: it compares directory mtimes (which change when entries
+are added, removed or renamed) and the size/mtime of every watched file.
+Both report changes as a Changes object.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_ENTRY_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+_CONTENT_EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_ATTRIB
+_SELF_EVENTS = IN_DELETE_SELF | IN_MOVE_SELF
+_WATCH_MASK = _ENTRY_EVENTS | _CONTENT_EVENTS | _SELF_EVENTS | IN_DONT_FOLLOW
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Changes:
+    """
+    What changed since the last check.
+
+    dirs: directories whose entries changed (or whose .gitignore did).
+    files: files whose content may have changed.
+    overflow: events were lost; everything has to be re-scanned.
+    """
+
+    def __init__(self):
+        self.dirs = set()  # type: Set[str]
+        self.files = set()  # type: Set[str]
+        self.overflow = False
+
+    def __bool__(self) -> bool:
+        return bool(self.dirs or self.files or self.overflow)
+
+    def merge(self, other: "Changes") -> None:
+        self.dirs |= other.dirs
+        self.files |= other.files
+        self.overflow = self.overflow or other.overflow
+
+
+class InotifyWatcher:
+    """
+    One inotify instance with a watch per directory.
+    """
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._paths = {}  # type: Dict[int, str]
+        self._wds = {}  # type: Dict[str, int]
+
+    @staticmethod
+    def available() -> bool:
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        except OSError:
+            return False
+        return hasattr(libc, "inotify_init1")
+
+    def watch(self, dirs: Iterable[str], files: Iterable[str]) -> None:
+        """
+        Watch exactly 'dirs' from now on (file events come from their
+        directories, so 'files' is not needed here).
+        """
+        wanted = set(dirs)
+        for path in [p for p in self._wds if p not in wanted]:
+            self._libc.inotify_rm_watch(self._fd, self._wds.pop(path))
+        for path in wanted:
+            if path in self._wds:
+                continue
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+            if wd >= 0:
+                self._wds[path] = wd
+                self._paths[wd] = path
+
+    def wait(self, timeout: float) -> Optional[Changes]:
+        """
+        Wait up to 'timeout' seconds for events. Returns None if there were none.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return None
+
+        changes = Changes()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            except OSError as exc:
+                if exc.errno == errno.EINTR:
+                    continue
+                raise
+            if not data:
+                break
+            self._parse(data, changes)
+        return changes if changes else None
+
+    def _parse(self, data: bytes, changes: Changes) -> None:
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                changes.overflow = True
+                continue
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                # The watch is gone (its directory was removed)
+                self._paths.pop(wd, None)
+                if self._wds.get(directory) == wd:
+                    del self._wds[directory]
+                continue
+            if mask & _SELF_EVENTS:
+                changes.dirs.add(os.path.dirname(directory))
+                continue
+            if mask & _ENTRY_EVENTS or name == ".gitignore":
+                changes.dirs.add(directory)
+            if mask & _CONTENT_EVENTS and not mask & IN_ISDIR:
+                changes.files.add(os.path.join(directory, name))
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """
+    Stat-based fallback. Each check costs one stat per watched directory and
+    file, and no directory listings.
+    """
+
+    def __init__(self):
+        self._dirs = {}  # type: Dict[str, int]
+        self._files = {}  # type: Dict[str, Tuple[int, int]]
+        self._gitignores = {}  # type: Dict[str, Tuple[int, int]]
+
+    def watch(self, dirs: Iterable[str], files: Iterable[str]) -> None:
+        """
+        Watch exactly 'dirs' and 'files' from now on, taking their current
+        state as the baseline.
+        """
+        self._dirs = {d: _dir_stamp(d) for d in dirs}
+        self._files = {f: _file_stamp(f) for f in files}
+        self._gitignores = {d: _file_stamp(os.path.join(d, ".gitignore")) for d in self._dirs}
+
+    def wait(self, timeout: float) -> Optional[Changes]:
+        time.sleep(timeout)
+        changes = Changes()
+        for path, stamp in self._dirs.items():
+            now = _dir_stamp(path)
+            if now != stamp:
+                self._dirs[path] = now
+                changes.dirs.add(path if now is not None else os.path.dirname(path))
+            gitignore = _file_stamp(os.path.join(path, ".gitignore"))
+            if gitignore != self._gitignores[path]:
+                self._gitignores[path] = gitignore
+                changes.dirs.add(path)
+        for path, stamp in self._files.items():
+            now = _file_stamp(path)
+            if now != stamp:
+                self._files[path] = now
+                changes.files.add(path)
+        return changes if changes else None
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher(use_inotify: bool = True):
+    """
+    An InotifyWatcher where possible, else a PollingWatcher.
+    """
+    if use_inotify and InotifyWatcher.available():
+        try:
+            return InotifyWatcher()
+        except OSError:
+            pass
+    return PollingWatcher()
+
+
+def _dir_stamp(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
@@ -0,0 +1,47 @@
+# danai/tests/conftest.py
+"""
+Shared fixtures. The summarymaker package is imported directly from the
+repository root, so the tests run from a plain checkout.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from summarymaker.config import SummaryConfig  # noqa: E402
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    """
+    Build a SummaryConfig over tmp_path/src writing to tmp_path/out, with token
+    counting off (so tiktoken is never needed) and quiet output.
+    """
+    def make(**overrides) -> SummaryConfig:
+        fields = dict(
+            base_directories=[str(tmp_path / "src")],
+            output_path=str(tmp_path / "out"),
+            count_tokens=False,
+            quiet=True,
+        )
+        fields.update(overrides)
+        return SummaryConfig(**fields)
+    return make
+
+
+@pytest.fixture
+def write_files(tmp_path):
+    """
+    Write {relative path: text} under tmp_path/src and return that directory.
+    """
+    def write(files) -> str:
+        root = tmp_path / "src"
+        for rel, text in files.items():
+            path = root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+        return str(root)
+    return write
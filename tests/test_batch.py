@@ -0,0 +1,79 @@
+# danai/tests/test_batch.py
+"""
+generate_summaries: several configs over one scan and one read per file.
+"""
+
+import os
+
+from summarymaker.batch import generate_summaries
+from summarymaker.main import generate_summary
+from summarymaker.processing import RemoveCommentsProcessor, TruncateProcessor
+from summarymaker.processing.baseprocessor import BaseProcessor
+
+_FILES = {
+    "a.py": "# comment\nx = 1\n" * 10,
+    "pkg/b.py": "y = 2  # note\n",
+    "pkg/c.js": "// js comment\nlet z = 3;\n",
+    "notes.txt": "one\ntwo\nthree\nfour\n",
+}
+
+
+def _configs(make_config, tmp_path, prefix: str):
+    return [
+        make_config(
+            output_path=str(tmp_path / f"{prefix}-short"),
+            processors=[RemoveCommentsProcessor(["py", "js"]), TruncateProcessor({".py": 3}, default=2)],
+        ),
+        make_config(
+            output_path=str(tmp_path / f"{prefix}-full"),
+            processors=[RemoveCommentsProcessor(["py", "js"])],
+        ),
+        make_config(output_path=str(tmp_path / f"{prefix}-raw"), generate_tree=False),
+    ]
+
+
+def _outputs(config):
+    outputs = {}
+    for name in sorted(os.listdir(config.output_path)):
+        with open(os.path.join(config.output_path, name), "rb") as f:
+            outputs[name] = f.read()
+    return outputs
+
+
+def test_batch_output_matches_separate_runs(make_config, write_files, tmp_path):
+    write_files(_FILES)
+    separate = _configs(make_config, tmp_path, "separate")
+    for config in separate:
+        generate_summary(config)
+    batched = _configs(make_config, tmp_path, "batched")
+    generate_summaries(batched)
+
+    for alone, together in zip(separate, batched):
+        assert _outputs(together) == _outputs(alone)
+        assert "summary.md" in _outputs(together)
+
+
+def test_shared_prefix_runs_once_per_file(make_config, write_files, tmp_path, monkeypatch):
+    write_files(_FILES)
+    calls = []
+    process = RemoveCommentsProcessor.process
+
+    def counting(self, content, filepath):
+        calls.append(filepath)
+        return process(self, content, filepath)
+
+    fingerprints = []
+    fingerprint = BaseProcessor.fingerprint
+
+    def counting_fingerprint(self):
+        fingerprints.append(self)
+        return fingerprint(self)
+
+    monkeypatch.setattr(RemoveCommentsProcessor, "process", counting)
+    monkeypatch.setattr(BaseProcessor, "fingerprint", counting_fingerprint)
+    generate_summaries(_configs(make_config, tmp_path, "batched"))
+    # Both configs start with an identical comment remover, which runs once
+    # per .py/.js file and never on notes.txt
+    assert sorted(os.path.basename(path) for path in calls) == ["a.py", "b.py", "c.js"]
+    # Sharing keys are worked out once per processor, not once per file
+    assert len(fingerprints) == 3
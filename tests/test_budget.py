@@ -0,0 +1,70 @@
+# danai/tests/test_budget.py
+"""
+Token budget (max_total_tokens) and token-based truncation.
+"""
+
+import pytest
+
+from summarymaker import budget
+from summarymaker.filtering.filters import FileInfo
+from summarymaker.output.summary_generator import SummaryGenerator
+from summarymaker.processing import TokenTruncateProcessor
+
+
+@pytest.fixture
+def word_tokens(monkeypatch):
+    """
+    Count one token per whitespace-separated word, so no tokeniser is needed.
+    """
+    monkeypatch.setattr(budget, "tokencount_text", lambda text, model="gpt-4o": len(text.split()))
+    monkeypatch.setattr(budget, "tokencount_batch", lambda texts, model="gpt-4o": [len(t.split()) for t in texts])
+
+
+def _file(path: str, words: int, duplicate_of: str = "") -> FileInfo:
+    content = " ".join(["w"] * words)
+    return FileInfo(
+        path=path,
+        processed_content="" if duplicate_of else content,
+        post_tokens=0 if duplicate_of else words,
+        duplicate_of=duplicate_of,
+    )
+
+
+def test_duplicate_is_left_out_with_its_original(word_tokens, make_config, write_files):
+    root = write_files({})
+    big = _file(f"{root}/big.txt", 500)
+    copy = _file(f"{root}/copy.txt", 500, duplicate_of=big.path)
+    small = _file(f"{root}/small.txt", 10)
+    config = make_config(count_tokens=True, dedupe=True, max_total_tokens=40)
+
+    counts = budget.apply_token_budget([big, copy, small], config)
+
+    assert big.omitted and copy.omitted and not small.omitted
+    assert counts["kept"] == 1 and counts["omitted"] == 2
+    written = [fi for fi in (big, copy, small) if SummaryGenerator.has_entry(fi, config)]
+    assert written == [small]
+    # The reference's tokens are not counted as used
+    wrapper = SummaryGenerator.render_entry(small, config)
+    assert counts["used"] == len(wrapper.split()) + len(budget.SUMMARY_HEADER.split())
+
+
+def test_duplicate_is_kept_with_its_original(word_tokens, make_config, write_files):
+    root = write_files({})
+    original = _file(f"{root}/a.txt", 10)
+    copy = _file(f"{root}/b.txt", 10, duplicate_of=original.path)
+    config = make_config(count_tokens=True, dedupe=True, max_total_tokens=1000)
+
+    counts = budget.apply_token_budget([original, copy], config)
+
+    assert not original.omitted and not copy.omitted
+    assert counts["kept"] == 2
+
+
+def test_token_truncator_limits_are_token_limits():
+    processor = TokenTruncateProcessor(rules={".json": 500}, default=4000, exceptions=["keep.json"])
+    assert processor.token_limit("data.json") == 500
+    assert processor.token_limit("app.js") == 4000
+    assert processor.token_limit("keep.json") is None
+    # It never cuts at a line count
+    assert processor.line_limit("data.json") is None
+    assert processor.line_stage("data.json") is None
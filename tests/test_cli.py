@@ -0,0 +1,54 @@
+# danai/tests/test_cli.py
+"""
+'danai summarize' error handling.
+"""
+
+import importlib
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def danai():
+    """
+    The repository imported as the 'danai' package, as it is once installed.
+    """
+    if "danai" not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            "danai", os.path.join(_ROOT, "__init__.py"), submodule_search_locations=[_ROOT]
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["danai"] = module
+        spec.loader.exec_module(module)
+    return importlib.import_module("danai.cli")
+
+
+def _config_file(tmp_path, **fields) -> str:
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(fields), encoding="utf-8")
+    return str(path)
+
+
+def test_invalid_options_are_usage_errors(danai, tmp_path, capsys):
+    config = _config_file(tmp_path, budget_policy="largest_first")
+    with pytest.raises(SystemExit) as exited:
+        danai.main(["summarize", "--config", config, "--no-tokens", "-q", str(tmp_path)])
+    assert exited.value.code == 2
+    assert "budget_policy" in capsys.readouterr().err
+
+
+def test_errors_during_the_run_are_not_usage_errors(danai, tmp_path, monkeypatch):
+    main_module = importlib.import_module("danai.summarymaker.main")
+
+    def fail(config):
+        raise ValueError("broken processor")
+
+    monkeypatch.setattr(main_module, "generate_summary", fail)
+    with pytest.raises(ValueError, match="broken processor"):
+        danai.main(["summarize", "--no-tokens", "-q", str(tmp_path)])
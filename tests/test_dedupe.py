@@ -0,0 +1,70 @@
+# danai/tests/test_dedupe.py
+"""
+Deduplication of identical files (SummaryConfig.dedupe).
+"""
+
+import os
+
+from summarymaker.dedupe import find_duplicates
+from summarymaker.filtering.filters import FileInfo
+from summarymaker.main import generate_summary
+from summarymaker.processing import RemoveCommentsProcessor, TruncateProcessor
+
+_SOURCE = "# comment\nx = 1\ny = 2\n"
+
+_FILES = {
+    "a/mod.py": _SOURCE,
+    "b/mod.py": _SOURCE,
+    "c/copy.py": _SOURCE,
+    # Same bytes, but comments are only removed from .py files
+    "d/mod.js": _SOURCE,
+    # Same size, different content
+    "e/other.py": _SOURCE.replace("x", "z"),
+    "f/keep.py": _SOURCE,
+    "g/empty.py": "",
+    "h/empty.py": "",
+}
+
+
+class _PathSensitive:
+    """A processor without a dedup_key(), so it may depend on the whole path."""
+
+    def process(self, content, filepath):
+        return content
+
+
+def _duplicates(root, config):
+    files = [FileInfo(path=os.path.join(root, rel)) for rel in sorted(_FILES)]
+    found = find_duplicates(files, config)
+    return {os.path.relpath(dup, root): os.path.relpath(orig, root) for dup, orig in found.items()}
+
+
+def test_duplicates_need_the_same_content_and_processor_chain(make_config, write_files):
+    root = write_files(_FILES)
+    config = make_config(
+        processors=[
+            RemoveCommentsProcessor(["py"]),
+            TruncateProcessor(rules={".py": 10, ".js": 10}, exceptions=["keep.py"]),
+        ],
+    )
+    assert _duplicates(root, config) == {"b/mod.py": "a/mod.py", "c/copy.py": "a/mod.py"}
+
+    # Keyed on the full path, nothing can be merged
+    assert _duplicates(root, make_config(processors=[_PathSensitive()])) == {}
+
+
+def test_duplicates_are_reported_and_referenced(make_config, write_files):
+    write_files(_FILES)
+    config = make_config(dedupe=True, processors=[RemoveCommentsProcessor(["py"])])
+    report = generate_summary(config)
+
+    assert report.dedupe == {
+        "duplicates": 3,
+        "bytes_saved": 3 * len(_SOURCE),
+        "tokens_saved": 0,
+    }
+    with open(os.path.join(config.output_path, "summary.md"), encoding="utf-8") as f:
+        summary = f.read()
+    for duplicate in ("b/mod.py", "c/copy.py", "f/keep.py"):
+        assert f"## {duplicate}\n\nIdentical to `a/mod.py`." in summary
+    assert summary.count("x = 1") == 2
@@ -0,0 +1,65 @@
+# danai/tests/test_fused.py
+"""
+Fused line stages give exactly what the processors give one after another.
+"""
+
+import pytest
+
+from summarymaker.processing import RemoveCommentsProcessor, TruncateProcessor
+from summarymaker.processing.fused import LineFilter, LineLimit, PASSTHROUGH, run_processors
+
+_CONTENTS = [
+    "",
+    "\n",
+    "# only a comment",
+    "# a\n# b\n",
+    "x = 1\n",
+    "\n\n\n",
+    "".join(f"# comment {i}\nline {i}  // trailing\n" for i in range(10)),
+    "a\nb\nc\n# d\ne\n/* block\nstill */ f\n<!-- html -->\ng",
+]
+
+_CHAINS = {
+    "comments": [RemoveCommentsProcessor(["py", "rb", "txt"])],
+    "truncate": [TruncateProcessor({".py": 3, ".txt": 1})],
+    "truncate_then_comments": [TruncateProcessor({".py": 3}), RemoveCommentsProcessor(["py", "txt"])],
+    "comments_then_truncate": [RemoveCommentsProcessor(["py", "txt"]), TruncateProcessor({".py": 3}, default=2)],
+    "two_limits": [TruncateProcessor({".py": 5}), TruncateProcessor({".py": 2}, default=4)],
+    "zero_limit": [TruncateProcessor({".py": 0}), RemoveCommentsProcessor(["py"])],
+    "negative_limit": [TruncateProcessor({".py": -2}), TruncateProcessor({".py": 3})],
+    "exception": [TruncateProcessor({".py": 2}, exceptions=["keep.py"]), RemoveCommentsProcessor(["py"])],
+    # The JS remover has no line stage, so it splits the chain in two
+    "whole_string_between": [
+        TruncateProcessor({".js": 6, ".py": 6}),
+        RemoveCommentsProcessor(["js", "py"]),
+        TruncateProcessor({".js": 3, ".py": 3}),
+    ],
+}
+
+_PATHS = ["m.py", "keep.py", "m.js", "notes.txt", "m.rb", "README"]
+
+
+def _one_after_another(content, path, processors):
+    for processor in processors:
+        content = processor.process(content, path)
+    return content
+
+
+@pytest.mark.parametrize("path", _PATHS)
+@pytest.mark.parametrize("chain", sorted(_CHAINS))
+def test_fused_matches_sequential(chain, path):
+    processors = _CHAINS[chain]
+    for content in _CONTENTS:
+        expected = _one_after_another(content, path, processors)
+        assert run_processors(content, path, processors).encode("utf-8") == expected.encode("utf-8")
+
+
+def test_cases_cover_every_kind_of_stage():
+    # Guards the cases above: between them they exercise every stage type
+    kinds = set()
+    for processors in _CHAINS.values():
+        for processor in processors:
+            for path in _PATHS:
+                stage = processor.line_stage(path)
+                kinds.add(stage if stage is PASSTHROUGH or stage is None else stage.__class__)
+    assert kinds == {LineFilter, LineLimit, PASSTHROUGH, None}
@@ -0,0 +1,57 @@
+# danai/tests/test_gitsource.py
+"""
+File enumeration from git (file_source="git").
+"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from summarymaker.filtering.gitsource import git_files
+from summarymaker.main import generate_summary
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+
+def _git(root: str, *args: str) -> None:
+    subprocess.run(
+        ["git", "-C", root, "-c", "user.name=t", "-c", "user.email=t@t", "-c", "commit.gpgsign=false"] + list(args),
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+@pytest.fixture
+def repo(write_files):
+    root = write_files({"src/a.py": "a = 1\n", "src/b.py": "b = 1\n", "README.md": "hi\n"})
+    _git(root, "init", "-q")
+    _git(root, "add", "-A")
+    _git(root, "commit", "-q", "-m", "base")
+    _git(root, "branch", "base")
+    return root
+
+
+def test_lists_index(repo):
+    assert git_files(repo) == ["README.md", "src/a.py", "src/b.py"]
+    assert git_files(os.path.join(repo, "src")) == ["a.py", "b.py"]
+
+
+def test_skips_files_deleted_from_work_tree(repo, make_config):
+    os.remove(os.path.join(repo, "src", "b.py"))
+    assert git_files(repo) == ["README.md", "src/a.py"]
+    generate_summary(make_config(file_source="git"))
+
+
+def test_changed_since(repo):
+    with open(os.path.join(repo, "src", "a.py"), "a", encoding="utf-8") as f:
+        f.write("a = 2\n")
+    with open(os.path.join(repo, "new.py"), "w", encoding="utf-8") as f:
+        f.write("new = 1\n")
+    os.remove(os.path.join(repo, "README.md"))
+    assert git_files(repo, changed_since="base") == ["new.py", "src/a.py"]
+
+
+def test_outside_work_tree(tmp_path):
+    with pytest.raises(ValueError):
+        git_files(str(tmp_path))
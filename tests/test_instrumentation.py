@@ -0,0 +1,58 @@
+# danai/tests/test_instrumentation.py
+"""
+RunReport per-file entries and instrumented reads.
+"""
+
+import os
+
+from summarymaker.instrumentation import PipelineStats
+from summarymaker.main import generate_summary
+from summarymaker.pipeline import read_and_process
+from summarymaker.processing import RemoveCommentsProcessor, TruncateProcessor
+
+
+def _sources(report):
+    return {entry["path"].rsplit("/", 1)[-1]: entry["source"] for entry in report.files}
+
+
+def test_file_entries_record_where_each_file_came_from(make_config, write_files, tmp_path):
+    write_files({"a.py": "x = 1\n", "b.py": "x = 1\n", "c.py": "y = 2\n"})
+    cache = str(tmp_path / "results.sqlite")
+    options = dict(instrument=True, dedupe=True, result_cache=cache)
+
+    first = generate_summary(make_config(incremental=True, **options))
+    assert _sources(first) == {"a.py": "processed", "b.py": "duplicate", "c.py": "processed"}
+    assert "read_s" in first.files[0]
+
+    again = generate_summary(make_config(incremental=True, **options))
+    assert _sources(again) == {"a.py": "manifest", "b.py": "duplicate", "c.py": "manifest"}
+
+    cached = generate_summary(make_config(**options))
+    assert _sources(cached) == {"a.py": "result_cache", "b.py": "duplicate", "c.py": "result_cache"}
+    assert all("read_s" not in entry for entry in cached.files)
+
+
+def test_instrumented_runs_keep_bounded_reads(make_config, write_files, tmp_path):
+    write_files({"big.txt": "".join("line %d\n" % i for i in range(200)), "small.txt": "one\n"})
+    options = dict(
+        processors=[TruncateProcessor(rules={".txt": 5}), RemoveCommentsProcessor(["txt"])],
+        bounded_read_bytes=100,
+    )
+    plain = make_config(output_path=str(tmp_path / "plain"), **options)
+    instrumented = make_config(output_path=str(tmp_path / "instrumented"), instrument=True, **options)
+
+    path = os.path.join(plain.base_directories[0], "big.txt")
+    stats = PipelineStats()
+    raw, content, content_hash, raw_scale = read_and_process(path, instrumented, stats)
+    assert (raw, content, content_hash, raw_scale) == read_and_process(path, plain)
+    assert raw_scale > 1.0
+    # Only the processor after the truncation is timed on its own
+    assert sorted(stats.processors) == [1]
+    assert stats.files[path]["bytes_in"] == len(raw.encode("utf-8"))
+
+    generate_summary(plain)
+    report = generate_summary(instrumented)
+    with open(os.path.join(plain.output_path, "summary.md"), "rb") as a, \
+            open(os.path.join(instrumented.output_path, "summary.md"), "rb") as b:
+        assert a.read() == b.read()
+    assert {entry["path"].rsplit("/", 1)[-1] for entry in report.files} == {"big.txt", "small.txt"}
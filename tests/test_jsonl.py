@@ -0,0 +1,56 @@
+# danai/tests/test_jsonl.py
+"""
+summary.jsonl records, its index and compressed blocks.
+"""
+
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+from summarymaker.main import generate_summary
+from summarymaker.output import jsonl_generator
+from summarymaker.output.jsonl_generator import (
+    JSONL_INDEX_FILENAME,
+    jsonl_filename,
+    load_jsonl_index,
+    read_jsonl_record,
+)
+
+_FILES = {f"pkg/m{i:02}.py": f"value_{i} = {i}\n" * (i + 1) for i in range(12)}
+
+
+def _all_records(path: str, compression):
+    with open(path, "rb") as f:
+        data = f.read()
+    if compression == "gzip":
+        data = gzip.decompress(data)
+    elif compression == "zstd":
+        import zstandard
+        # One frame per block
+        data = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True).read()
+    return [json.loads(line) for line in data.decode("utf-8").splitlines()]
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_index_round_trip(compression, make_config, write_files, monkeypatch):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    root = write_files(_FILES)
+    # Small blocks, so the records span several of them
+    monkeypatch.setattr(jsonl_generator, "JSONL_BLOCK_BYTES", 300)
+    config = make_config(summary_format="jsonl", summary_compression=compression)
+    generate_summary(config)
+
+    summary_path = os.path.join(config.output_path, jsonl_filename(config))
+    index = load_jsonl_index(os.path.join(config.output_path, JSONL_INDEX_FILENAME))
+    records = _all_records(summary_path, compression)
+
+    assert [r["path"] for r in records] == sorted(index)
+    for record in records:
+        assert read_jsonl_record(summary_path, index[record["path"]]) == record
+        assert record["size"] == os.path.getsize(os.path.join(root, record["path"]))
+    if compression is not None:
+        assert len({entry["block"] for entry in index.values()}) > 1
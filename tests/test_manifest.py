@@ -0,0 +1,119 @@
+# danai/tests/test_manifest.py
+"""
+Reuse keys of the incremental manifest and the persistent result cache.
+"""
+
+import os
+import sqlite3
+
+from summarymaker import pipeline, resultcache
+from summarymaker.filtering.dirindex import DirectoryIndex
+from summarymaker.filtering.filters import collect_included_files
+from summarymaker.main import generate_summary
+from summarymaker.manifest import processor_fingerprint
+from summarymaker.processing import TruncateProcessor
+
+
+def _summary(config) -> str:
+    with open(os.path.join(config.output_path, "summary.md"), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_fingerprint_covers_read_limits(make_config):
+    base = processor_fingerprint(make_config())
+    assert processor_fingerprint(make_config(max_file_bytes=200)) == base  # skipped, not read in part
+    assert processor_fingerprint(make_config(max_file_bytes=200, oversize_files="head")) != base
+    assert processor_fingerprint(make_config(bounded_read_bytes=1000)) != base
+
+
+def test_incremental_rerun_applies_new_read_limit(make_config, write_files):
+    write_files({"big.txt": "".join(f"line {i}\n" for i in range(1000))})
+    generate_summary(make_config(incremental=True))
+    full = _summary(make_config())
+
+    limited = make_config(incremental=True, max_file_bytes=200, oversize_files="head")
+    generate_summary(limited)
+    assert len(_summary(limited)) < len(full) // 10
+    assert "[CONTENT TRUNCATED]" in _summary(limited)
+
+
+def test_result_cache_keyed_by_read_limit(make_config, write_files, tmp_path):
+    write_files({"big.txt": "".join(f"line {i}\n" for i in range(1000))})
+    cache = str(tmp_path / "cache.sqlite")
+    generate_summary(make_config(result_cache=cache))
+    full = _summary(make_config())
+
+    limited = make_config(result_cache=cache, max_file_bytes=200, oversize_files="head")
+    generate_summary(limited)
+    assert len(_summary(limited)) < len(full) // 10
+
+    # And the cached untruncated result is still found by an unlimited run
+    generate_summary(make_config(result_cache=cache))
+    assert _summary(make_config()) == full
+
+
+def test_result_cache_hit_matches_fresh_run(make_config, write_files, tmp_path):
+    write_files({"a.py": "# c\nx = 1\n" * 50, "b.py": "y = 2\n"})
+    processors = [TruncateProcessor({".py": 10})]
+    cache = str(tmp_path / "cache.sqlite")
+    generate_summary(make_config(processors=processors))
+    fresh = _summary(make_config())
+    for _ in range(2):
+        generate_summary(make_config(processors=processors, result_cache=cache))
+        assert _summary(make_config()) == fresh
+
+
+def _cached_rows(cache: str) -> int:
+    db = sqlite3.connect(cache)
+    try:
+        return db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    finally:
+        db.close()
+
+
+def test_result_cache_reads_each_file_once(make_config, write_files, tmp_path, monkeypatch):
+    write_files({f"f{i}.py": f"x = {i}\n" for i in range(4)})
+    cache = str(tmp_path / "cache.sqlite")
+    reads = []
+    read_source = pipeline.read_source
+
+    def counting(path, max_bytes=None):
+        reads.append(path)
+        return read_source(path, max_bytes)
+
+    monkeypatch.setattr(pipeline, "read_source", counting)
+    for _ in range(2):
+        reads.clear()
+        report = generate_summary(make_config(result_cache=cache, instrument=True))
+        assert len(reads) == 4
+    assert {entry["source"] for entry in report.files} == {"result_cache"}
+
+
+def test_result_cache_writes_in_batches(make_config, write_files, tmp_path, monkeypatch):
+    write_files({f"f{i}.py": f"x = {i}\n" for i in range(5)})
+    cache = str(tmp_path / "cache.sqlite")
+    config = make_config(result_cache=cache)
+    monkeypatch.setattr(resultcache, "STORE_BATCH_ROWS", 2)
+    files = collect_included_files(config, DirectoryIndex.build(config))
+
+    processed = pipeline.iter_processed_files(files, config)
+    for _ in range(3):
+        next(processed)
+    # Written while the run is still going, not held until the end
+    assert _cached_rows(cache) == 2
+    for _ in processed:
+        pass
+    assert _cached_rows(cache) == 5
+
+
+def test_result_cache_hits_in_worker_processes(make_config, write_files, tmp_path):
+    write_files({f"f{i}.py": f"# note\nx = {i}\n" for i in range(6)})
+    processors = [TruncateProcessor({".py": 1})]
+    cache = str(tmp_path / "cache.sqlite")
+    generate_summary(make_config(processors=processors))
+    fresh = _summary(make_config())
+
+    for expected in ("processed", "result_cache"):
+        report = generate_summary(make_config(processors=processors, result_cache=cache, workers=2, instrument=True))
+        assert {entry["source"] for entry in report.files} == {expected}
+        assert _summary(make_config()) == fresh
@@ -0,0 +1,61 @@
+# danai/tests/test_matcher.py
+"""
+IgnoreRules: .gitignore patterns compiled into one regex.
+"""
+
+import os
+
+from summarymaker.filtering.matcher import IgnoreRules, is_ignored
+
+_BASE = os.path.join(os.sep, "repo")
+
+
+def _match(patterns, rel, is_dir=False):
+    return IgnoreRules(_BASE, patterns).match(os.path.join(_BASE, *rel.split("/")), is_dir)
+
+
+def test_negation_after_a_wider_pattern():
+    patterns = ["*.log", "!keep.log"]
+    assert _match(patterns, "debug.log") is True
+    assert _match(patterns, "keep.log") is False
+    assert _match(patterns, "sub/keep.log") is False
+    assert _match(patterns, "notes.txt") is None
+    # The last matching rule wins, so a later pattern can ignore it again
+    assert _match(patterns + ["sub/*.log"], "sub/keep.log") is True
+    assert _match(patterns + ["sub/*.log"], "keep.log") is False
+
+
+def test_anchored_and_unanchored_patterns():
+    assert _match(["tmp"], "tmp") is True
+    assert _match(["tmp"], "a/b/tmp") is True
+    assert _match(["/tmp"], "tmp") is True
+    assert _match(["/tmp"], "a/tmp") is None
+    # A slash in the middle anchors the pattern too
+    assert _match(["src/gen"], "src/gen") is True
+    assert _match(["src/gen"], "lib/src/gen") is None
+    assert _match(["*.py[co]"], "pkg/m.pyc") is True
+
+
+def test_trailing_slash_matches_directories_only():
+    assert _match(["build/"], "build", is_dir=True) is True
+    assert _match(["build/"], "build") is None
+    assert _match(["build/"], "out/build", is_dir=True) is True
+    assert _match(["build"], "build") is True
+
+
+def test_double_star_in_the_middle():
+    patterns = ["a/**/b"]
+    assert _match(patterns, "a/b") is True
+    assert _match(patterns, "a/x/b") is True
+    assert _match(patterns, "a/x/y/b") is True
+    assert _match(patterns, "a/x/bb") is None
+    assert _match(patterns, "z/a/x/b") is None
+    assert _match(["**/cache"], "deep/down/cache", is_dir=True) is True
+
+
+def test_later_rule_sets_take_precedence():
+    root = IgnoreRules(_BASE, ["*.log"])
+    sub = IgnoreRules(os.path.join(_BASE, "sub"), ["!keep.log"])
+    assert is_ignored((root, sub), os.path.join(_BASE, "sub", "keep.log"), False) is False
+    assert is_ignored((root, sub), os.path.join(_BASE, "sub", "other.log"), False) is True
+    assert is_ignored((root, sub), os.path.join(_BASE, "readme.md"), False) is False
@@ -0,0 +1,123 @@
+# danai/tests/test_outliner.py
+"""
+OutlineProcessor: Python and JS/TS outlines.
+"""
+
+import ast
+
+from summarymaker.processing import OutlineProcessor
+from summarymaker.processing.outliner import OUTLINE_MARKER, outline_js
+
+_PYTHON = '''"""Module doc.
+
+More detail.
+"""
+import os
+from typing import List
+
+
+@decorator(arg=1)
+class Foo(Base):
+    """Foo does things.
+
+    Details.
+    """
+
+    def method(self, a: int,
+               b: str = "x") -> List[int]:
+        """Method doc."""
+        total = a * 2
+        return [total]
+
+    @property
+    async def prop(self):
+        await thing()
+
+
+async def top(*args, **kwargs):
+    for i in args:
+        print(i)
+    return 1
+'''
+
+
+def _outline(source: str, path: str) -> str:
+    return OutlineProcessor(min_bytes=None).process(source, path)
+
+
+def test_python_keeps_signatures_and_docstrings():
+    outline = _outline(_PYTHON, "m.py")
+    lines = outline.splitlines()
+
+    assert lines[0] == OUTLINE_MARKER
+    assert '"""Module doc."""' in lines
+    assert "import os" in lines and "from typing import List" in lines
+    assert "@decorator(arg=1)" in lines
+    assert "class Foo(Base):" in lines
+    assert '    """Foo does things."""' in lines
+    # Multi-line signatures are joined, annotations and defaults kept
+    assert '    def method(self, a: int, b: str = "x") -> List[int]:' in lines
+    assert '        """Method doc."""' in lines
+    assert "    @property" in lines
+    assert "    async def prop(self): ..." in lines
+    assert "async def top(*args, **kwargs): ..." in lines
+
+
+def test_python_drops_bodies():
+    outline = _outline(_PYTHON, "m.py")
+    for body in ("total = a * 2", "return [total]", "await thing()", "print(i)", "return 1", "More detail."):
+        assert body not in outline
+    # Apart from the marker line, the outline is still Python
+    ast.parse(outline.split("\n", 1)[1])
+
+
+def test_python_syntax_error_passes_through():
+    broken = "def f(:\n    return 1\n" * 20
+    assert _outline(broken, "broken.py") == broken
+
+
+def test_small_files_and_other_extensions_pass_through():
+    assert OutlineProcessor(min_bytes=10 ** 6).process(_PYTHON, "m.py") == _PYTHON
+    assert _outline(_PYTHON, "notes.txt") == _PYTHON
+
+
+def test_js_braces_in_strings_templates_and_comments():
+    source = '''import x from "y";
+// a comment with { an opening brace
+/** Adds things. */
+export function add(a, b) {
+  const s = "}{";
+  const t = `tmpl ${a + "}"} {`;
+  /* block { */
+  return a + b;
+}
+class Widget extends Base {
+  constructor(el) {
+    this.label = '}';
+  }
+  render() { return "{"; }
+}
+export const after = (x) => {
+  return x;
+};
+'''
+    outline = outline_js(source)
+    assert outline.splitlines() == [
+        OUTLINE_MARKER,
+        'import x from "y";',
+        "/** Adds things. */",
+        "export function add(a, b) { ... }",
+        "class Widget extends Base {",
+        "  constructor(el) { ... }",
+        "  render() { ... }",
+        "}",
+        # Back at the top level after all those braces
+        "export const after = (x) => ...",
+    ]
+
+
+def test_js_processor_outlines_ts_files():
+    source = "export function f(a: number): number {\n  return a + 1;\n}\n" * 5
+    outline = _outline(source, "mod.ts")
+    assert outline.startswith(OUTLINE_MARKER)
+    assert "return a + 1;" not in outline
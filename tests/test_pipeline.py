@@ -0,0 +1,112 @@
+# danai/tests/test_pipeline.py
+"""
+Per-file pipeline: batching, async reads and the streaming summary.
+"""
+
+import os
+import threading
+import time
+
+from summarymaker import pipeline
+from summarymaker.filtering.dirindex import DirectoryIndex
+from summarymaker.filtering.filters import collect_included_files
+from summarymaker.main import generate_summary
+from summarymaker.processing import RemoveCommentsProcessor
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_batches_bounded_by_size(make_config, write_files, monkeypatch):
+    write_files({f"f{i}.txt": "x" * 1000 for i in range(6)})
+    config = make_config()
+    files = collect_included_files(config, DirectoryIndex.build(config))
+
+    reads = []
+    read_and_process = pipeline.read_and_process
+
+    def counting(path, config, stats=None, cache=None):
+        reads.append(path)
+        return read_and_process(path, config, stats, cache)
+
+    monkeypatch.setattr(pipeline, "read_and_process", counting)
+    monkeypatch.setattr(pipeline, "TOKEN_BATCH_CHARS", 4000)
+    seen = []
+    for fileinfo in pipeline.iter_processed_files(files, config):
+        seen.append((fileinfo.path, len(reads)))
+    # Two files (raw + processed = 2000 characters each) fill a batch
+    assert [count for _, count in seen] == [2, 2, 4, 4, 6, 6]
+    assert [path for path, _ in seen] == [fi.path for fi in files]
+
+
+def test_streaming_matches_batch_output(make_config, write_files, tmp_path):
+    write_files({"b.py": "b = 1\n", "a/c.py": "c = 1\n", "a.txt": "a\n", "empty.txt": ""})
+    generate_summary(make_config())
+    streamed = make_config(output_path=str(tmp_path / "streamed"), streaming=True)
+    generate_summary(streamed)
+    assert _read(os.path.join(streamed.output_path, "summary.md")) == _read(str(tmp_path / "out" / "summary.md"))
+
+
+def _logged_reads(monkeypatch, delay):
+    """
+    Make every read sleep for delay(path) seconds, logging ("start", path)
+    and ("end", path) around it.
+    """
+    read_source = pipeline.read_source
+    log = []
+    lock = threading.Lock()
+
+    def slow_read(path, max_bytes=None):
+        with lock:
+            log.append(("start", path))
+        time.sleep(delay(path))
+        with lock:
+            log.append(("end", path))
+        return read_source(path, max_bytes)
+
+    monkeypatch.setattr(pipeline, "read_source", slow_read)
+    return log
+
+
+def _number(path: str) -> int:
+    return int(os.path.basename(path)[1:3])
+
+
+def test_async_reads_overlap_slow_reads(make_config, write_files, monkeypatch):
+    # Artificial latency, longest for the first files, so reads also complete
+    # out of order
+    write_files({f"f{i:02}.py": f"x = {i}  # comment\n" for i in range(16)})
+    processors = [RemoveCommentsProcessor(["py"])]
+    config = make_config(processors=processors, async_reads=8)
+    expected = [(fi.path, fi.processed_content) for fi in _processed(make_config(processors=processors))]
+
+    log = _logged_reads(monkeypatch, lambda path: 0.05 - _number(path) * 0.002)
+    processed = _processed(config)
+
+    assert [(fi.path, fi.processed_content) for fi in processed] == expected
+    # The second read starts before the first one has finished
+    assert log.index(("start", processed[1].path)) < log.index(("end", processed[0].path))
+
+
+def test_async_reads_stay_near_the_next_file(make_config, write_files, monkeypatch):
+    write_files({f"f{i:02}.py": f"x = {i}\n" for i in range(40)})
+    monkeypatch.setattr(pipeline, "TOKEN_BATCH_SIZE", 4)
+    config = make_config(async_reads=2)
+    expected = [fi.path for fi in _processed(config)]
+
+    # The first file is slow, the rest are quick
+    log = _logged_reads(monkeypatch, lambda path: 0.3 if path == expected[0] else 0.001)
+    processed = _processed(config)
+
+    assert [fi.path for fi in processed] == expected
+    # While the first read is outstanding, reads only run a window ahead of
+    # it (here async_reads * 4 files), not through the rest of the tree
+    first_done = log.index(("end", processed[0].path))
+    assert len([event for event in log[:first_done] if event[0] == "start"]) == 8
+
+
+def _processed(config):
+    files = collect_included_files(config, DirectoryIndex.build(config))
+    return list(pipeline.iter_processed_files(files, config))
@@ -0,0 +1,121 @@
+# danai/tests/test_plan.py
+"""
+Extension dispatch: file_extension, applies_to and processor plans.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from summarymaker.processing import (
+    CondenseImportsProcessor,
+    OutlineProcessor,
+    PythonStripProcessor,
+    RemoveCommentsProcessor,
+    RemovePrintStatementsProcessor,
+    RemoveTypingHintsProcessor,
+    TruncateProcessor,
+)
+from summarymaker.processing import plan as plan_module
+from summarymaker.processing.baseprocessor import file_extension
+from summarymaker.processing.plan import ProcessorPlan, processor_plan
+
+_PYTHON = 'import os\nimport sys\n"""doc"""\nprint("x")  # note\ndef f(x: int) -> int:\n    return x\n'
+_PATHS = [
+    "pkg/m.py",
+    "pkg.v1/Makefile",
+    "pkg.v1/.env",
+    "a.b/c.js",
+    "site/page.html",
+    "notes.TXT",
+    "data.json",
+]
+
+
+def _chain():
+    return [
+        RemoveCommentsProcessor(["py", "js", "html"]),
+        RemovePrintStatementsProcessor(),
+        RemoveTypingHintsProcessor(),
+        CondenseImportsProcessor(),
+        PythonStripProcessor(),
+        OutlineProcessor(),
+        TruncateProcessor(rules={".txt": 2}),
+    ]
+
+
+@pytest.mark.parametrize("path, ext", [
+    ("pkg/m.py", ".py"),
+    ("pkg.v1/Makefile", ""),
+    ("pkg.v1/.gitignore", ".gitignore"),
+    ("archive.tar.gz", ".gz"),
+])
+def test_file_extension_looks_at_the_file_name_only(path, ext):
+    assert file_extension(path) == ext
+
+
+def test_dotted_directory_does_not_leak_into_the_extension():
+    remover = RemoveCommentsProcessor(["v1/Makefile", "py"])
+    content = "# kept\n"
+    assert remover.process(content, "pkg.v1/Makefile") == content
+    assert not remover.applies_to(file_extension("pkg.v1/Makefile"))
+
+
+@pytest.mark.parametrize("path", _PATHS)
+def test_plan_chain_matches_the_full_chain(path):
+    processors = _chain()
+    content = _PYTHON + "\n".join("line %d" % i for i in range(5))
+
+    full = content
+    for processor in processors:
+        full = processor.process(full, path)
+    planned = content
+    for processor in ProcessorPlan(processors).chain(path):
+        planned = processor.process(planned, path)
+
+    assert planned == full
+
+
+def test_python_only_processors_are_skipped_for_other_files():
+    plan = ProcessorPlan(_chain())
+    assert [type(p).__name__ for p in plan.chain("data.json")] == []
+    assert [type(p).__name__ for p in plan.chain("notes.txt")] == ["TruncateProcessor"]
+    assert len(plan.chain("m.py")) == 6
+
+
+def test_plan_cache_checks_processor_identity(monkeypatch):
+    monkeypatch.setattr(plan_module, "_plans", {})
+    processors = _chain()
+    plan = processor_plan(processors)
+    assert processor_plan(list(processors)) is plan
+
+    # A stale entry under the same ids (as after the originals were collected
+    # and their ids reused) must not be handed out
+    stale = ProcessorPlan(_chain())
+    key = tuple(id(p) for p in processors)
+    plan_module._plans[key] = stale
+    rebuilt = processor_plan(processors)
+    assert rebuilt is not stale
+    assert all(a is b for a, b in zip(rebuilt.processors, processors))
+
+
+def test_fingerprint_does_not_depend_on_set_order():
+    # Each run gets its own hash seed, and so its own set iteration order
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "from summarymaker.processing import RemoveCommentsProcessor\n"
+        "print(RemoveCommentsProcessor({'py', 'js', 'css', 'html', 'rb', 'erb'}).fingerprint())\n"
+    ) % root
+    prints = {
+        subprocess.run(
+            [sys.executable, "-c", script],
+            env={"PYTHONHASHSEED": str(seed)},
+            stdout=subprocess.PIPE,
+            check=True,
+        ).stdout
+        for seed in range(1, 5)
+    }
+    assert len(prints) == 1
@@ -0,0 +1,90 @@
+# danai/tests/test_pythonstripper.py
+"""
+PythonStripProcessor edge cases.
+"""
+
+import ast
+import sys
+
+import pytest
+
+from summarymaker.processing import PythonStripProcessor
+
+_ANNOTATIONS_ONLY = dict(comments=False, docstrings=False, prints=False, condense_imports=False)
+
+
+def _strip(source: str, **options) -> str:
+    return PythonStripProcessor(**options).process(source, "m.py")
+
+
+def test_signature_and_assignment_annotations():
+    source = (
+        "def f(a: int, b: Dict[str, int] = {}, *args: str, c=lambda x: x) -> Optional[int]:\n"
+        "    total: int = a\n"
+        "    return total\n"
+    )
+    assert _strip(source, **_ANNOTATIONS_ONLY) == (
+        "def f(a, b = {}, *args, c=lambda x: x):\n"
+        "    total = a\n"
+        "    return total\n"
+    )
+
+
+def test_one_line_def_annotations():
+    source = "def f(x: int) -> int: return x\nasync def g(y: str): return y\n"
+    assert _strip(source, **_ANNOTATIONS_ONLY) == "def f(x): return x\nasync def g(y): return y\n"
+
+
+def test_bare_declarations_kept():
+    source = "@dataclass\nclass A:\n    x: int\n    y: List[int] = field(default_factory=list)\n"
+    assert _strip(source, **_ANNOTATIONS_ONLY) == (
+        "@dataclass\nclass A:\n    x: int\n    y = field(default_factory=list)\n"
+    )
+
+
+@pytest.mark.parametrize("source", [
+    "if ready: y = 1\n",
+    "while ready: y = 1\n",
+    "for a in b: y = 1\n",
+    "with ctx: y = 1\n",
+    "class A: y = 1\n",
+    "try: y = 1\nexcept E: y = 2\n",
+    "f = lambda x: x\n",
+])
+def test_one_line_compound_statements_unchanged(source):
+    assert _strip(source, **_ANNOTATIONS_ONLY) == source
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="match statements need Python 3.10")
+def test_one_line_case_clauses():
+    source = (
+        "match value:\n"
+        "    case [a]: y = 1\n"
+        "    case {'k': v}: y = 2\n"
+        "    case Point(x=0): y = 3\n"
+    )
+    result = _strip(source)
+    assert result == source
+    ast.parse(result)
+
+
+def test_output_stays_valid():
+    source = (
+        '"""Module doc."""\n'
+        "import os\n"
+        "from typing import List\n"
+        "\n"
+        "class A:\n"
+        '    """Doc."""\n'
+        "\n"
+        "def f(x: int) -> None:\n"
+        "    print(x)  # say it\n"
+    )
+    result = _strip(source)
+    ast.parse(result.split("\n", 1)[1])
+    assert result == "truncated_imports:[os, typing[List]]\nclass A:\n    pass\n\ndef f(x):\n    pass"
+
+
+def test_untokenizable_input_unchanged():
+    source = "def f(:\n    '''unterminated\n"
+    assert _strip(source) == source
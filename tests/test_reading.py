@@ -0,0 +1,94 @@
+# danai/tests/test_reading.py
+"""
+Oversized files and hashes of files that are only read in part.
+"""
+
+import json
+import os
+
+import pytest
+
+from summarymaker.filtering.filters import FileInfo
+from summarymaker.main import check_config, generate_summary
+from summarymaker.manifest import SummaryManifest, hash_file
+from summarymaker.processing import TruncateProcessor
+from summarymaker.reading import LineSource, is_partial_hash, read_source
+
+_HEAD = "".join("shared line %d\n" % i for i in range(100))
+
+
+def _records(config):
+    with open(os.path.join(config.output_path, "summary.jsonl"), encoding="utf-8") as f:
+        return {os.path.basename(r["path"]): r for r in map(json.loads, f)}
+
+
+def test_head_read_hash_is_partial(write_files):
+    root = write_files({"a.txt": _HEAD + "tail a\n", "small.txt": "x\n"})
+    path = os.path.join(root, "a.txt")
+
+    _, head_hash = read_source(path, max_bytes=200)
+    assert is_partial_hash(head_hash)
+    assert head_hash != hash_file(path)
+
+    _, whole_hash = read_source(os.path.join(root, "small.txt"), max_bytes=200)
+    assert whole_hash == hash_file(os.path.join(root, "small.txt"))
+
+
+def test_bounded_read_hash_is_partial_unless_read_to_the_end(write_files):
+    root = write_files({"a.txt": _HEAD})
+    path = os.path.join(root, "a.txt")
+
+    with LineSource(path) as source:
+        for _, _line in zip(range(3), source):
+            pass
+    assert is_partial_hash(source.hexdigest())
+
+    with LineSource(path) as source:
+        for _line in source:
+            pass
+    assert source.hexdigest() == hash_file(path)
+
+
+def test_shared_head_does_not_make_files_identical(make_config, write_files):
+    write_files({"a.txt": _HEAD + "tail a\n", "b.txt": _HEAD + "tail b\n"})
+    config = make_config(
+        summary_format="jsonl",
+        max_file_bytes=200,
+        oversize_files="head",
+        dedupe=True,
+        incremental=True,
+    )
+    generate_summary(config)
+
+    records = _records(config)
+    assert "duplicate_of" not in records["a.txt"] and "duplicate_of" not in records["b.txt"]
+    assert is_partial_hash(records["a.txt"]["hash"]) and is_partial_hash(records["b.txt"]["hash"])
+
+    # With a partial hash on record, a touched file is read again rather than
+    # trusted on a hash comparison
+    path = os.path.join(config.base_directories[0], "a.txt")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    manifest = SummaryManifest.load(config)
+    assert path in manifest.entries
+    assert not manifest.restore(FileInfo(path=path))
+
+
+def test_bounded_reads_are_marked_partial(make_config, write_files):
+    write_files({"big.txt": _HEAD, "small.txt": "one\ntwo\n"})
+    config = make_config(
+        summary_format="jsonl",
+        processors=[TruncateProcessor(rules={".txt": 5})],
+        bounded_read_bytes=100,
+    )
+    generate_summary(config)
+
+    records = _records(config)
+    assert is_partial_hash(records["big.txt"]["hash"])
+    assert records["small.txt"]["hash"] == hash_file(os.path.join(config.base_directories[0], "small.txt"))
+
+
+def test_unknown_oversize_mode_is_rejected(make_config):
+    check_config(make_config(max_file_bytes=100, oversize_files="head"))
+    with pytest.raises(ValueError, match="oversize_files 'truncate'"):
+        check_config(make_config(max_file_bytes=100, oversize_files="truncate"))
@@ -0,0 +1,108 @@
+# danai/tests/test_shards.py
+"""
+Sharded summaries (shard_max_tokens) and their index.
+"""
+
+import json
+import os
+
+import pytest
+
+from summarymaker.filtering.filters import FileInfo
+from summarymaker.output import shards
+from summarymaker.output.shards import SHARD_INDEX_FILENAME, ShardedSummaryGenerator
+from summarymaker.output.summary_generator import SummaryGenerator
+
+# rel path -> words of processed content
+_SIZES = {
+    "a/one.py": 30,
+    "a/two.py": 30,
+    "a/three.py": 30,
+    "b/four.py": 50,
+    "b/five.py": 50,
+    "c/big.txt": 300,
+    "d/six.py": 10,
+    "top.md": 20,
+}
+
+
+@pytest.fixture
+def word_tokens(monkeypatch):
+    """
+    Count one token per whitespace-separated word, so no tokeniser is needed.
+    """
+    monkeypatch.setattr(shards, "tokencount_text", lambda text, model="gpt-4o": len(text.split()))
+    monkeypatch.setattr(shards, "tokencount_batch", lambda texts, model="gpt-4o": [len(t.split()) for t in texts])
+
+
+def _files(root):
+    return [
+        FileInfo(path=os.path.join(root, rel), processed_content=" ".join(["w"] * words), post_tokens=words)
+        for rel, words in _SIZES.items()
+    ]
+
+
+def _generate(config, files):
+    names = ShardedSummaryGenerator.generate(config, files)
+    with open(os.path.join(config.output_path, SHARD_INDEX_FILENAME), encoding="utf-8") as f:
+        index = json.load(f)
+    contents = {}
+    for name in names:
+        with open(os.path.join(config.output_path, name), "rb") as f:
+            contents[name] = f.read()
+    return names, index, contents
+
+
+def test_shards_stay_within_the_limit(word_tokens, make_config, write_files):
+    root = write_files({})
+    config = make_config(count_tokens=True, shard_max_tokens=150)
+    names, index, contents = _generate(config, _files(root))
+
+    assert [shard["file"] for shard in index["shards"]] == names
+    for shard in index["shards"]:
+        text = contents[shard["file"]].decode("utf-8")
+        assert shard["tokens"] == len(text.split())
+        # Only a file that is too large on its own may exceed the limit
+        assert shard["tokens"] <= config.shard_max_tokens or shard["files"] == 1
+
+
+def test_files_are_whole_and_indexed(word_tokens, make_config, write_files):
+    root = write_files({})
+    config = make_config(count_tokens=True, shard_max_tokens=150)
+    files = _files(root)
+    names, index, contents = _generate(config, files)
+
+    # Every file is in exactly one shard, in path order, and its index entry
+    # points at its whole section
+    by_rel = {os.path.relpath(fi.path, root): fi for fi in files}
+    assert sorted(index["files"]) == sorted(by_rel)
+    order = sorted(by_rel, key=lambda rel: (names.index(index["files"][rel]["shard"]), index["files"][rel]["offset"]))
+    assert order == sorted(by_rel, key=lambda rel: by_rel[rel].path)
+    for rel, entry in index["files"].items():
+        section = contents[entry["shard"]][entry["offset"]:entry["offset"] + entry["length"]]
+        assert section.decode("utf-8") == SummaryGenerator.render_entry(by_rel[rel], config)
+
+    # Sections tile each shard after its header, with nothing left over
+    for shard in index["shards"]:
+        entries = sorted(
+            (entry for entry in index["files"].values() if entry["shard"] == shard["file"]),
+            key=lambda entry: entry["offset"],
+        )
+        assert len(entries) == shard["files"]
+        assert contents[shard["file"]].startswith(b"# Directory Contents (part ")
+        for before, after in zip(entries, entries[1:]):
+            assert before["offset"] + before["length"] == after["offset"]
+        assert entries[-1]["offset"] + entries[-1]["length"] == shard["bytes"] == len(contents[shard["file"]])
+
+    # A directory that fits in one shard is not split across two
+    assert len({index["files"][rel]["shard"] for rel in by_rel if rel.startswith("a/")}) == 1
+
+
+def test_stale_shards_are_removed(word_tokens, make_config, write_files):
+    root = write_files({})
+    small = make_config(count_tokens=True, shard_max_tokens=150)
+    many, _, _ = _generate(small, _files(root))
+    few, _, _ = _generate(make_config(count_tokens=True, shard_max_tokens=1000), _files(root))
+
+    assert len(few) < len(many)
+    assert sorted(name for name in os.listdir(small.output_path) if name.endswith(".md")) == few
@@ -0,0 +1,77 @@
+# danai/tests/test_tree.py
+"""
+tree.md: depth and per-directory entry limits, and very deep trees.
+"""
+
+import os
+import sys
+
+from summarymaker.output.tree_generator import TreeGenerator
+
+_FILES = {
+    "a.py": "a = 1\n",
+    "pkg/b.py": "bb = 22\n",
+    "pkg/sub/c.py": "c\n",
+    "pkg/sub/deeper/d.py": "dddd\n",
+    "many/z1/x": "",
+    "many/z2/y": "",
+}
+_FILES.update({f"many/f{i}.txt": "0" * i + "\n" for i in range(1, 6)})
+
+
+def _tree(config):
+    TreeGenerator.generate(config, [])
+    with open(os.path.join(config.output_path, "tree.md"), encoding="utf-8") as f:
+        return f.read().splitlines()[3:]
+
+
+def test_max_depth_collapses_everything_below(make_config, write_files):
+    write_files(_FILES)
+    assert _tree(make_config(tree_max_depth=1)) == [
+        "├── many",
+        "│   └── … 2 directories, 7 files (20 B)",
+        "├── pkg",
+        "│   └── … 2 directories, 3 files (15 B)",
+        "└── a.py",
+        "",
+    ]
+
+
+def test_max_entries_folds_the_rest_of_a_directory(make_config, write_files):
+    write_files(_FILES)
+    lines = _tree(make_config(tree_max_entries_per_dir=3))
+    assert lines[:6] == [
+        "├── many",
+        "│   ├── z1",
+        "│   │   └── x",
+        "│   ├── z2",
+        "│   │   └── y",
+        "│   ├── f1.txt",
+    ]
+    assert lines[6] == "│   └── … 4 more files (18 B)"
+    assert "│   └── … 1 more directory, 5 more files (20 B)" in _tree(make_config(tree_max_entries_per_dir=1))
+
+
+def test_tree_deeper_than_the_recursion_limit(make_config, tmp_path):
+    depth = sys.getrecursionlimit() + 10
+    # Created and removed one level at a time, as os.makedirs and
+    # shutil.rmtree would recurse too
+    dirs = [str(tmp_path / "src")]
+    for _ in range(depth):
+        dirs.append(os.path.join(dirs[-1], "d"))
+    leaf = os.path.join(dirs[-1], "leaf.txt")
+    try:
+        for path in dirs:
+            os.mkdir(path)
+        with open(leaf, "w", encoding="utf-8") as f:
+            f.write("x\n")
+        lines = _tree(make_config())
+    finally:
+        if os.path.exists(leaf):
+            os.remove(leaf)
+        for path in reversed(dirs):
+            if os.path.isdir(path):
+                os.rmdir(path)
+    assert len(lines) == depth + 2
+    assert lines[depth - 1] == " " * 4 * (depth - 1) + "└── d"
+    assert lines[depth] == " " * 4 * depth + "└── leaf.txt"
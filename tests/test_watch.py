@@ -0,0 +1,61 @@
+# danai/tests/test_watch.py
+"""
+Incremental updates applied by watch mode.
+"""
+
+import os
+
+from summarymaker.main import generate_summary
+from summarymaker.manifest import SummaryManifest
+from summarymaker.watch import WatchSession
+from summarymaker.watchers import Changes
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _apply_edits(session, root: str) -> str:
+    with open(os.path.join(root, "a.py"), "w", encoding="utf-8") as f:
+        f.write("a = 2\n")
+    with open(os.path.join(root, "new.py"), "w", encoding="utf-8") as f:
+        f.write("new = 1\n")
+    changes = Changes()
+    changes.dirs.add(os.path.abspath(root))
+    changes.files.add(os.path.abspath(os.path.join(root, "a.py")))
+    return session.apply(changes)
+
+
+def test_apply_matches_fresh_run(make_config, write_files, tmp_path):
+    root = write_files({"a.py": "a = 1\n", "b.py": "b = 1\n", "sub/c.py": "c = 1\n"})
+    session = WatchSession(make_config())
+    session.build()
+    assert _apply_edits(session, root).startswith("+1 ~1 -0")
+
+    fresh = make_config(output_path=str(tmp_path / "fresh"))
+    generate_summary(fresh)
+    for name in ("summary.md", "tree.md"):
+        assert _read(os.path.join(session.config.output_path, name)) == _read(os.path.join(fresh.output_path, name))
+
+
+def test_apply_records_stat_in_manifest(make_config, write_files):
+    root = write_files({"a.py": "a = 1\n", "b.py": "b = 1\n"})
+    config = make_config(incremental=True)
+    session = WatchSession(config)
+    session.build()
+    _apply_edits(session, root)
+
+    manifest = SummaryManifest.load(config)
+    for name in ("a.py", "new.py", "b.py"):
+        path = os.path.join(root, name)
+        entry = manifest.entries[path]
+        st = os.stat(path)
+        assert (entry.size, entry.mtime_ns) == (st.st_size, st.st_mtime_ns)
+
+    # So the next incremental run reuses them without re-reading
+    manifest.written_ns = 0  # rule out the racy-mtime hash check
+    for fileinfo in session.files.values():
+        fileinfo.processed_content = ""
+        assert manifest.restore(fileinfo)
+    assert session.files[os.path.join(root, "a.py")].processed_content == "a = 2\n"